@@ -0,0 +1,36 @@
+"""
+alert.py
+
+Defines the Alert class to represent a price alert raised for a sell or wanted item.
+"""
+
+
+class Alert:
+    __slots__ = ("id", "kind", "item_id", "item_name", "price", "target", "created_at")
+
+    def __init__(self, id, kind, item_id, item_name, price, target, created_at):
+        """
+        Initialize an Alert instance.
+
+        :param kind: "sell" when a sell item's price reached its threshold, "wanted" when a wanted item's
+            price fell to its target price
+        :param item_id: Id of the item's row in the sell or wanted table
+        :param price: Price that triggered the alert, as a Decimal
+        :param target: Threshold or target price it was compared to
+        :param created_at: Time the alert was raised
+        """
+        self.id = id
+        self.kind = kind
+        self.item_id = item_id
+        self.item_name = item_name
+        self.price = price
+        self.target = target
+        self.created_at = created_at
+
+    def __repr__(self):
+        """
+        Return a string representation of the Alert instance.
+        """
+        if self.kind == "sell":
+            return f"Sell '{self.item_name}': ${self.price} reached the threshold of ${self.target}"
+        return f"Buy '{self.item_name}': ${self.price} is at or below the target of ${self.target}"
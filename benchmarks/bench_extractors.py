@@ -0,0 +1,99 @@
+"""
+bench_extractors.py
+
+Micro-benchmark comparing the price extractors on the saved search pages in benchmarks/fixtures.
+Before timing, it checks that every extractor finds the same listings on each page and on a page
+whose price elements hold nested markup.
+
+Run from the repository root:
+
+    python benchmarks/bench_extractors.py [repeat]
+"""
+
+import os
+import sys
+import timeit
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from price_extractors import LxmlExtractor, RegexExtractor, SoupStrainerExtractor, lxml
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def full_soup_first_price(html):
+    # The original get_price parse, kept as the baseline
+    price_tag = BeautifulSoup(html, 'html.parser').find("span", class_="price")
+    return float(price_tag.text.strip().replace('$', '').replace(',', '')) if price_tag else None
+
+
+# Price elements with nested tags, which a tree-based extractor must not count as listings of their own
+NESTED_PAGE = """<html><body>
+<div class="pricing"><span class="price"><b>$</b>1,299.99</span> <span class="shipping">+ $8.95</span></div>
+<div class="pricing"><span class="price"><b>$12.50</b></span></div>
+<div class="pricing"><span class="price sale"><em>EUR</em> <strong>202,00</strong></span></div>
+<div class="pricing"><span class="price-old">$300.00</span> <span class="price"><i>15 GBP</i></span></div>
+</body></html>"""
+
+
+def listings_of(extractor, html):
+    return [(listing.price, listing.currency) for listing in extractor.extract(html)]
+
+
+def check_equivalent(extractors, pages):
+    """
+    Exit with an error if the extractors disagree on the listings of any page.
+    """
+    for name, html in pages:
+        results = {label: listings_of(extractor, html) for label, extractor in extractors}
+        expected = next(iter(results.values()))
+        for label, result in results.items():
+            if result != expected:
+                raise SystemExit(f"{name}: {label} found {result}, expected {expected}")
+        print(f"{name}: all extractors found the same {len(expected)} listings")
+
+
+def chunks(data, size=8192):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def main(repeat=20):
+    regex = RegexExtractor()
+    strainer = SoupStrainerExtractor()
+    candidates = [
+        ("full BeautifulSoup (baseline)", lambda html, raw: full_soup_first_price(html)),
+        ("SoupStrainer, all listings", lambda html, raw: strainer.extract(html)),
+        ("regex, all listings", lambda html, raw: regex.extract(html)),
+        ("regex, first listing", lambda html, raw: regex.extract(html, max_listings=1)),
+        ("regex stream, first listing", lambda html, raw: regex.extract_stream(chunks(raw), max_listings=1)),
+    ]
+    extractors = [("regex", regex), ("SoupStrainer", strainer)]
+    if lxml is not None:
+        lxml_extractor = LxmlExtractor()
+        candidates.insert(2, ("lxml XPath, all listings", lambda html, raw: lxml_extractor.extract(html)))
+        extractors.append(("lxml", lxml_extractor))
+
+    pages = [("nested markup", NESTED_PAGE)]
+    for name in sorted(os.listdir(FIXTURES)):
+        with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+            pages.append((name, f.read()))
+    check_equivalent(extractors, pages)
+
+    for name in sorted(os.listdir(FIXTURES)):
+        with open(os.path.join(FIXTURES, name), "rb") as f:
+            raw = f.read()
+        html = raw.decode("utf-8")
+        print(f"\n{name} ({len(raw) / 1024:.0f} KiB, {repeat} runs)")
+
+        baseline = None
+        for label, extract in candidates:
+            seconds = min(timeit.repeat(lambda: extract(html, raw), number=1, repeat=repeat))
+            baseline = baseline or seconds
+            result = extract(html, raw)
+            found = len(result) if isinstance(result, list) else int(result is not None)
+            print(f"  {label:<32} {seconds * 1000:9.3f} ms  {baseline / seconds:7.1f}x  {found} found")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
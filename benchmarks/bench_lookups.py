@@ -0,0 +1,62 @@
+"""
+bench_lookups.py
+
+Measures the per-call latency of CollectionTracker's by-name lookups and update_item, with and
+without prepared statements, against the database configured in .env. Those cases bypass the read
+cache so every call reaches the database; a last case measures the lookups served from the cache.
+
+Run from the repository root, against a database holding some inventory (update_item rewrites the
+items with their current values):
+
+    python benchmarks/bench_lookups.py [calls]
+"""
+
+import os
+import sys
+import time
+from dotenv import load_dotenv
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from collection_tracker import CollectionTracker
+
+
+def per_call_ms(func, args_list):
+    start = time.perf_counter()
+    for args in args_list:
+        func(*args)
+    return (time.perf_counter() - start) * 1000 / len(args_list)
+
+
+def main(calls=2000):
+    load_dotenv()
+    settings = (os.getenv("DB_HOST"), os.getenv("DB_USER"), os.getenv("DB_PASSWORD"), os.getenv("DB_NAME"), os.getenv("DB_PORT"))
+
+    cases = (
+        ("prepare_statements=False", dict(prepare_statements=False, cache_reads=False, listen_for_changes=False)),
+        ("prepare_statements=True", dict(prepare_statements=True, cache_reads=False, listen_for_changes=False)),
+        ("prepare_statements=True, cache_reads=True", dict(prepare_statements=True, cache_reads=True,
+                                                           listen_for_changes=False)),
+    )
+    for label, options in cases:
+        tracker = CollectionTracker(*settings, max_connections=1, **options)
+        try:
+            items, _ = tracker.inventory_page(limit=calls)
+            if not items:
+                print("The inventory is empty, nothing to look up")
+                return
+            names = [(items[i % len(items)].name,) for i in range(calls)]
+            updates = [(items[i % len(items)],) for i in range(calls)]
+
+            # Warm up the connection and, when enabled, the prepared statements
+            per_call_ms(tracker.get_inventory_item_by_name, names[:10])
+            lookup = per_call_ms(tracker.get_inventory_item_by_name, names)
+            with tracker.transaction():
+                update = per_call_ms(tracker.update_item, updates)
+            print(f"{label}: get_inventory_item_by_name {lookup:.3f} ms/call, "
+                  f"update_item {update:.3f} ms/call")
+        finally:
+            tracker.close()
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
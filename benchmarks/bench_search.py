@@ -0,0 +1,72 @@
+"""
+bench_search.py
+
+Measures SearchIndex on a synthetic collection: the time to build it, to answer each keystroke of a
+type-ahead query with and without filters, and to apply a reload in which a few items changed.
+
+Run from the repository root:
+
+    python benchmarks/bench_search.py [items]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from collection_item import CollectionItem
+from search_index import SearchIndex
+
+WORDS = ("mint", "vintage", "limited", "edition", "gold", "silver", "proof", "first", "print", "signed", "classic",
+         "rare", "red", "blue", "sealed", "graded", "promo", "holo", "chrome", "series")
+CATEGORIES = ("Coins", "Cards", "Stamps", "Comics", "Toys", "Records", "Watches", "Cameras")
+LOCATIONS = ("Shelf A", "Shelf B", "Safe", "Attic", "Storage", None)
+
+
+def synthetic_items(count, seed=1):
+    rng = random.Random(seed)
+    items = []
+    for item_id in range(1, count + 1):
+        name = " ".join(rng.choice(WORDS).title() for _ in range(3)) + f" #{rng.randrange(100000)}"
+        items.append(CollectionItem(name, rng.choice(CATEGORIES), 1, "1.00", year=rng.choice([None] + list(range(1950, 2025))),
+                                    location=rng.choice(LOCATIONS), id=item_id))
+    items.sort(key=lambda item: (item.category, item.year if item.year is not None else 2147483647, item.name, item.id))
+    return items
+
+
+def timed_ms(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return (time.perf_counter() - start) * 1000, result
+
+
+def main(count=100000):
+    items = synthetic_items(count)
+    build, index = timed_ms(SearchIndex, items)
+    print(f"Indexed {count:,} items in {build:.0f} ms")
+
+    query = "vintage gold"
+    for filters in ({}, {"category": "coins"}, {"category": "cards", "year_min": 1980, "year_max": 1999, "location": "safe"}):
+        timings = []
+        for end in range(1, len(query) + 1):
+            elapsed, results = timed_ms(index.search, query[:end], **filters)
+            timings.append(f"{query[:end]!r} {elapsed:.1f} ms ({len(results):,})")
+        print(f"Filters {filters or 'none'}:")
+        print("  " + "\n  ".join(timings))
+
+    elapsed, results = timed_ms(index.search)
+    print(f"No filter: {elapsed:.1f} ms ({len(results):,})")
+
+    # A reload after one add, one rename and one removal
+    reloaded = list(items[1:])
+    renamed = reloaded[500]
+    reloaded[500] = CollectionItem("Renamed " + renamed.name, renamed.category, 1, "1.00", year=renamed.year, id=renamed.id)
+    reloaded.append(CollectionItem("Brand New Item", "Coins", 1, "1.00", id=count + 1))
+    elapsed, _ = timed_ms(index.set_items, reloaded)
+    print(f"Reloaded with 3 changes in {elapsed:.0f} ms, "
+          f"'renamed' now matches {len(index.search('renamed'))}, 'brand new' {len(index.search('brand new'))}")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,176 @@
+"""
+check_price_engine.py
+
+Runs the PriceEngine against a local stub HTTP server and checks its retry and rate-limit behaviour:
+retries with backoff on 5xx responses, the Retry-After header of a 429 response, giving up after the
+last retry, and the per-host concurrency and request rate limits. Exits non-zero when a check fails.
+
+Run from the repository root:
+
+    python benchmarks/check_price_engine.py
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from price_engine import PriceEngine
+
+PRICE_PAGE = b'<html><body><span class="price">$12.50</span></body></html>'
+
+# Seconds the stub waits before answering a /slow request, long enough for requests to overlap
+SLOW_DELAY = 0.2
+
+
+class StubState:
+    """
+    What the stub server has seen, shared by its handler threads.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.hits = defaultdict(int)
+        self.arrivals = defaultdict(list)
+        self.in_flight = defaultdict(int)
+        self.peak = defaultdict(int)
+
+
+def make_handler(state):
+    class StubHandler(BaseHTTPRequestHandler):
+        """
+        /flaky?q=..&fail=N  503 for the first N requests of a query, then the price page
+        /limited?q=..       429 with Retry-After: 1 for the first request of a query, then the price page
+        /down?q=..          500 every time
+        /slow?q=..          the price page after SLOW_DELAY, counting the requests in flight per host
+        """
+
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            query = parse_qs(parts.query)
+            key = (parts.path, query.get("q", [""])[0])
+            host = self.headers.get("Host")
+            with state.lock:
+                state.hits[key] += 1
+                hit = state.hits[key]
+                state.arrivals[host].append(time.monotonic())
+
+            if parts.path == "/flaky" and hit <= int(query.get("fail", ["0"])[0]):
+                self.reply(503)
+            elif parts.path == "/limited" and hit == 1:
+                self.reply(429, {"Retry-After": "1"})
+            elif parts.path == "/down":
+                self.reply(500)
+            elif parts.path == "/slow":
+                with state.lock:
+                    state.in_flight[host] += 1
+                    state.peak[host] = max(state.peak[host], state.in_flight[host])
+                time.sleep(SLOW_DELAY)
+                with state.lock:
+                    state.in_flight[host] -= 1
+                self.reply(200, body=PRICE_PAGE)
+            else:
+                self.reply(200, body=PRICE_PAGE)
+
+        def reply(self, status, headers=None, body=b""):
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+
+def check(failures, condition, message):
+    print(f"{'ok  ' if condition else 'FAIL'} {message}")
+    if not condition:
+        failures.append(message)
+
+
+def main():
+    state = StubState()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+    failures = []
+
+    try:
+        # Two 503s, then the price: found on the third attempt
+        engine = PriceEngine(search_url=f"http://127.0.0.1:{port}/flaky?fail=2&q={{query}}", retries=3,
+                             backoff=0.05, requests_per_second=0)
+        start = time.monotonic()
+        listing = engine.fetch_price("Flaky")
+        elapsed = time.monotonic() - start
+        check(failures, listing is not None and listing.price == 12.5,
+              f"retries 503 responses until the price is found ({listing})")
+        check(failures, state.hits[("/flaky", "Flaky")] == 3,
+              f"3 requests for 2 failures ({state.hits[('/flaky', 'Flaky')]})")
+        # Backoff of 0.05s then 0.1s, each stretched by up to half again
+        check(failures, 0.15 <= elapsed < 1.0, f"backs off between attempts ({elapsed:.2f}s)")
+        engine.close()
+
+        # 429 with Retry-After: 1 waits a full second instead of the 0.01s backoff
+        engine = PriceEngine(search_url=f"http://127.0.0.1:{port}/limited?q={{query}}", retries=2,
+                             backoff=0.01, requests_per_second=0)
+        start = time.monotonic()
+        listing = engine.fetch_price("Limited")
+        elapsed = time.monotonic() - start
+        check(failures, listing is not None, "retries a 429 response")
+        check(failures, elapsed >= 1.0, f"honours Retry-After ({elapsed:.2f}s)")
+        engine.close()
+
+        # Always 500: gives up after retries + 1 attempts
+        engine = PriceEngine(search_url=f"http://127.0.0.1:{port}/down?q={{query}}", retries=2,
+                             backoff=0.01, requests_per_second=0)
+        listing = engine.fetch_price("Down")
+        check(failures, listing is None, "returns None when every attempt fails")
+        check(failures, state.hits[("/down", "Down")] == 3,
+              f"3 attempts with retries=2 ({state.hits[('/down', 'Down')]})")
+        engine.close()
+
+        # 12 slow requests against each of two host names, at most 2 in flight per host
+        names = [f"Item {i}" for i in range(12)]
+        for host in ("127.0.0.1", "localhost"):
+            engine = PriceEngine(search_url=f"http://{host}:{port}/slow?q={{query}}", max_workers=8,
+                                 per_host_limit=2, requests_per_second=0)
+            prices = engine.fetch_prices(names)
+            check(failures, all(listing is not None for listing in prices.values()),
+                  f"fetches every price from {host}")
+            engine.close()
+        for host in ("127.0.0.1", "localhost"):
+            peak = state.peak[f"{host}:{port}"]
+            check(failures, peak == 2, f"at most 2 requests in flight against {host} ({peak})")
+
+        # 10 requests per second: each request to a host arrives at least 0.1s after the previous one
+        state.arrivals.clear()
+        engine = PriceEngine(search_url=f"http://127.0.0.1:{port}/flaky?q={{query}}", max_workers=8,
+                             per_host_limit=8, requests_per_second=10.0)
+        engine.fetch_prices(names)
+        engine.close()
+        arrivals = sorted(state.arrivals[f"127.0.0.1:{port}"])
+        gap = min(b - a for a, b in zip(arrivals, arrivals[1:]))
+        check(failures, len(arrivals) == len(names) and gap >= 0.08,
+              f"spaces requests to 10 per second (shortest gap {gap:.3f}s)")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    if failures:
+        print(f"{len(failures)} check(s) failed")
+        sys.exit(1)
+    print("All checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,18 +8,49 @@ import tkinter as tk
 from tkinter import messagebox
 from tkinter import ttk
 from collection_item import CollectionItem
-import os
-from PIL import Image, ImageTk
-import textwrap
+from search_index import SearchIndex
+from startup_timer import StartupTimer
+from task_runner import TaskRunner
+from virtual_grid import VirtualGrid
 
 class CollectionApp:
-    def __init__(self, root, tracker):
+    def __init__(self, root, tracker, timer=None):
+        """
+        Initialize a CollectionApp instance.
+
+        Only the window and the tab headers are built here. A tab's widgets are built the first time it is
+        selected and its items are loaded once the main loop is running, so the window shows at once
+        whatever the size of the collection.
+
+        :param root: Tk root window
+        :param tracker: CollectionTracker or SQLiteTracker holding the collection
+        :param timer: StartupTimer the startup phases are recorded in
+        """
         self.root = root
+        self.timer = timer or StartupTimer()
         self.root.title("Collection Tracker")
         self.root.attributes("-fullscreen", True)  # Enable full-screen mode
         self.root.bind("<Escape>", lambda e: self.root.attributes("-fullscreen", False))  # Exit full-screen with Escape key
         self.tracker = tracker
 
+        # The thumbnail cache, its decoding threads and PIL are only set up once the first tile needs an image
+        self.thumbnail_cache = None
+        self.thumbnail_loader = None
+        self.placeholder_image = None
+
+        # Database and scraper calls run on worker threads, the status bar shows those still in progress
+        self.tasks = TaskRunner(root, on_busy=self.show_busy)
+        self.status_bar = ttk.Frame(root)
+        self.status_label = ttk.Label(self.status_bar)
+        self.status_label.pack(side=tk.LEFT, padx=5)
+        self.status_progress = ttk.Progressbar(self.status_bar, mode="indeterminate", length=120)
+        self.status_progress.pack(side=tk.LEFT)
+        ttk.Button(self.status_bar, text="Cancel", command=self.tasks.cancel).pack(side=tk.LEFT, padx=5)
+
+        # Search index and filter fields of the Inventory and Wanted grids
+        self.search_indexes = {"inventory": SearchIndex(), "wanted": SearchIndex()}
+        self.filters = {}
+
         self.notebook = ttk.Notebook(root)
         self.notebook.pack(fill=tk.BOTH, expand=True)
 
@@ -27,52 +58,193 @@ class CollectionApp:
         self.wanted_tab = ttk.Frame(self.notebook)
         self.sell_tab = ttk.Frame(self.notebook)
 
+        # Tab frame -> (name, builder, loader); built tabs are removed
+        self.pending_tabs = {
+            str(self.inventory_tab): ("inventory", self.create_inventory_tab, self.load_inventory_with_images),
+            str(self.wanted_tab): ("wanted", self.create_wanted_tab, self.load_wanted_with_images),
+            str(self.sell_tab): ("sell", self.create_sell_tab, self.load_sell_items),
+        }
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
+
         self.notebook.add(self.inventory_tab, text="Inventory")
         self.notebook.add(self.wanted_tab, text="Wanted Items")
         self.notebook.add(self.sell_tab, text="Sell Items")
 
-        self.create_inventory_tab()
-        self.create_wanted_tab()
-        self.create_sell_tab()
+        # The selected tab is built right away, whether or not Tk reported selecting it
+        self.on_tab_changed()
+
+    def on_tab_changed(self, event=None):
+        """
+        Build the selected tab the first time it is shown, and load its items once the window has been drawn.
+        """
+        tab = self.pending_tabs.pop(str(self.notebook.select()), None)
+        if tab is None:
+            return
+        name, build, load = tab
+        with self.timer.phase(f"build {name}"):
+            build()
+        end = self.timer.start(f"load {name}")
+        load(then=lambda: self._tab_loaded(name, end))
+
+    def _tab_loaded(self, name, end):
+        end()
+        # Startup ends with the first tab's items, later tabs are reported as they are opened
+        if self.timer.reported:
+            print(f"Loaded the {name} tab in {self.timer.phases[-1][1] * 1000:.0f} ms")
+        self.timer.report()
+
+    def show_busy(self, labels):
+        """
+        Show the status bar with the first pending operation while any are in progress, hide it otherwise.
+        """
+        if not labels:
+            self.status_progress.stop()
+            self.status_bar.pack_forget()
+            self.root.config(cursor="")
+            return
+        more = f" (+{len(labels) - 1} more)" if len(labels) > 1 else ""
+        self.status_label.config(text=f"{labels[0]}…{more}")
+        if not self.status_bar.winfo_ismapped():
+            self.status_bar.pack(fill=tk.X, side=tk.BOTTOM, before=self.notebook)
+            self.status_progress.start(15)
+        self.root.config(cursor="watch")
+
+    def _then(self, then):
+        # Result callback that ignores the result and runs then()
+        return lambda result: then()
+
+    def create_filter_bar(self, tab, name):
+        """
+        Add the type-ahead search and filter fields above a grid; every change refilters the grid at once.
 
-    def _on_frame_configure(self, canvas=None, event=None):
+        :param tab: Tab frame the bar is packed in
+        :param name: Key of the tab's search index, "inventory" or "wanted"
         """
-        Adjust the canvas scroll region to match the size of the frame.
+        bar = ttk.Frame(tab)
+        bar.pack(fill=tk.X, side=tk.TOP)
+        fields = {field: tk.StringVar() for field in ("text", "category", "year_min", "year_max", "location")}
+        self.filters[name] = fields
+
+        ttk.Label(bar, text="Search:").pack(side=tk.LEFT)
+        ttk.Entry(bar, textvariable=fields["text"], width=30).pack(side=tk.LEFT)
+        ttk.Label(bar, text="Category:").pack(side=tk.LEFT)
+        fields["category_box"] = ttk.Combobox(bar, textvariable=fields["category"], width=15)
+        fields["category_box"].pack(side=tk.LEFT)
+        ttk.Label(bar, text="Year from:").pack(side=tk.LEFT)
+        ttk.Entry(bar, textvariable=fields["year_min"], width=6).pack(side=tk.LEFT)
+        ttk.Label(bar, text="to:").pack(side=tk.LEFT)
+        ttk.Entry(bar, textvariable=fields["year_max"], width=6).pack(side=tk.LEFT)
+        ttk.Label(bar, text="Location:").pack(side=tk.LEFT)
+        fields["location_box"] = ttk.Combobox(bar, textvariable=fields["location"], width=15)
+        fields["location_box"].pack(side=tk.LEFT)
+        ttk.Button(bar, text="Clear", command=lambda: self.clear_filters(name)).pack(side=tk.LEFT)
+
+        for field in ("text", "category", "year_min", "year_max", "location"):
+            fields[field].trace_add("write", lambda *args: self.apply_filters(name))
+
+    def clear_filters(self, name):
+        for field in ("text", "category", "year_min", "year_max", "location"):
+            self.filters[name][field].set("")
+
+    def filtered_items(self, name):
         """
-        if canvas:
-            canvas.configure(scrollregion=canvas.bbox("all"))
+        Return the items of a tab's index matching its filter fields.
+        """
+        fields = self.filters.get(name)
+        index = self.search_indexes[name]
+        if fields is None:
+            return index.search()
+        return index.search(
+            fields["text"].get(),
+            category=fields["category"].get().strip() or None,
+            year_min=_year(fields["year_min"].get()),
+            year_max=_year(fields["year_max"].get()),
+            location=fields["location"].get().strip() or None
+        )
+
+    def apply_filters(self, name):
+        # inventory_grid or wanted_grid, each only exists once its tab was opened
+        getattr(self, f"{name}_grid").set_items(self.filtered_items(name))
 
-    def _on_canvas_resize(self, canvas=None, frame_id=None, event=None):
+    def _reindex(self, name, items):
+        # Runs on a worker thread, so only the changed items' index entries are rebuilt off the main thread
+        self.search_indexes[name].set_items(items)
+
+    def _show_indexed(self, name):
+        # Refill the filter drop-downs and show the items matching the current filters
+        fields = self.filters.get(name)
+        if fields is not None:
+            fields["category_box"]["values"] = self.search_indexes[name].values("category")
+            fields["location_box"]["values"] = self.search_indexes[name].values("location")
+        self.apply_filters(name)
+
+    def _thumbnails(self):
+        """
+        Return the ThumbnailLoader, creating the thumbnail cache and its decoding threads on first use.
         """
-        Ensure the frame width matches the canvas width.
+        if self.thumbnail_loader is None:
+            from thumbnail_cache import ThumbnailCache
+            from thumbnail_loader import ThumbnailLoader
+
+            # Pre-resized thumbnails persisted across restarts
+            self.thumbnail_cache = ThumbnailCache()
+            self.thumbnail_loader = ThumbnailLoader(self.root, self.thumbnail_cache)
+        return self.thumbnail_loader
+
+    def _cancel_thumbnail(self, owner):
+        if self.thumbnail_loader is not None:
+            self.thumbnail_loader.cancel(owner)
+
+    def _placeholder(self):
+        # One placeholder shared by every tile without a picture, drawn by Tk so PIL is not needed for it
+        if self.placeholder_image is None:
+            from thumbnail_cache import THUMBNAIL_SIZE
+
+            width, height = THUMBNAIL_SIZE
+            self.placeholder_image = tk.PhotoImage(width=width, height=height)
+            self.placeholder_image.put("gray", to=(0, 0, width, height))
+        return self.placeholder_image
+
+    def _load_tile_image(self, item, owner, on_ready, priority, image_cache):
+        """
+        Return the PhotoImage to show for an item right away.
+
+        Thumbnails not decoded yet start out as the placeholder and are decoded in the background,
+        on_ready is called with the real image once it is available.
         """
-        if canvas and frame_id and event:
-            canvas_width = event.width
-            canvas.itemconfig(frame_id, width=canvas_width)
+        if not item.image_path:
+            return self._placeholder()
+        if item.image_path in image_cache:
+            return image_cache[item.image_path]
+
+        def on_thumbnail(thumb, image_path=item.image_path):
+            if thumb is None:
+                return
+            if image_path not in image_cache:
+                from PIL import ImageTk
+
+                image_cache[image_path] = ImageTk.PhotoImage(thumb)  # Store reference to prevent garbage collection
+            on_ready(image_cache[image_path])
+
+        self._thumbnails().request(item.image_path, owner, on_thumbnail, priority)
+        return self._placeholder()
 
     def create_inventory_tab(self):
-        # Create a canvas to display items
-        self.inventory_canvas = tk.Canvas(self.inventory_tab, bg="white")
-        self.inventory_canvas.pack(fill=tk.BOTH, expand=True)
-
-        # Add a scrollbar for the canvas
-        self.inventory_scrollbar = ttk.Scrollbar(self.inventory_tab, orient=tk.VERTICAL, command=self.inventory_canvas.yview)
-        self.inventory_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.inventory_canvas.configure(yscrollcommand=self.inventory_scrollbar.set)
-
-        # Create a frame inside the canvas to hold the items
-        self.inventory_frame = ttk.Frame(self.inventory_canvas)
-        self.inventory_frame_id = self.inventory_canvas.create_window((0, 0), window=self.inventory_frame, anchor="nw")
-
-        # Configure dynamic scrolling for the frame
-        self.inventory_frame.bind("<Configure>", self._on_frame_configure(canvas=self.inventory_canvas))
-        self.inventory_canvas.bind("<Configure>", self._on_canvas_resize(canvas=self.inventory_canvas, frame_id=self.inventory_frame_id))
-    
         # Cache for loaded images
         self.image_cache_inventory = {}
 
-        # Load and display inventory items inside the canvas (with scrollbar applied)
-        self.load_inventory_with_images()
+        # Search and filter fields above the grid
+        self.create_filter_bar(self.inventory_tab, "inventory")
+
+        # Create a virtualized grid to display items, only the visible tiles are built
+        self.inventory_grid = VirtualGrid(
+            self.inventory_tab,
+            image_loader=lambda item, owner, on_ready, priority: self._load_tile_image(
+                item, owner, on_ready, priority, self.image_cache_inventory),
+            on_click=self.on_inventory_item_click,
+            cancel_image=self._cancel_thumbnail
+        )
+        self.inventory_grid.pack(fill=tk.BOTH, expand=True)
 
         # Create a separate frame for the form outside the canvas to prevent it from being affected by the scroll
         self.inventory_form_frame = ttk.Frame(self.inventory_tab)
@@ -81,41 +253,20 @@ class CollectionApp:
         # Load the add or update inventory form
         self.add_update_inventory_form()
 
-    def load_inventory_with_images(self):
-        for widget in self.inventory_frame.winfo_children():
-            widget.destroy()  # Clear existing items in the inventory display
-
-        items = self.tracker.get_inventory()
-        for index, item in enumerate(items):
-            # Create a frame for each item
-            item_frame = ttk.Frame(self.inventory_frame, borderwidth=2, relief=tk.GROOVE, padding=(9, 9))
-            item_frame.grid(row=index // 13, column=index % 13, padx=9, pady=9)
-
-            # Load image
-            if item.image_path and os.path.exists(item.image_path):
-                print(item.image_path)
-                img = Image.open(item.image_path).resize((90, 90), Image.Resampling.LANCZOS)
-                photo = ImageTk.PhotoImage(img)
-                self.image_cache_inventory[item.image_path] = photo  # Store reference to prevent garbage collection
-                img_label = tk.Label(item_frame, image=photo)
-                img_label.pack()
-            else:
-                # Placeholder image
-                placeholder = Image.new("RGB", (90, 90), color="gray")
-                photo = ImageTk.PhotoImage(placeholder)
-                self.image_cache_inventory[f"placeholder_{index}"] = photo
-                img_label = tk.Label(item_frame, image=photo)
-                img_label.pack()
-
-            # Display name and year
-            wrapped_text = "\n".join(textwrap.wrap(item.name, width=15))  # Adjust width as needed
-            name_label = tk.Label(item_frame, text=wrapped_text, font=("Arial", 10, "bold"), justify=tk.CENTER)
-            name_label.pack()
-            year_label = tk.Label(item_frame, text=f"Year: {item.year}", font=("Arial", 10))
-            year_label.pack()            
-
-            # Bind a click event to the item frame
-            item_frame.bind("<Button-1>", lambda event, item=item: self.on_inventory_item_click(item))
+    def load_inventory_with_images(self, then=None):
+        """
+        Reload the inventory grid in the background, repeated reloads are coalesced into one.
+
+        :param then: Called once the grid shows the new items
+        """
+        def show(result):
+            # The grid only receives the items matching the search and filter fields
+            self._show_indexed("inventory")
+            if then is not None:
+                then()
+
+        self.tasks.submit(lambda: self._reindex("inventory", self.tracker.get_inventory()),
+                          label="Loading the inventory", key="inventory", on_done=show)
 
     def on_inventory_item_click(self, item):
         """
@@ -181,98 +332,78 @@ class CollectionApp:
         ttk.Button(self.inventory_form, text="Move to Sell", command=self.update_inventory_item).pack(side=tk.LEFT)
 
     def add_inventory_item(self):
-        selected_item = self.inventory_name.get()
-        item = self.tracker.get_item_by_name(selected_item)  # Fetch the item by name from the tracker or database
-
-        # Update the item with new data from the form
-        item.name = self.inventory_name.get()
-        item.category = self.inventory_category.get()
-        item.quantity = int(self.inventory_quantity.get())
-        item.price = float(self.inventory_price.get())
-        item.image_path = self.inventory_image_path.get()
-        item.year = self.inventory_year.get()
-        item.location = self.inventory_location.get()
-
-        # Save the updated item back to the tracker or database
-        self.tracker.add_item_inventory(item)
-
-        # Optionally, refresh the displayed inventory
-        self.load_inventory_with_images()
-
-
-    def remove_inventory_item(self):
-        # Get the selected item name from the form
-        item_name = self.inventory_name.get()
-
-        # Fetch the item from the tracker by name
-        item = self.tracker.get_item_by_name(item_name)
-
-        if item:
-            # Remove the item using the remove_item function
-            self.tracker.remove_item(item)
-
-            # Optionally clear the form fields
-            self.clear_inventory_form()
+        item = CollectionItem(
+            name=self.inventory_name.get(),
+            category=self.inventory_category.get(),
+            quantity=int(self.inventory_quantity.get()),
+            price=float(self.inventory_price.get()),
+            image_path=self.inventory_image_path.get(),
+            year=self.inventory_year.get(),
+            location=self.inventory_location.get()
+        )
 
-            # Refresh the inventory list to reflect the removal
-            self.load_inventory_with_images()
-        else:
-            # Handle case where the item is not found
-            print(f"Item '{item_name}' not found.")
+        # Save the new item to the tracker or database, then refresh the displayed inventory;
+        # only the tiles that changed are redrawn
+        self.tasks.submit(self.tracker.add_item_inventory, item, label=f"Adding '{item.name}'", serial=True,
+                          on_done=self._then(self.load_inventory_with_images))
 
     def remove_inventory_item(self):
         item_name = self.inventory_name.get()
         if item_name:
-            self.tracker.remove_item(item_name)
+            self.tasks.submit(self.tracker.remove_inventory_item_, item_name, label=f"Removing '{item_name}'",
+                              serial=True, on_done=self._then(self.load_inventory_with_images))
             self.clear_inventory_form()
-            self.load_inventory_with_images()
+
+    def clear_inventory_form(self):
+        for entry in (self.inventory_name, self.inventory_category, self.inventory_quantity, self.inventory_price,
+                      self.inventory_image_path, self.inventory_year, self.inventory_location):
+            entry.delete(0, tk.END)
 
     def update_inventory_item(self):
         selected_item = self.inventory_name.get()
-        item = self.tracker.get_item_by_name(selected_item)  # Fetch the item by name from the tracker or database
-
-        # Update the item with new data from the form
-        item.name = self.inventory_name.get()
-        item.category = self.inventory_category.get()
-        item.quantity = int(self.inventory_quantity.get())
-        item.price = float(self.inventory_price.get())
-        item.image_path = self.inventory_image_path.get()
-        item.year = self.inventory_year.get()
-        item.location = self.inventory_location.get()
-
-        # Save the updated item back to the tracker or database
-        self.tracker.update_item(item)
 
-        # Optionally, refresh the displayed inventory
-        self.load_inventory_with_images()
+        # Read the form on the main thread, the worker only talks to the database
+        values = {
+            "name": self.inventory_name.get(),
+            "category": self.inventory_category.get(),
+            "quantity": int(self.inventory_quantity.get()),
+            "price": float(self.inventory_price.get()),
+            "image_path": self.inventory_image_path.get(),
+            "year": self.inventory_year.get(),
+            "location": self.inventory_location.get(),
+        }
+
+        def update():
+            item = self.tracker.get_inventory_item_by_name(selected_item)  # Fetch the item by name from the tracker or database
+
+            # Update the item with new data from the form and save it back
+            for field, value in values.items():
+                setattr(item, field, value)
+            self.tracker.update_item(item)
+
+        # Refresh the displayed inventory afterwards, only the edited tile is redrawn
+        self.tasks.submit(update, label=f"Updating '{selected_item}'", serial=True,
+                          on_done=self._then(self.load_inventory_with_images))
 
     """
     WANTED ITEMS
     """
     def create_wanted_tab(self):
-        # Create a canvas to display items
-        self.wanted_canvas = tk.Canvas(self.wanted_tab, bg="white")
-        self.wanted_canvas.pack(fill=tk.BOTH, expand=True)
-
-        # Add a scrollbar for the canvas
-        self.wanted_scrollbar = ttk.Scrollbar(self.wanted_tab, orient=tk.VERTICAL,
-                                                 command=self.wanted_canvas.yview)
-        self.wanted_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.wanted_canvas.configure(yscrollcommand=self.wanted_scrollbar.set)
-
-        # Create a frame inside the canvas to hold the items
-        self.wanted_frame = ttk.Frame(self.wanted_canvas)
-        self.wanted_frame_id = self.wanted_canvas.create_window((0, 0), window=self.wanted_frame, anchor="nw")
-
-        # Configure dynamic scrolling for the frame
-        self.wanted_frame.bind("<Configure>", self._on_frame_configure(canvas=self.wanted_canvas))
-        self.wanted_canvas.bind("<Configure>", self._on_canvas_resize(canvas=self.wanted_canvas,frame_id=self.wanted_frame_id))
-
         # Cache for loaded images
         self.image_cache_wanted = {}
 
-        # Load and display inventory items inside the canvas (with scrollbar applied)
-        self.load_wanted_with_images()
+        # Search and filter fields above the grid
+        self.create_filter_bar(self.wanted_tab, "wanted")
+
+        # Create a virtualized grid to display items, only the visible tiles are built
+        self.wanted_grid = VirtualGrid(
+            self.wanted_tab,
+            image_loader=lambda item, owner, on_ready, priority: self._load_tile_image(
+                item, owner, on_ready, priority, self.image_cache_wanted),
+            on_click=self.on_wanted_item_click,
+            cancel_image=self._cancel_thumbnail
+        )
+        self.wanted_grid.pack(fill=tk.BOTH, expand=True)
 
         # Create a separate frame for the form outside the canvas to prevent it from being affected by the scroll
         self.wanted_form_frame = ttk.Frame(self.wanted_tab)
@@ -281,40 +412,17 @@ class CollectionApp:
         # Load the add or update inventory form
         self.add_update_wanted_form()
 
-    def load_wanted_with_images(self):
-        for widget in self.wanted_frame.winfo_children():
-            widget.destroy()  # Clear existing items in the inventory display
-
-        items = self.tracker.get_wanted_items()
-        for index, item in enumerate(items):
-            # Create a frame for each item
-            item_frame = ttk.Frame(self.wanted_frame, borderwidth=2, relief=tk.GROOVE, padding=(9, 9))
-            item_frame.grid(row=index // 13, column=index % 13, padx=9, pady=9)
-
-            # Load image
-            if item.image_path and os.path.exists(item.image_path):
-                img = Image.open(item.image_path).resize((90, 90), Image.Resampling.LANCZOS)
-                photo = ImageTk.PhotoImage(img)
-                self.image_cache_wanted[item.image_path] = photo  # Store reference to prevent garbage collection
-                img_label = tk.Label(item_frame, image=photo)
-                img_label.pack()
-            else:
-                # Placeholder image
-                placeholder = Image.new("RGB", (90, 90), color="gray")
-                photo = ImageTk.PhotoImage(placeholder)
-                self.image_cache_wanted[f"placeholder_{index}"] = photo
-                img_label = tk.Label(item_frame, image=photo)
-                img_label.pack()
-
-            # Display name and year
-            wrapped_text = "\n".join(textwrap.wrap(item.name, width=15))  # Adjust width as needed
-            name_label = tk.Label(item_frame, text=wrapped_text, font=("Arial", 10, "bold"), justify=tk.CENTER)
-            name_label.pack()
-            year_label = tk.Label(item_frame, text=f"Year: {item.year}", font=("Arial", 10))
-            year_label.pack()
-
-            # Bind a click event to the item frame
-            item_frame.bind("<Button-1>", lambda event, item=item: self.on_wanted_item_click(item))
+    def load_wanted_with_images(self, then=None):
+        """
+        Reload the wanted grid in the background, see load_inventory_with_images.
+        """
+        def show(result):
+            self._show_indexed("wanted")
+            if then is not None:
+                then()
+
+        self.tasks.submit(lambda: self._reindex("wanted", self.tracker.get_wanted_items()),
+                          label="Loading the wanted items", key="wanted", on_done=show)
 
     def on_wanted_item_click(self, item):
         """
@@ -385,45 +493,73 @@ class CollectionApp:
             image_path=self.wanted_image_path.get(),
             year=self.wanted_year.get()
         )
-        self.tracker.add_wanted_item(item)
-        #self.wanted_tree.insert('', 'end', values=(item.name, item.category, item.quantity, item.price, item.image_path, item.year))
+        self.tasks.submit(self.tracker.add_wanted_item, item, label=f"Adding '{item.name}'", serial=True,
+                          on_done=self._then(self.load_wanted_with_images))
 
     def remove_wanted_item(self):
-        selected_item = self.wanted_tree.selection()[0]
-        item_name = self.wanted_tree.item(selected_item, 'values')[0]
-        self.tracker.remove_wanted_item(item_name)
-        self.wanted_tree.delete(selected_item)
+        # The item selected in the grid, whose name the click put in the form
+        item_name = self.wanted_name.get()
+        if item_name:
+            self.tasks.submit(self.tracker.remove_wanted_item, item_name, label=f"Removing '{item_name}'",
+                              serial=True, on_done=self._then(self.load_wanted_with_images))
 
     def update_wanted_item_price(self):
-        selected_item = self.wanted_tree.selection()[0]
-        item_name = self.wanted_tree.item(selected_item, 'values')[0]
-        new_price = self.tracker.update_wanted_item_price(item_name)
-        self.wanted_tree.item(selected_item, values=(item_name, self.wanted_category.get(), self.wanted_quantity.get(), new_price, self.wanted_image_path.get(), self.wanted_year.get()))
+        item_name = self.wanted_name.get()
+        if not item_name:
+            return
+
+        def show(new_price):
+            if new_price is None:
+                print(f"No price found for '{item_name}'")
+                return
+            if self.wanted_name.get() == item_name:
+                self.wanted_price.delete(0, tk.END)
+                self.wanted_price.insert(0, str(new_price))
+            self.load_wanted_with_images()
+
+        # Scraping can take seconds, a second click on the same item while it runs is coalesced
+        self.tasks.submit(self.tracker.update_wanted_item_price, item_name, label=f"Checking the price of '{item_name}'",
+                          key=("price", item_name), on_done=show)
 
     def move_wanted_to_inventory(self):
         selected_item = self.wanted_name.get()
-        item = self.tracker.get_wanted_item_by_name(selected_item)  # Fetch the item by name from the tracker or database
 
-        # Update the item with new data from the form
-        if item:
-            item.name = self.wanted_name.get()
-            item.category = self.wanted_category.get()
-            item.quantity = int(self.wanted_quantity.get())
-            item.price = float(self.wanted_price.get())
-            item.image_path = self.wanted_image_path.get()
-            item.year = self.wanted_year.get()
-            item.location = self.wanted_location.get()
-
-            # Add item back to database
-            self.tracker.add_item_inventory(item)
-
-            # Save the updated item back to the tracker or database
-            self.tracker.remove_item_wanted(item)
-
-            # Optionally, refresh the displayed inventory
+        # Read the form on the main thread, the worker only talks to the database
+        values = {
+            "name": self.wanted_name.get(),
+            "category": self.wanted_category.get(),
+            "quantity": int(self.wanted_quantity.get()),
+            "price": float(self.wanted_price.get()),
+            "image_path": self.wanted_image_path.get(),
+            "year": self.wanted_year.get(),
+            "location": self.wanted_location.get(),
+        }
+
+        def move():
+            item = self.tracker.get_wanted_item_by_name(selected_item)  # Fetch the item by name from the tracker or database
+            if not item:
+                return False
+
+            # Update the item with new data from the form
+            for field, value in values.items():
+                setattr(item, field, value)
+
+            # Drop the item from the wanted list and add it to the inventory in one commit,
+            # removing first while item.id still holds the wanted row's id
+            with self.tracker.transaction():
+                self.tracker.remove_item_wanted(item)
+                self.tracker.add_item_inventory(item)
+            return True
+
+        def moved(found):
+            if not found:
+                print("Error")
+                return
+            # Refresh both grids, only the moved item's tiles are touched
             self.load_wanted_with_images()
-        else:
-            print("Error")
+            self.load_inventory_with_images()
+
+        self.tasks.submit(move, label=f"Moving '{selected_item}' to the inventory", serial=True, on_done=moved)
 
     """
     SELLING ITEMS
@@ -434,8 +570,6 @@ class CollectionApp:
             self.sell_tree.heading(col, text=col)
         self.sell_tree.pack(fill=tk.BOTH, expand=True)
 
-        self.load_sell_items()
-
         self.sell_form = ttk.Frame(self.sell_tab)
         self.sell_form.pack(fill=tk.X)
 
@@ -473,11 +607,20 @@ class CollectionApp:
 
         ttk.Button(self.sell_form, text="Add Sell Item", command=self.add_sell_item).pack(side=tk.LEFT)
         ttk.Button(self.sell_form, text="Remove Sell Item", command=self.remove_sell_item).pack(side=tk.LEFT)
-        ttk.Button(self.sell_form, text="Check Sell Item Price", command=self.check_sell_item_price).pack(side=tk.LEFT)
+        ttk.Button(self.sell_form, text="Check Price Alerts", command=self.check_price_alerts).pack(side=tk.LEFT)
 
-    def load_sell_items(self):
-        for item, threshold in self.tracker.get_sell_items():
-            self.sell_tree.insert('', 'end', values=(item.name, item.category, item.quantity, item.price, item.image_path, item.year, item.location, threshold))
+    def load_sell_items(self, then=None):
+        """
+        Reload the sell list in the background, see load_inventory_with_images.
+        """
+        def show(items):
+            self.sell_tree.delete(*self.sell_tree.get_children())
+            for item, threshold in items:
+                self.sell_tree.insert('', 'end', values=(item.name, item.category, item.quantity, item.price, item.image_path, item.year, item.location, threshold))
+            if then is not None:
+                then()
+
+        self.tasks.submit(self.tracker.get_sell_items, label="Loading the sell items", key="sell", on_done=show)
 
 
     def add_sell_item(self):
@@ -491,17 +634,38 @@ class CollectionApp:
             location=self.sell_location.get()
         )
         threshold = float(self.sell_threshold.get())
-        self.tracker.add_sell_item(item, threshold)
-        self.sell_tree.insert('', 'end', values=(item.name, item.category, item.quantity, item.price, item.image_path, item.year, item.location, threshold))
+
+        def added(item_id):
+            self.sell_tree.insert('', 'end', values=(item.name, item.category, item.quantity, item.price, item.image_path, item.year, item.location, threshold))
+
+        self.tasks.submit(self.tracker.add_sell_item, item, threshold, label=f"Adding '{item.name}'", serial=True,
+                          on_done=added)
 
     def remove_sell_item(self):
         selected_item = self.sell_tree.selection()[0]
         item_name = self.sell_tree.item(selected_item, 'values')[0]
-        self.tracker.remove_sell_item(item_name)
-        self.sell_tree.delete(selected_item)
 
-    def check_sell_item_price(self):
-        selected_item = self.sell_tree.selection()[0]
-        item_name = self.sell_tree.item(selected_item, 'values')[0]
-        current_price = self.tracker.check_sell_item_price(item_name)
-        self.sell_tree.item(selected_item, values=(item_name, self.sell_category.get(), self.sell_quantity.get(), current_price, self.sell_image_path.get(), self.sell_year.get(), self.sell_location.get(), self.sell_threshold.get()))
\ No newline at end of file
+        def removed(result):
+            if self.sell_tree.exists(selected_item):
+                self.sell_tree.delete(selected_item)
+
+        self.tasks.submit(self.tracker.remove_sell_item, item_name, label=f"Removing '{item_name}'", serial=True,
+                          on_done=removed)
+
+    def check_price_alerts(self):
+        def show(alerts):
+            if alerts:
+                messagebox.showinfo("Price Alerts", "\n".join(str(alert) for alert in alerts))
+            else:
+                messagebox.showinfo("Price Alerts", "No new price alerts.")
+
+        # Every sell threshold and wanted target price is checked in one query, against the stored prices
+        self.tasks.submit(self.tracker.check_alerts, label="Checking price alerts", key="alerts", on_done=show)
+
+
+def _year(text):
+    # Year filter bound typed by the user, None when empty or not a number yet
+    try:
+        return int(text.strip())
+    except ValueError:
+        return None
@@ -4,29 +4,45 @@ collection_item.py
 Defines the CollectionItem class to represent items in the collection.
 """
 
+from decimal import Decimal
+
+
 class CollectionItem:
-    def __init__(self, name, category, quantity, price, image_path=None, year=None, location=None, model=None, website=None):
+    # Fixed attribute set: no per-instance __dict__, which matters when a whole table is loaded
+    __slots__ = ("name", "category", "quantity", "price", "image_path", "year", "location", "model", "website", "id")
+
+    def __init__(self, name, category, quantity, price, image_path=None, year=None, location=None, model=None, website=None, id=None):
         """
         Initialize a CollectionItem instance.
 
         :param name: Name of the item
         :param category: Category of the item
-        :param quantity: Quantity of the item
-        :param price: Price of the item
+        :param quantity: Quantity of the item, stored as an int
+        :param price: Price of the item, stored as a Decimal
         :param image_path: Path to the image file of the item
+        :param year: Year of the item, stored as an int; None or "" when unknown
+        :param id: Primary key of the item's row, None until the item is stored
         """
         self.name = name
         self.category = category
-        self.quantity = quantity
-        self.price = price
+        self.quantity = int(quantity) if quantity is not None else None
+        self.price = _to_decimal(price)
         self.image_path = image_path
-        self.year = year
+        self.year = int(year) if year not in (None, "") else None
         self.location = location
         self.model = model
         self.website = website
+        self.id = id
 
     def __repr__(self):
         """
         Return a string representation of the CollectionItem instance.
         """
         return f"{self.name} ({self.category}): {self.quantity} @ ${self.price}, Image: {self.image_path or 'None'}, Year: {self.year or 'None'}, Location: {self.location or 'None'}, Model: {self.model or 'None'}, Website: {self.website or 'None'}"
+
+
+def _to_decimal(price):
+    if price is None or isinstance(price, Decimal):
+        return price
+    # Going through str keeps 19.99 from becoming 19.989999999999998436805981327779591083526611328125
+    return Decimal(str(price))
@@ -6,183 +6,1026 @@ Manages the collection inventory, wanted items, and items to sell using a Postgr
 # collection_tracker.py
 
 import psycopg2
+import psycopg2.extras
+import psycopg2.pool
+import itertools
 import os
+import re
+import select
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
+from alert import Alert
 from collection_item import CollectionItem
+from item_table import ItemTable
+from price_history import RESOLUTION_SECONDS, PriceSeries, bucket_origin
+from read_cache import MISSING, ReadCache
+from price_scraper import get_price
+from tracker_base import (DEFAULT_ALERT_COOLDOWN, DEFAULT_PRICE_SOURCE, ITEM_COLUMNS, ITEM_TABLES, ITER_SIZE, LAST_KEY,
+                          PRICE_TABLES, ROLLUP_POLICY, SEARCH_LIMIT, SORT_KEY, SYNC_TABLES, Tracker)
 
 load_dotenv()
 
-class CollectionTracker:
-    def __init__(self, host, user, password, database, port=5432):
-        self.conn = psycopg2.connect(
-            dbname=database,
-            user=user,
-            password=password,
-            host=host,
-            port=port
-        )
-        self.cur = self.conn.cursor()
+# Rows sent per multi-row statement by the bulk methods
+BULK_CHUNK_SIZE = 1000
+
+# Channel the triggers of migration 0004 notify with the name of the changed table
+CHANGE_CHANNEL = "collection_changes"
+
+# Seconds the change listener waits before reconnecting after losing its connection
+LISTEN_RETRY_INTERVAL = 5
+
+class CollectionTracker(Tracker):
+    def __init__(self, host, user, password, database, port=5432, min_connections=1, max_connections=10,
+                 health_check_interval=30, chunk_size=BULK_CHUNK_SIZE, prepare_statements=True, cache_reads=True,
+                 listen_for_changes=True, idle_connections=None):
+        """
+        Initialize a CollectionTracker instance backed by a thread-safe connection pool.
+
+        :param min_connections: Number of connections opened up front
+        :param max_connections: Maximum number of connections open at once, callers beyond it wait for a free one
+        :param health_check_interval: Seconds a connection may sit idle before it is pinged on checkout
+        :param chunk_size: Default number of rows per statement for the bulk methods
+        :param prepare_statements: PREPARE the hot lookups once per connection instead of sending SQL text each call
+        :param cache_reads: Serve the get_* methods from an in-memory cache, invalidated by the tracker's writes
+        :param listen_for_changes: Also invalidate the cache on the change notifications of other clients
+        :param idle_connections: Number of returned connections kept open for reuse, defaults to max_connections
+        """
+        self.connect_args = dict(dbname=database, user=user, password=password, host=host, port=port)
+        self.pool = psycopg2.pool.ThreadedConnectionPool(min_connections, max_connections, **self.connect_args)
+        # psycopg2 closes a returned connection once minconn connections sit idle, which with the default of
+        # one made every concurrent checkout reconnect. minconn is only used for that after the connections
+        # opened up front, so raising it keeps the connections open without opening more at startup.
+        self.pool.minconn = max(min_connections, idle_connections if idle_connections is not None else max_connections)
+        self.pool_slots = threading.BoundedSemaphore(max_connections)
+        self.health_check_interval = health_check_interval
+        self.chunk_size = chunk_size
+        self.prepare_statements = prepare_statements
+
+        # State of each pooled connection: its backend pid, the names of the statements prepared on it and
+        # when it was last returned. Keyed by the connection itself, an id() could be reused by a new one.
+        self.connections = weakref.WeakKeyDictionary()
+        self.connections_lock = threading.Lock()
+
+        # Whether pg_trgm is installed for typo-tolerant search, checked on the first search()
+        self.trigram_search = None
+
+        # Connection of the transaction() block the current thread is in, if any
+        self.local = threading.local()
+        self.cursor_ids = itertools.count()
+
+        self.cache = ReadCache() if cache_reads else None
+        self.listener = None
+        self.listener_stop = threading.Event()
+        if self.cache is not None and listen_for_changes:
+            self.listener = threading.Thread(target=self._listen, name="tracker-change-listener", daemon=True)
+            self.listener.start()
+
+    def _getconn(self):
+        """
+        Check a healthy connection out of the pool, replacing connections that were dropped.
+        """
+        self.pool_slots.acquire()
+        try:
+            while True:
+                conn = self.pool.getconn()
+                if not conn.closed and not self._is_stale(conn):
+                    self._state(conn)
+                    return conn
+                self._forget(conn)
+                self.pool.putconn(conn, close=True)
+        except BaseException:
+            self.pool_slots.release()
+            raise
+
+    def _state(self, conn):
+        """
+        Return the tracked state of a pooled connection, starting to track it on first use.
+        """
+        with self.connections_lock:
+            state = self.connections.get(conn)
+            if state is None:
+                state = self.connections[conn] = {"pid": conn.get_backend_pid(), "prepared": set(), "last_used": 0}
+            return state
+
+    def _forget(self, conn):
+        with self.connections_lock:
+            self.connections.pop(conn, None)
+
+    def _is_stale(self, conn):
+        with self.connections_lock:
+            state = self.connections.get(conn)
+        if time.monotonic() - (state["last_used"] if state else 0) < self.health_check_interval:
+            return False
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return False
+        except psycopg2.Error:
+            return True
+
+    def _putconn(self, conn):
+        broken = bool(conn.closed)
+        if not broken:
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                broken = True
+        if not broken:
+            self._state(conn)["last_used"] = time.monotonic()
+        self.pool.putconn(conn, close=broken)
+        # The pool also closes healthy connections returned while enough others sit idle
+        if conn.closed:
+            self._forget(conn)
+        self.pool_slots.release()
+
+    @contextmanager
+    def _cursor(self, name=None, writes=None):
+        """
+        Yield a short-lived cursor on a pooled connection and commit when the block succeeds.
+
+        Inside a transaction() block the cursor runs on the transaction's connection and nothing is
+        committed until the block ends. A connection that breaks is discarded, the next call opens a fresh one.
+
+        :param name: Name for a server-side cursor, which streams rows instead of fetching them all at once
+        :param writes: Table the block modifies, its cached reads are dropped once the change is committed
+        """
+        conn = getattr(self.local, "conn", None)
+        if conn is not None:
+            with conn.cursor(name) as cur:
+                yield cur
+            if writes:
+                self.local.written.add(writes)
+            return
+
+        conn = self._getconn()
+        try:
+            with conn.cursor(name) as cur:
+                yield cur
+            conn.commit()
+            if writes and self.cache is not None:
+                self.cache.invalidate(writes)
+        finally:
+            self._putconn(conn)
+
+    def _cached(self, table, key, read):
+        """
+        Return read()'s rows for a table from the read cache, calling it on a miss.
+
+        Reads inside a transaction() block bypass the cache, they must see the block's uncommitted writes.
+        """
+        if self.cache is None or getattr(self.local, "conn", None) is not None:
+            return read()
+        rows = self.cache.get(table, key)
+        if rows is MISSING:
+            generation = self.cache.generation(table)
+            rows = read()
+            self.cache.put(table, key, rows, generation)
+        return rows
+
+    def cache_stats(self):
+        """
+        Return the read cache's size, hit ratio and invalidation counts, or None when caching is disabled.
+
+        Invalidations are counted by source: "local" for the tracker's own writes, "notify" for changes
+        notified by other clients and "reconnect" when the change listener reconnected and cleared the cache.
+        """
+        return self.cache.stats() if self.cache is not None else None
+
+    def _listen(self):
+        """
+        Invalidate the read cache on the change notifications sent by the triggers of migration 0004.
+
+        Runs in its own thread on a dedicated connection. After losing it, the listener reconnects and
+        clears the whole cache, since notifications sent in between were missed.
+        """
+        while not self.listener_stop.is_set():
+            conn = None
+            try:
+                conn = psycopg2.connect(**self.connect_args)
+                conn.autocommit = True
+                with conn.cursor() as cur:
+                    cur.execute(f"LISTEN {CHANGE_CHANNEL}")
+                self.cache.invalidate(source="reconnect")
+                while not self.listener_stop.is_set():
+                    if select.select([conn], [], [], 1.0) == ([], [], []):
+                        continue
+                    conn.poll()
+                    with self.connections_lock:
+                        own_pids = {state["pid"] for state in self.connections.values()}
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        # The tracker's own writes were already invalidated when they committed
+                        if notify.pid not in own_pids:
+                            self.cache.invalidate(notify.payload, source="notify")
+            except (psycopg2.Error, OSError) as e:
+                print(f"Change listener disconnected: {e}")
+                self.listener_stop.wait(LISTEN_RETRY_INTERVAL)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+    def _execute_prepared(self, cur, name, query, params):
+        """
+        Execute a parameterised query, preparing it on the cursor's connection the first time it is used.
+
+        Postgres then parses and plans the statement once per connection instead of on every call.
+
+        :param name: Statement name, unique per query text
+        :param query: Query with %s placeholders
+        """
+        if not self.prepare_statements:
+            cur.execute(query, params)
+            return
+
+        prepared = self._state(cur.connection)["prepared"]
+        if name not in prepared:
+            placeholders = itertools.count(1)
+            cur.execute(f"PREPARE {name} AS " + re.sub(r"%s", lambda _: f"${next(placeholders)}", query))
+            prepared.add(name)
+        if params:
+            cur.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(params))})", params)
+        else:
+            cur.execute(f"EXECUTE {name}")
+
+    @contextmanager
+    def transaction(self):
+        """
+        Group tracker operations into a single atomic commit.
+
+        Every tracker method called by this thread inside the block joins the transaction instead of
+        committing on its own. The transaction is committed when the block ends and rolled back if it
+        raises. Nested blocks join the outermost one.
+
+            with tracker.transaction():
+                tracker.add_item_inventory(item)
+                tracker.remove_item_wanted(item)
+        """
+        if getattr(self.local, "conn", None) is not None:
+            yield self
+            return
+
+        conn = self._getconn()
+        self.local.conn = conn
+        self.local.written = set()
+        try:
+            yield self
+            if conn.get_transaction_status() == psycopg2.extensions.TRANSACTION_STATUS_INERROR:
+                # A statement failed and its error was swallowed, committing would silently roll back
+                raise psycopg2.DatabaseError("Transaction aborted by an earlier error, rolled back")
+            conn.commit()
+            if self.cache is not None:
+                for table in self.local.written:
+                    self.cache.invalidate(table)
+        finally:
+            self.local.conn = None
+            self._putconn(conn)
 
     def add_item_inventory(self, item):
-        self.cur.execute("SELECT MAX(id) FROM inventory")
-        max_id = self.cur.fetchone()[0]  # Fetch the highest ID value
-        print(max_id)
-
-        self.cur.execute(
-            """
-            INSERT INTO inventory (id, name, category, quantity, price, image_path, year, location, model, website)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """,
-            (max_id+1, item.name, item.category, item.quantity, item.price, item.image_path, item.year, item.location, item.model, item.website)
-        )
-        self.conn.commit()
+        # The id comes from the table's sequence and is stored on the item
+        with self._cursor(writes="inventory") as cur:
+            cur.execute(
+                """
+                INSERT INTO inventory (name, category, quantity, price, image_path, year, location, model, website)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                RETURNING id
+                """,
+                (item.name, item.category, item.quantity, item.price, item.image_path, item.year, item.location, item.model, item.website)
+            )
+            item.id = cur.fetchone()[0]
+        return item.id
+
+    def add_items_inventory(self, items, chunk_size=None):
+        """
+        Insert many inventory items with multi-row INSERTs and a single commit.
+
+        :param items: Iterable of CollectionItem, each gets the id it was stored under
+        :param chunk_size: Rows per INSERT statement, defaults to the tracker's chunk_size
+        :return: List of the new ids, in the order of items
+        """
+        items = list(items)
+        if not items:
+            return []
+        with self._cursor(writes="inventory") as cur:
+            rows = psycopg2.extras.execute_values(
+                cur,
+                "INSERT INTO inventory (name, category, quantity, price, image_path, year, location, model, website) VALUES %s RETURNING id",
+                [(item.name, item.category, item.quantity, item.price, item.image_path, item.year, item.location,
+                  item.model, item.website) for item in items],
+                page_size=chunk_size or self.chunk_size,
+                fetch=True
+            )
+        for item, (item_id,) in zip(items, rows):
+            item.id = item_id
+        return [item.id for item in items]
+
+    def update_items(self, items, chunk_size=None):
+        """
+        Update many inventory items, matched by name, with multi-row UPDATEs and a single commit.
+
+        Like update_item, fields left as None keep their stored value.
+
+        :param items: Iterable of CollectionItem
+        :param chunk_size: Rows per UPDATE statement, defaults to the tracker's chunk_size
+        """
+        rows = [(item.name, item.quantity, item.price, item.image_path, item.year, item.location) for item in items]
+        if not rows:
+            return
+        with self._cursor(writes="inventory") as cur:
+            psycopg2.extras.execute_values(
+                cur,
+                """
+                UPDATE inventory AS t SET
+                    quantity = COALESCE(v.quantity, t.quantity),
+                    price = COALESCE(v.price, t.price),
+                    image_path = COALESCE(v.image_path, t.image_path),
+                    year = COALESCE(v.year, t.year),
+                    location = COALESCE(v.location, t.location)
+                FROM (VALUES %s) AS v(name, quantity, price, image_path, year, location)
+                WHERE t.name = v.name
+                """,
+                rows,
+                template="(%s, %s::int, %s::numeric, %s, %s::int, %s)",
+                page_size=chunk_size or self.chunk_size
+            )
 
     def remove_inventory_item_(self, item_name):
-        self.cur.execute("DELETE FROM inventory WHERE name = %s", (item_name,))
-        self.conn.commit()
+        with self._cursor(writes="inventory") as cur:
+            self._execute_prepared(cur, "remove_inventory_by_name", "DELETE FROM inventory WHERE name = %s", (item_name,))
     
+    def _remove_by_id(self, table, item_id):
+        with self._cursor(writes=table) as cur:
+            self._execute_prepared(cur, f"remove_{table}_by_id", f"DELETE FROM {table} WHERE id = %s", (item_id,))
+
     def remove_item_inventory(self, item):
         try:
-            # Call remove_item_ to delete the item from the database by name
-            self.remove_inventory_item_(item.name)
+            # Delete the item by primary key when it is known, by name otherwise
+            if item.id is not None:
+                self._remove_by_id("inventory", item.id)
+            else:
+                self.remove_inventory_item_(item.name)
             print(f"Item '{item.name}' removed successfully.")
         except Exception as e:
             print(f"Error removing item '{item.name}': {e}")
 
     def remove_item_wanted(self, item):
         try:
-            # Call remove_item_ to delete the item from the database by name
-            self.remove_wanted_item_(item.name)
+            # Delete the item by primary key when it is known, by name otherwise
+            if item.id is not None:
+                self._remove_by_id("wanted", item.id)
+            else:
+                self.remove_wanted_item_(item.name)
             print(f"Item '{item.name}' removed successfully.")
         except Exception as e:
             print(f"Error removing item '{item.name}': {e}")
 
     def remove_wanted_item_(self, item_name):
-        self.cur.execute("DELETE FROM wanted WHERE name = %s", (item_name,))
-        self.conn.commit()
+        with self._cursor(writes="wanted") as cur:
+            self._execute_prepared(cur, "remove_wanted_by_name", "DELETE FROM wanted WHERE name = %s", (item_name,))
 
     def get_inventory_item_by_name(self, name):
-        # Query the database for an item by its name
-        self.cur.execute("SELECT name, category, quantity, price, image_path, year, location FROM inventory WHERE name = %s", (name,))
-        row = self.cur.fetchone()
+        # Query the database for an item by its name, unless the lookup is cached
+        row = self._cached("inventory", ("by_name", name), lambda: self._fetch_by_name("inventory", name))
 
         # If the item exists, return it as a CollectionItem
         if row:
-            return CollectionItem(*row)
+            return CollectionItem(*row[1:], id=row[0])
         else:
             return None
 
     def get_wanted_item_by_name(self, name):
-        print(f"Received name {name}")
-        # Query the database for an item by its name
-        query = f"SELECT name, category, quantity, price, image_path, year, model, website FROM public.wanted WHERE name ='{name}'"
-        self.cur.execute(query)
-        row = self.cur.fetchone()
-        print(f"Query {query}")
+        # Query the database for an item by its name, unless the lookup is cached
+        row = self._cached("wanted", ("by_name", name), lambda: self._fetch_by_name("wanted", name))
+
         # If the item exists, return it as a CollectionItem
         if row:
-            return CollectionItem(*row)
+            return CollectionItem(*row[1:], id=row[0])
         else:
-            print(row)
             return None
 
+    def search(self, query, table="inventory", limit=SEARCH_LIMIT, offset=0):
+        """
+        Find the items whose name, model or category match a free-text query, best matches first.
+
+        Every word of the query matches as a prefix of a word through the full-text index of migration 0007,
+        name matches ranking above model and category matches. With pg_trgm installed, names, models and
+        categories resembling the query despite typos match too, ranked by similarity.
+
+        :param query: Words typed by the user
+        :param table: "inventory", "wanted" or "sell"
+        :param limit: Number of results per page
+        :param offset: Number of results to skip, for the following pages
+        :return: List of CollectionItem, or of (item, threshold) pairs for the sell table
+        """
+        if table not in ITEM_TABLES:
+            raise ValueError(f"Unknown item table '{table}'")
+        words = re.findall(r"\w+", query.lower())
+        if not words:
+            return []
+        rows = self._cached(table, ("search", " ".join(words), limit, offset),
+                            lambda: self._search(table, query.strip(), words, limit, offset))
+        if table == "sell":
+            return [(CollectionItem(*row[1:10], id=row[0]), row[10]) for row in rows]
+        return [CollectionItem(*row[1:], id=row[0]) for row in rows]
+
+    def _search(self, table, query, words, limit, offset):
+        if self.trigram_search is None:
+            self.trigram_search = bool(self._fetch_all("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'"))
+
+        # The words are quoted lexemes, so nothing the user types can break the tsquery syntax
+        params = {"tsquery": " & ".join(f"'{word}':*" for word in words), "query": query, "limit": limit,
+                  "offset": offset}
+        fuzzy_match = fuzzy_rank = ""
+        if self.trigram_search:
+            # <% is pg_trgm's word similarity operator, answered by the trigram indexes
+            fuzzy_match = "OR %(query)s <%% name OR %(query)s <%% model OR %(query)s <%% category"
+            fuzzy_rank = ("+ greatest(word_similarity(%(query)s, name), word_similarity(%(query)s, coalesce(model, '')), "
+                          "word_similarity(%(query)s, category))")
+        extra_columns = ", threshold" if table == "sell" else ""
+        with self._cursor() as cur:
+            cur.execute(
+                f"""
+                SELECT {ITEM_COLUMNS}{extra_columns}
+                FROM {table}
+                WHERE search_vector @@ to_tsquery('simple', %(tsquery)s) {fuzzy_match}
+                ORDER BY ts_rank_cd(search_vector, to_tsquery('simple', %(tsquery)s)) {fuzzy_rank} DESC, name, id
+                LIMIT %(limit)s OFFSET %(offset)s
+                """,
+                params
+            )
+            return cur.fetchall()
+
+    def _fetch_by_name(self, table, name):
+        with self._cursor() as cur:
+            self._execute_prepared(cur, f"{table}_by_name", f"SELECT {ITEM_COLUMNS} FROM {table} WHERE name = %s", (name,))
+            return cur.fetchone()
+
+    def _fetch_all(self, query):
+        with self._cursor() as cur:
+            cur.execute(query)
+            return cur.fetchall()
+
     def update_item(self, item):
-        query = "UPDATE inventory SET "
         fields = []
         values = []
-        print(f"item {item.name}")
 
-        # Check for each field and add it to the query and values list
+        # Check for each field and add it to the column list and values list
         if item.quantity is not None:
-            fields.append("quantity = %s")
+            fields.append("quantity")
             values.append(item.quantity)
         if item.price is not None:
-            fields.append("price = %s")
+            fields.append("price")
             values.append(item.price)
         if item.image_path is not None:
-            fields.append("image_path = %s")
+            fields.append("image_path")
             values.append(item.image_path)
         if item.year is not None:
-            fields.append("year = %s")
+            fields.append("year")
             values.append(item.year)
         if item.location is not None:
-            fields.append("location = %s")
+            fields.append("location")
             values.append(item.location)
+        if not fields:
+            return
+
+        # Address the row by primary key when it is known, by name otherwise
+        key = "id" if item.id is not None else "name"
+        values.append(item.id if item.id is not None else item.name)
 
-        # Combine the fields and values, then add the WHERE clause
-        query += ", ".join(fields)
-        query += " WHERE name = %s"
-        values.append(item.name)  # Add the item_name at the end to match the WHERE condition
+        # Each combination of fields is its own statement, prepared the first time it is used
+        query = f"UPDATE inventory SET {', '.join(f'{field} = %s' for field in fields)} WHERE {key} = %s"
+        with self._cursor(writes="inventory") as cur:
+            self._execute_prepared(cur, f"update_inventory_{'_'.join(fields)}_by_{key}", query, values)
 
-        # Execute the query
-        print(f"query {query}")
-        self.cur.execute(query, values)
-        self.conn.commit()
+    def get_inventory(self, as_table=False):
+        """
+        Return every inventory item ordered by category, year and name.
 
-    def get_inventory(self):
-        self.cur.execute("SELECT name, category, quantity, price, image_path, year, location FROM inventory ORDER BY category, year ASC, name")
-        rows = self.cur.fetchall()
-        return [CollectionItem(*row) for row in rows]
+        :param as_table: Return a columnar ItemTable instead of a list of CollectionItem
+        """
+        rows = self._cached("inventory", "all", lambda: self._fetch_all(
+            f"SELECT {ITEM_COLUMNS} FROM inventory ORDER BY category, year ASC, name"))
+        if as_table:
+            return ItemTable.from_rows(rows)
+        return [CollectionItem(*row[1:], id=row[0]) for row in rows]
 
     def add_wanted_item(self, item):
-        self.cur.execute(
-            """
-            INSERT INTO wanted_items (name, category, quantity, price, image_path, year)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-            """,
-            (item.name, item.category, item.quantity, item.price, item.image_path, item.year)
-        )
-        self.conn.commit()
+        with self._cursor(writes="wanted") as cur:
+            cur.execute(
+                """
+                INSERT INTO wanted (name, category, quantity, price, image_path, year)
+                VALUES (%s, %s, %s, %s, %s, %s)
+                RETURNING id
+                """,
+                (item.name, item.category, item.quantity, item.price, item.image_path, item.year)
+            )
+            item.id = cur.fetchone()[0]
+        return item.id
+
+    def add_wanted_items(self, items, chunk_size=None):
+        """
+        Insert many wanted items with multi-row INSERTs and a single commit.
+
+        :param items: Iterable of CollectionItem, each gets the id it was stored under
+        :param chunk_size: Rows per INSERT statement, defaults to the tracker's chunk_size
+        :return: List of the new ids, in the order of items
+        """
+        items = list(items)
+        if not items:
+            return []
+        with self._cursor(writes="wanted") as cur:
+            rows = psycopg2.extras.execute_values(
+                cur,
+                "INSERT INTO wanted (name, category, quantity, price, image_path, year) VALUES %s RETURNING id",
+                [(item.name, item.category, item.quantity, item.price, item.image_path, item.year) for item in items],
+                page_size=chunk_size or self.chunk_size,
+                fetch=True
+            )
+        for item, (item_id,) in zip(items, rows):
+            item.id = item_id
+        return [item.id for item in items]
 
     def remove_wanted_item(self, item_name):
-        self.cur.execute("DELETE FROM wanted_items WHERE name = %s", (item_name,))
-        self.conn.commit()
+        with self._cursor(writes="wanted") as cur:
+            self._execute_prepared(cur, "remove_wanted_by_name", "DELETE FROM wanted WHERE name = %s", (item_name,))
+
+    def get_wanted_items(self, as_table=False):
+        """
+        Return every wanted item.
 
-    def get_wanted_items(self):
-        self.cur.execute("SELECT name, category, quantity, price, image_path, year FROM wanted")
-        rows = self.cur.fetchall()
-        return [CollectionItem(*row) for row in rows]
+        :param as_table: Return a columnar ItemTable instead of a list of CollectionItem
+        """
+        rows = self._cached("wanted", "all", lambda: self._fetch_all(f"SELECT {ITEM_COLUMNS} FROM wanted"))
+        if as_table:
+            return ItemTable.from_rows(rows)
+        return [CollectionItem(*row[1:], id=row[0]) for row in rows]
 
     def update_wanted_item_price(self, item_name):
-        # Dummy implementation for price update from web scraping
-        # Replace this with actual scraping logic
-        new_price = 100.00  # Example new price
-        self.cur.execute("UPDATE wanted_items SET price = %s WHERE name = %s", (new_price, item_name))
-        self.conn.commit()
-        return new_price
+        # Scrape the current price and store it with its currency, keep the old price if none was found
+        listing = get_price(item_name)
+        if listing is None:
+            return None
+        with self._cursor(writes="wanted") as cur:
+            self._execute_prepared(cur, "update_wanted_price", "UPDATE wanted SET price = %s WHERE name = %s", (listing.price, item_name))
+            self._record_price(cur, "wanted", item_name, currency=listing.currency)
+        return listing.price
+
+    def update_prices(self, prices, table="wanted", chunk_size=None, source=DEFAULT_PRICE_SOURCE, currency="USD"):
+        """
+        Write many prices with multi-row UPDATEs and a single commit, appending each to the price history.
+
+        :param prices: Dictionary of item name to new price
+        :param table: One of PRICE_TABLES
+        :param chunk_size: Rows per UPDATE statement, defaults to the tracker's chunk_size
+        :param source: Where the prices come from, e.g. the host they were scraped from
+        :param currency: ISO 4217 code of the prices
+        """
+        if table not in PRICE_TABLES:
+            raise ValueError(f"Unknown price table '{table}'")
+        if not prices:
+            return
+        with self._cursor(writes=table) as cur:
+            psycopg2.extras.execute_values(
+                cur,
+                f"""
+                WITH updated AS (
+                    UPDATE {table} AS t SET price = v.price
+                    FROM (VALUES %s) AS v(name, price, source, currency)
+                    WHERE t.name = v.name
+                    RETURNING t.name, t.category, t.price, v.source, v.currency
+                )
+                INSERT INTO price_observations (item_name, category, source, price, currency)
+                SELECT name, category, source, price, currency FROM updated
+                """,
+                [(name, price, source, currency) for name, price in prices.items()],
+                template="(%s, %s::numeric, %s, %s)",
+                page_size=chunk_size or self.chunk_size
+            )
+
+    def roll_up_price_history(self, now=None, policy=ROLLUP_POLICY):
+        """
+        Downsample old price history following the rollup policy, in a single transaction.
+
+        Rolled-up rows are moved, not copied: each bucket keeps the min, max, sum, count and last price of
+        the data it replaced, so averages stay exact across resolutions. Buckets are aligned in UTC.
+
+        :param now: Time the ages of the policy are measured from, defaults to the current time
+        :return: Dictionary of resolution to the number of buckets written
+        """
+        now = now or datetime.now(timezone.utc)
+        merge = """
+            ON CONFLICT (resolution, item_name, source, currency, bucket_start) DO UPDATE SET
+                min_price = LEAST(price_rollups.min_price, EXCLUDED.min_price),
+                max_price = GREATEST(price_rollups.max_price, EXCLUDED.max_price),
+                sum_price = price_rollups.sum_price + EXCLUDED.sum_price,
+                count = price_rollups.count + EXCLUDED.count,
+                last_price = CASE WHEN EXCLUDED.last_at >= price_rollups.last_at
+                                  THEN EXCLUDED.last_price ELSE price_rollups.last_price END,
+                last_at = GREATEST(price_rollups.last_at, EXCLUDED.last_at)
+        """
+        rolled = {}
+        with self._cursor() as cur:
+            for step, (resolution, age) in enumerate(policy):
+                if step == 0:
+                    # Raw observations into the first resolution
+                    cur.execute(
+                        f"""
+                        WITH moved AS (
+                            DELETE FROM price_observations
+                            WHERE observed_at < date_trunc(%(resolution)s, %(cutoff)s::timestamptz, 'UTC')
+                            RETURNING item_name, category, source, currency, price, observed_at
+                        )
+                        INSERT INTO price_rollups (resolution, item_name, category, source, currency, bucket_start,
+                                                   min_price, max_price, sum_price, count, last_price, last_at)
+                        SELECT %(resolution)s, item_name, MAX(category), source, currency,
+                               date_trunc(%(resolution)s, observed_at, 'UTC'), MIN(price), MAX(price), SUM(price), COUNT(*),
+                               (array_agg(price ORDER BY observed_at DESC))[1], MAX(observed_at)
+                        FROM moved
+                        GROUP BY item_name, source, currency, date_trunc(%(resolution)s, observed_at, 'UTC')
+                        {merge}
+                        """,
+                        {"cutoff": now - age, "resolution": resolution}
+                    )
+                else:
+                    # Buckets of the previous resolution into coarser ones
+                    cur.execute(
+                        f"""
+                        WITH moved AS (
+                            DELETE FROM price_rollups
+                            WHERE resolution = %(previous)s
+                              AND bucket_start < date_trunc(%(resolution)s, %(cutoff)s::timestamptz, 'UTC')
+                            RETURNING *
+                        )
+                        INSERT INTO price_rollups (resolution, item_name, category, source, currency, bucket_start,
+                                                   min_price, max_price, sum_price, count, last_price, last_at)
+                        SELECT %(resolution)s, item_name, MAX(category), source, currency,
+                               date_trunc(%(resolution)s, bucket_start, 'UTC'), MIN(min_price), MAX(max_price), SUM(sum_price),
+                               SUM(count), (array_agg(last_price ORDER BY last_at DESC))[1], MAX(last_at)
+                        FROM moved
+                        GROUP BY item_name, source, currency, date_trunc(%(resolution)s, bucket_start, 'UTC')
+                        {merge}
+                        """,
+                        {"cutoff": now - age, "resolution": resolution,
+                         "previous": policy[step - 1][0]}
+                    )
+                rolled[resolution] = cur.rowcount
+        return rolled
+
+    def price_history(self, names=None, category=None, resolution="day", start=None, end=None):
+        """
+        Read the price history of many items as a PriceSeries, averaged per bucket of the given resolution.
+
+        Raw observations and rollups are read in one query that returns one row per item, so a year of
+        daily history for 10k items loads without a Python loop over observations. Buckets are in UTC.
+
+            series = tracker.price_history(category="Coins", resolution="week")
+            trends = series.summary(window=4)
+
+        :param names: Item names to read, None reads every item
+        :param category: Only read items of this category
+        :param resolution: One of "hour", "day" or "week"
+        :param start: Start of the history, defaults to a year before end
+        :param end: End of the history, defaults to the current time
+        """
+        if resolution not in RESOLUTION_SECONDS:
+            raise ValueError(f"Unknown resolution '{resolution}'")
+        end = end or datetime.now(timezone.utc)
+        start = start or end - timedelta(days=365)
+        step = RESOLUTION_SECONDS[resolution]
+        origin = bucket_origin(start.timestamp(), resolution)
+        buckets = (bucket_origin(end.timestamp(), resolution) - origin) // step + 1
+        filters = ""
+        if names is not None:
+            filters += " AND item_name = ANY(%(names)s)"
+        if category is not None:
+            filters += " AND category = %(category)s"
+        params = {"start": start, "end": end, "origin": origin, "step": step,
+                  "names": list(names) if names is not None else None, "category": category}
+
+        # One unsorted pass: the points of each item are collected into binary arrays and bucketed by
+        # PriceSeries in NumPy, which decodes them far faster than psycopg2 parses rows or array text
+        with self._cursor() as cur:
+            cur.execute("SET LOCAL work_mem = '256MB'")
+            cur.execute(
+                f"""
+                SELECT item_name, MAX(category),
+                       array_send(array_agg(floor((extract(epoch FROM at) - %(origin)s) / %(step)s)::int)),
+                       array_send(array_agg(total)), array_send(array_agg(n))
+                FROM (
+                    SELECT item_name, category, observed_at AS at, price::float8 AS total, 1 AS n
+                    FROM price_observations
+                    WHERE observed_at >= %(start)s AND observed_at < %(end)s{filters}
+                    UNION ALL
+                    SELECT item_name, category, bucket_start, sum_price::float8, count
+                    FROM price_rollups
+                    WHERE bucket_start >= %(start)s AND bucket_start < %(end)s{filters}
+                ) AS points
+                GROUP BY item_name
+                ORDER BY item_name
+                """,
+                params
+            )
+            rows = cur.fetchall()
+        return PriceSeries.from_arrays(rows, origin, resolution, buckets)
 
     def add_sell_item(self, item, threshold):
-        self.cur.execute(
-            """
-            INSERT INTO sell_items (name, category, quantity, price, image_path, year, location, threshold)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            """,
-            (item.name, item.category, item.quantity, item.price, item.image_path, item.year, item.location, threshold)
-        )
-        self.conn.commit()
+        with self._cursor(writes="sell") as cur:
+            cur.execute(
+                """
+                INSERT INTO sell (name, category, quantity, price, image_path, year, location, threshold)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                RETURNING id
+                """,
+                (item.name, item.category, item.quantity, item.price, item.image_path, item.year, item.location, threshold)
+            )
+            item.id = cur.fetchone()[0]
+        return item.id
+
+    def add_sell_items(self, items, chunk_size=None):
+        """
+        Insert many sell items with multi-row INSERTs and a single commit.
+
+        :param items: Iterable of (CollectionItem, threshold) pairs, as returned by get_sell_items
+        :param chunk_size: Rows per INSERT statement, defaults to the tracker's chunk_size
+        :return: List of the new ids, in the order of items
+        """
+        items = list(items)
+        if not items:
+            return []
+        with self._cursor(writes="sell") as cur:
+            rows = psycopg2.extras.execute_values(
+                cur,
+                "INSERT INTO sell (name, category, quantity, price, image_path, year, location, threshold) VALUES %s RETURNING id",
+                [(item.name, item.category, item.quantity, item.price, item.image_path, item.year, item.location, threshold)
+                 for item, threshold in items],
+                page_size=chunk_size or self.chunk_size,
+                fetch=True
+            )
+        for (item, _), (item_id,) in zip(items, rows):
+            item.id = item_id
+        return [item.id for item, _ in items]
 
     def remove_sell_item(self, item_name):
-        self.cur.execute("DELETE FROM sell_items WHERE name = %s", (item_name,))
-        self.conn.commit()
+        with self._cursor(writes="sell") as cur:
+            self._execute_prepared(cur, "remove_sell_by_name", "DELETE FROM sell WHERE name = %s", (item_name,))
 
-    def get_sell_items(self):
-        self.cur.execute("SELECT name, category, quantity, price, image_path, year, location, threshold FROM sell")
-        rows = self.cur.fetchall()
-        return [(CollectionItem(*row[:7]), row[7]) for row in rows]
+    def get_sell_items(self, as_table=False):
+        """
+        Return every sell item as an (item, threshold) pair.
+
+        :param as_table: Return a columnar ItemTable, with the thresholds in its extra["threshold"] column
+        """
+        rows = self._cached("sell", "all", lambda: self._fetch_all(f"SELECT {ITEM_COLUMNS}, threshold FROM sell"))
+        if as_table:
+            return ItemTable.from_rows(rows, extra_names=("threshold",))
+        return [(CollectionItem(*row[1:10], id=row[0]), row[10]) for row in rows]
 
     def check_sell_item_price(self, item_name):
-        # Dummy implementation for price check from web scraping
-        # Replace this with actual scraping logic
-        current_price = 150.00  # Example current price
-        return current_price
-
-    def update_sell_item_price(self, item_name, new_price):
-        self.cur.execute("UPDATE sell_items SET price = %s WHERE name = %s", (new_price, item_name))
-        self.conn.commit()
+        # Scrape the current market price as a Listing with its currency, None if it could not be found
+        return get_price(item_name)
+
+    def update_sell_item_price(self, item_name, new_price, source=DEFAULT_PRICE_SOURCE, currency="USD"):
+        with self._cursor(writes="sell") as cur:
+            self._execute_prepared(cur, "update_sell_price", "UPDATE sell SET price = %s WHERE name = %s", (new_price, item_name))
+            self._record_price(cur, "sell", item_name, source, currency)
+
+    def _record_price(self, cur, table, item_name, source=DEFAULT_PRICE_SOURCE, currency="USD"):
+        # Append the price just written to the history, in the same transaction as the write
+        self._execute_prepared(
+            cur,
+            f"record_{table}_price",
+            f"INSERT INTO price_observations (item_name, category, source, price, currency) "
+            f"SELECT name, category, %s, price, %s FROM {table} WHERE name = %s",
+            (source, currency, item_name)
+        )
     
+    def set_wanted_target_price(self, item_name, target_price):
+        """
+        Set the price at or below which check_alerts flags a wanted item, None disables its alert.
+        """
+        with self._cursor(writes="wanted") as cur:
+            cur.execute("UPDATE wanted SET target_price = %s WHERE name = %s", (target_price, item_name))
+
+    def check_alerts(self, cooldown=DEFAULT_ALERT_COOLDOWN, limit=None):
+        """
+        Evaluate every sell threshold and wanted target price in one query and record the new alerts.
+
+        A sell item alerts when its price reaches its threshold, a wanted item when its price falls to
+        its target price. An item raises no new alert within cooldown seconds of its last one, nor
+        afterwards while its price and target are unchanged since that alert.
+
+        :param cooldown: Seconds an item stays silent after an alert
+        :param limit: Maximum number of alerts raised by this call, the items furthest past their target first
+        :return: List of the new Alert objects
+        """
+        with self._cursor() as cur:
+            cur.execute(
+                """
+                WITH candidates AS (
+                    SELECT 'sell' AS kind, id AS item_id, name, price, threshold AS target,
+                           price / NULLIF(threshold, 0) AS strength
+                    FROM sell
+                    WHERE price >= threshold
+                    UNION ALL
+                    SELECT 'wanted', id, name, price, target_price, target_price / NULLIF(price, 0)
+                    FROM wanted
+                    WHERE target_price IS NOT NULL AND price <= target_price
+                ), latest AS (
+                    SELECT DISTINCT ON (kind, item_id) kind, item_id, price, target, created_at
+                    FROM alerts
+                    ORDER BY kind, item_id, created_at DESC
+                )
+                INSERT INTO alerts (kind, item_id, item_name, price, target)
+                SELECT c.kind, c.item_id, c.name, c.price, c.target
+                FROM candidates AS c
+                LEFT JOIN latest AS l ON l.kind = c.kind AND l.item_id = c.item_id
+                WHERE l.item_id IS NULL
+                   OR (l.created_at < now() - %s * interval '1 second'
+                       AND (l.price, l.target) IS DISTINCT FROM (c.price, c.target))
+                ORDER BY c.strength DESC NULLS LAST
+                LIMIT %s
+                RETURNING id, kind, item_id, item_name, price, target, created_at
+                """,
+                (cooldown, limit)
+            )
+            return [Alert(*row) for row in cur.fetchall()]
+
+    def get_alerts(self, include_acknowledged=False, limit=100):
+        """
+        Return the most recent alerts, newest first.
+        """
+        with self._cursor() as cur:
+            cur.execute(
+                f"""
+                SELECT id, kind, item_id, item_name, price, target, created_at FROM alerts
+                {"" if include_acknowledged else "WHERE NOT acknowledged"}
+                ORDER BY created_at DESC LIMIT %s
+                """,
+                (limit,)
+            )
+            return [Alert(*row) for row in cur.fetchall()]
+
+    def acknowledge_alerts(self, alert_ids):
+        """
+        Mark alerts as seen, get_alerts no longer returns them by default.
+        """
+        with self._cursor() as cur:
+            cur.execute("UPDATE alerts SET acknowledged = true WHERE id = ANY(%s)", (list(alert_ids),))
+
+    def _check_copy(self, table, columns):
+        # Table and column names are interpolated into the COPY statement
+        if table not in ITEM_TABLES:
+            raise ValueError(f"Unknown table '{table}'")
+        for column in columns:
+            if not re.match(r"^[a-z_]+$", column):
+                raise ValueError(f"Invalid column name '{column}'")
+
+    def copy_in(self, table, stream, columns):
+        """
+        Load CSV rows into a table with COPY FROM STDIN, streaming them from a file-like object.
+
+        :param stream: Object whose read(size) returns CSV text without a header, empty fields are NULL
+        :param columns: Columns of the CSV, in order
+        :return: Number of rows loaded
+        """
+        self._check_copy(table, columns)
+        with self._cursor(writes=table) as cur:
+            cur.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", stream)
+            return cur.rowcount
+
+    def copy_out(self, table, stream, columns, format="csv"):
+        """
+        Write every row of a table to a file-like object with COPY TO STDOUT, in id order.
+
+        :param stream: Object with a write(data) method
+        :param columns: Columns to export, in order
+        :param format: "csv" for CSV with a header line, "jsonl" for one JSON object per line
+        :return: Number of rows written
+        """
+        self._check_copy(table, columns)
+        query = f"SELECT {', '.join(columns)} FROM {table} ORDER BY id"
+        if format == "jsonl":
+            # CSV with a quote and delimiter that JSON text never contains outputs the JSON verbatim,
+            # the text format would escape its backslashes
+            query = f"COPY (SELECT row_to_json(t) FROM ({query}) AS t) TO STDOUT WITH (FORMAT csv, QUOTE E'\\x01', DELIMITER E'\\x02')"
+        elif format == "csv":
+            query = f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER)"
+        else:
+            raise ValueError(f"Unknown format '{format}'")
+        with self._cursor() as cur:
+            cur.copy_expert(query, stream)
+            return cur.rowcount
+
+    def _iter_rows(self, table, extra_columns="", itersize=None):
+        """
+        Stream the rows of a table through a server-side cursor, in SORT_KEY order.
+
+        The pooled connection is held until the generator is exhausted or closed.
+        """
+        with self._cursor(name=f"iter_{table}_{next(self.cursor_ids)}") as cur:
+            cur.itersize = itersize or ITER_SIZE
+            cur.execute(f"SELECT {ITEM_COLUMNS}{extra_columns} FROM {table} ORDER BY {SORT_KEY}")
+            yield from cur
+
+    def iter_rows(self, table, itersize=None):
+        """
+        Yield every row of one of SYNC_TABLES through a server-side cursor, in no particular order.
+
+        :param itersize: Rows fetched per round trip, defaults to ITER_SIZE
+        """
+        if table not in SYNC_TABLES:
+            raise ValueError(f"Unknown table '{table}'")
+        with self._cursor(name=f"rows_{table}_{next(self.cursor_ids)}") as cur:
+            cur.itersize = itersize or ITER_SIZE
+            cur.execute(f"SELECT {SYNC_TABLES[table]} FROM {table}")
+            yield from cur
+
+    def iter_inventory(self, itersize=None):
+        """
+        Yield every inventory item, fetching itersize rows per round trip so memory stays flat.
+
+        :param itersize: Rows fetched per round trip, defaults to ITER_SIZE
+        """
+        for row in self._iter_rows("inventory", itersize=itersize):
+            yield CollectionItem(*row[1:], id=row[0])
+
+    def iter_wanted_items(self, itersize=None):
+        """
+        Yield every wanted item, fetching itersize rows per round trip so memory stays flat.
+        """
+        for row in self._iter_rows("wanted", itersize=itersize):
+            yield CollectionItem(*row[1:], id=row[0])
+
+    def iter_sell_items(self, itersize=None):
+        """
+        Yield every sell item as an (item, threshold) pair, fetching itersize rows per round trip.
+        """
+        for row in self._iter_rows("sell", extra_columns=", threshold", itersize=itersize):
+            yield CollectionItem(*row[1:10], id=row[0]), row[10]
+
+    def _page(self, table, after, limit, extra_columns=""):
+        """
+        Fetch the rows following the key `after` in SORT_KEY order, using the keyset index instead of OFFSET.
+
+        :return: (rows, key of the last row, or None when there are no more rows)
+        """
+        with self._cursor() as cur:
+            if after is None:
+                cur.execute(f"SELECT {ITEM_COLUMNS}{extra_columns} FROM {table} ORDER BY {SORT_KEY} LIMIT %s", (limit,))
+            else:
+                category, year, name, *item_id = after
+                key = (category, LAST_KEY if year is None else year, name, item_id[0] if item_id else LAST_KEY)
+                cur.execute(
+                    f"SELECT {ITEM_COLUMNS}{extra_columns} FROM {table} WHERE ({SORT_KEY}) > (%s, %s, %s, %s) "
+                    f"ORDER BY {SORT_KEY} LIMIT %s",
+                    key + (limit,)
+                )
+            rows = cur.fetchall()
+        if len(rows) < limit:
+            return rows, None
+        last = rows[-1]
+        return rows, (last[2], last[6], last[1], last[0])
+
+    def inventory_page(self, after=None, limit=100):
+        """
+        Fetch one page of the inventory in get_inventory's order.
+
+            items, after = tracker.inventory_page(limit=100)
+            while after:
+                items, after = tracker.inventory_page(after=after, limit=100)
+
+        :param after: Key returned by the previous page, (category, year, name, id); a (category, year, name)
+            key skips every row sharing that name
+        :param limit: Number of items per page
+        :return: (items, key to pass as after for the next page, or None on the last page)
+        """
+        rows, after = self._page("inventory", after, limit)
+        return [CollectionItem(*row[1:], id=row[0]) for row in rows], after
+
+    def wanted_page(self, after=None, limit=100):
+        """
+        Fetch one page of the wanted items, see inventory_page.
+        """
+        rows, after = self._page("wanted", after, limit)
+        return [CollectionItem(*row[1:], id=row[0]) for row in rows], after
+
+    def sell_page(self, after=None, limit=100):
+        """
+        Fetch one page of the sell items as (item, threshold) pairs, see inventory_page.
+        """
+        rows, after = self._page("sell", after, limit, extra_columns=", threshold")
+        return [(CollectionItem(*row[1:10], id=row[0]), row[10]) for row in rows], after
+
     def close(self):
-        """Closes the database connection."""
-        if self.cur:
-            self.cur.close()
-        if self.conn:
-            self.conn.close()
\ No newline at end of file
+        """Stops the change listener and closes every pooled database connection."""
+        if self.listener is not None:
+            self.listener_stop.set()
+            self.listener.join()
+        if self.pool:
+            self.pool.closeall()
+            with self.connections_lock:
+                self.connections.clear()
@@ -0,0 +1,210 @@
+"""
+http_cache.py
+
+Defines the ResponseCache class, an on-disk SQLite cache of scraped pages with per-source TTLs,
+ETag/Last-Modified revalidation and negative caching of pages without a price.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "collector_tracker", "http_cache.sqlite3")
+DEFAULT_TTL = 6 * 60 * 60
+DEFAULT_NEGATIVE_TTL = 60 * 60
+
+
+def normalize_url(url):
+    """
+    Return a canonical form of a URL so equivalent queries share a cache entry.
+
+    The scheme and host are lowercased, default ports and the fragment are dropped and the query
+    parameters are sorted.
+    """
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = parts.hostname.lower() if parts.hostname else ""
+    if parts.port and (scheme, parts.port) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{parts.port}"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, parts.path or "/", query, ""))
+
+
+class CachedResponse:
+    def __init__(self, status, body, etag=None, last_modified=None, fetched_at=None, not_found=False):
+        """
+        Initialize a CachedResponse instance.
+
+        :param status: HTTP status of the response
+        :param body: Text of the response
+        :param etag: ETag header, used to revalidate the entry
+        :param last_modified: Last-Modified header, used to revalidate the entry
+        :param fetched_at: Time the response was last fetched or revalidated
+        :param not_found: Whether the page is known not to contain a price
+        """
+        self.status = status
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+        self.not_found = not_found
+
+
+class ResponseCache:
+    def __init__(self, path=None, default_ttl=DEFAULT_TTL, ttls=None, negative_ttl=DEFAULT_NEGATIVE_TTL):
+        """
+        Initialize a ResponseCache instance.
+
+        :param path: SQLite file the responses are stored in
+        :param default_ttl: Seconds a response is served without revalidation
+        :param ttls: Dictionary of host to TTL in seconds, overriding default_ttl for that source
+        :param negative_ttl: Seconds a "price not found" result is trusted
+        """
+        self.path = path or os.getenv("HTTP_CACHE_PATH") or DEFAULT_CACHE_PATH
+        self.default_ttl = default_ttl
+        self.ttls = dict(ttls or {})
+        self.negative_ttl = negative_ttl
+        self.stats_counts = {"hits": 0, "negative_hits": 0, "misses": 0, "revalidated": 0, "stale_served": 0}
+
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                status INTEGER NOT NULL,
+                body TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                not_found INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        self.conn.commit()
+
+    def ttl_for(self, url, not_found=False):
+        if not_found:
+            return self.negative_ttl
+        return self.ttls.get(urlsplit(url).hostname, self.default_ttl)
+
+    def get(self, url):
+        """
+        Return the stored response for a URL regardless of its age, or None.
+        """
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT status, body, etag, last_modified, fetched_at, not_found FROM responses WHERE url = ?",
+                (normalize_url(url),)
+            ).fetchone()
+        if row:
+            return CachedResponse(*row[:5], not_found=bool(row[5]))
+        return None
+
+    def put(self, url, response):
+        """
+        Store a response fetched with requests.
+        """
+        entry = CachedResponse(
+            response.status_code,
+            response.text,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            fetched_at=time.time(),
+            not_found=response.status_code == 404
+        )
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (url, status, body, etag, last_modified, fetched_at, not_found) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (normalize_url(url), entry.status, entry.body, entry.etag, entry.last_modified, entry.fetched_at,
+                 int(entry.not_found))
+            )
+            self.conn.commit()
+        return entry
+
+    def mark_not_found(self, url):
+        """
+        Record that the cached page for a URL holds no price, so it is skipped for negative_ttl.
+        """
+        with self.lock:
+            self.conn.execute("UPDATE responses SET not_found = 1 WHERE url = ?", (normalize_url(url),))
+            self.conn.commit()
+
+    def _touch(self, url):
+        with self.lock:
+            self.conn.execute("UPDATE responses SET fetched_at = ? WHERE url = ?", (time.time(), normalize_url(url)))
+            self.conn.commit()
+
+    def fetch(self, url, get):
+        """
+        Return the response for a URL, from the cache while it is fresh.
+
+        Stale entries are revalidated with If-None-Match / If-Modified-Since, so an unchanged page
+        costs a 304 instead of a full download. A stale entry is still served if the request fails.
+
+        :param url: URL to fetch
+        :param get: Callable taking (url, headers) and returning a requests response, or None on failure
+        :return: CachedResponse, or None if nothing could be fetched
+        """
+        entry = self.get(url)
+        now = time.time()
+        if entry and now - entry.fetched_at < self.ttl_for(url, entry.not_found):
+            self._count("negative_hits" if entry.not_found else "hits")
+            return entry
+
+        headers = {}
+        if entry and entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry and entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+
+        response = get(url, headers)
+        if response is None:
+            if entry:
+                self._count("stale_served")
+            return entry
+        if response.status_code == 304 and entry:
+            self._touch(url)
+            self._count("revalidated")
+            entry.fetched_at = now
+            return entry
+
+        self._count("misses")
+        if response.status_code in (200, 404):
+            return self.put(url, response)
+        return CachedResponse(response.status_code, response.text)
+
+    def _count(self, name):
+        with self.lock:
+            self.stats_counts[name] += 1
+
+    def stats(self):
+        """
+        Return the hit, miss and revalidation counts since the cache was opened, and the number of stored entries.
+        """
+        with self.lock:
+            stats = dict(self.stats_counts)
+            stats["entries"] = self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return stats
+
+    def purge(self, max_age=None):
+        """
+        Delete entries older than max_age seconds, or every entry if max_age is None.
+        """
+        with self.lock:
+            if max_age is None:
+                self.conn.execute("DELETE FROM responses")
+            else:
+                self.conn.execute("DELETE FROM responses WHERE fetched_at < ?", (time.time() - max_age,))
+            self.conn.commit()
+
+    def close(self):
+        """Closes the cache database."""
+        with self.lock:
+            self.conn.close()
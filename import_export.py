@@ -0,0 +1,309 @@
+"""
+import_export.py
+
+Streams items between CSV or JSONL files and the inventory, wanted and sell tables of the database
+configured in .env, in constant memory.
+
+    python import_export.py export inventory backup.csv
+    python import_export.py import inventory backup.csv --errors rejected.jsonl
+    python import_export.py import sell items.jsonl --strict
+
+The format follows the file extension (.csv or .jsonl) unless --format is given, and "-" reads stdin
+or writes stdout. Imports validate every row, report the invalid ones with their line number and load
+the valid ones with a single COPY.
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import time
+from decimal import Decimal, InvalidOperation
+from dotenv import load_dotenv
+from collection_tracker import CollectionTracker
+
+ITEM_FIELDS = ("name", "category", "quantity", "price", "image_path", "year", "location", "model", "website")
+
+# Columns imported and exported for each table, in file order
+COLUMNS = {
+    "inventory": ITEM_FIELDS,
+    "wanted": ITEM_FIELDS + ("target_price",),
+    "sell": ITEM_FIELDS + ("threshold",),
+}
+
+# Columns every row must have a value for
+REQUIRED = {"name", "category", "quantity", "price", "threshold"}
+
+# Largest value a DECIMAL(10, 2) column holds
+MAX_PRICE = Decimal("99999999.99")
+
+# Seconds between progress lines
+PROGRESS_INTERVAL = 1.0
+
+
+class RowError(ValueError):
+    pass
+
+
+def _text(value):
+    value = str(value).strip()
+    if len(value) > 255:
+        raise RowError("longer than 255 characters")
+    return value
+
+
+def _integer(value):
+    try:
+        number = int(str(value).strip())
+    except ValueError:
+        raise RowError(f"'{value}' is not a whole number")
+    if not -2147483648 <= number <= 2147483647:
+        raise RowError(f"{number} is out of range")
+    return number
+
+
+def _quantity(value):
+    number = _integer(value)
+    if number < 0:
+        raise RowError("must not be negative")
+    return number
+
+
+def _price(value):
+    try:
+        price = Decimal(str(value).strip().replace("$", "").replace(",", ""))
+    except InvalidOperation:
+        raise RowError(f"'{value}' is not a price")
+    if not price.is_finite() or price < 0 or price > MAX_PRICE:
+        raise RowError(f"{value} is out of range")
+    return price.quantize(Decimal("0.01"))
+
+
+PARSERS = {
+    "quantity": _quantity,
+    "price": _price,
+    "year": _integer,
+    "threshold": _price,
+    "target_price": _price,
+}
+
+
+def validate(row, columns):
+    """
+    Check and normalize one input row.
+
+    :param row: Dictionary of column name to raw value
+    :param columns: Columns of the target table
+    :return: List of the values in column order, None for empty optional values
+    :raises RowError: Naming the first invalid column
+    """
+    values = []
+    for column in columns:
+        value = row.get(column)
+        if value is None or (isinstance(value, str) and not value.strip()):
+            if column in REQUIRED:
+                raise RowError(f"{column}: missing")
+            values.append(None)
+            continue
+        try:
+            values.append(PARSERS.get(column, _text)(value))
+        except RowError as e:
+            raise RowError(f"{column}: {e}")
+    return values
+
+
+def read_rows(f, format):
+    """
+    Yield (line number, row dictionary) pairs from a CSV file with a header line or a JSONL file.
+    """
+    if format == "csv":
+        reader = csv.DictReader(f)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line_number, line in enumerate(f, 1):
+        if not line.strip():
+            continue
+        try:
+            # Prices are kept exact instead of going through float
+            row = json.loads(line, parse_float=Decimal)
+        except ValueError as e:
+            yield line_number, RowError(f"invalid JSON: {e}")
+            continue
+        yield line_number, row if isinstance(row, dict) else RowError("not a JSON object")
+
+
+class Progress:
+    """
+    Counts rows and prints the running total and throughput at most once per PROGRESS_INTERVAL.
+    """
+
+    def __init__(self, label, out=sys.stderr):
+        self.label = label
+        self.out = out
+        self.rows = 0
+        self.started = time.monotonic()
+        self.printed = self.started
+
+    def add(self, rows=1):
+        self.rows += rows
+        now = time.monotonic()
+        if now - self.printed >= PROGRESS_INTERVAL:
+            self.printed = now
+            self.report()
+
+    def report(self, final=False):
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        end = "\n" if final else "\r"
+        print(f"{self.label} {self.rows:,} rows in {elapsed:.1f}s ({self.rows / elapsed:,.0f} rows/s)",
+              end=end, file=self.out, flush=True)
+
+
+class CopyStream:
+    """
+    File-like object feeding validated rows to COPY FROM STDIN as CSV, converting them as COPY reads.
+
+    Only one read's worth of rows is held in memory, whatever the size of the input.
+    """
+
+    def __init__(self, rows, columns, on_error, progress):
+        """
+        :param rows: Iterable of (line number, row dictionary or RowError) pairs
+        :param columns: Columns of the target table
+        :param on_error: Called with (line number, message, row) for every invalid row
+        :param progress: Progress counting the valid rows
+        """
+        self.rows = iter(rows)
+        self.columns = columns
+        self.on_error = on_error
+        self.progress = progress
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer, lineterminator="\n")
+
+    def read(self, size=-1):
+        # Rows are converted until the buffer holds size characters, COPY then asks for the next chunk
+        for line_number, row in self.rows:
+            try:
+                if isinstance(row, RowError):
+                    raise row
+                self.writer.writerow(validate(row, self.columns))
+                self.progress.add()
+            except RowError as e:
+                self.on_error(line_number, str(e), row)
+            if 0 < size <= self.buffer.tell():
+                break
+        data = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return data
+
+
+class _ProgressWriter(io.TextIOBase):
+    # Passes COPY TO STDOUT output to a file, counting the lines as rows; being a text stream makes
+    # psycopg2 hand over decoded text rather than bytes
+    def __init__(self, f, progress):
+        self.f = f
+        self.progress = progress
+
+    def write(self, data):
+        self.f.write(data)
+        self.progress.add(data.count("\n"))
+        return len(data)
+
+
+def import_file(tracker, table, f, format, errors=None, strict=False):
+    """
+    Load a CSV or JSONL file into a table with a single COPY.
+
+    :param errors: File the invalid rows are written to as JSON lines, stderr when None
+    :param strict: Roll the whole import back if any row is invalid
+    :return: (rows loaded, rows rejected)
+    """
+    columns = COLUMNS[table]
+    progress = Progress(f"Imported into {table}:")
+    rejected = []
+
+    def on_error(line_number, message, row):
+        rejected.append(line_number)
+        if errors is not None:
+            errors.write(json.dumps({"line": line_number, "error": message,
+                                     "row": row if isinstance(row, dict) else None}, default=str) + "\n")
+        else:
+            print(f"Line {line_number}: {message}", file=sys.stderr)
+
+    stream = CopyStream(read_rows(f, format), columns, on_error, progress)
+    with tracker.transaction():
+        loaded = tracker.copy_in(table, stream, columns)
+        if strict and rejected:
+            raise RowError(f"{len(rejected)} invalid rows, nothing was imported")
+    progress.report(final=True)
+    return loaded, len(rejected)
+
+
+def export_file(tracker, table, f, format):
+    """
+    Write every row of a table to a CSV or JSONL file with COPY TO STDOUT.
+
+    :return: Number of rows written
+    """
+    progress = Progress(f"Exported from {table}:")
+    rows = tracker.copy_out(table, _ProgressWriter(f, progress), COLUMNS[table], format=format)
+    progress.rows = rows
+    progress.report(final=True)
+    return rows
+
+
+def _format_of(path, format):
+    if format:
+        return format
+    if path.endswith(".jsonl") or path.endswith(".ndjson"):
+        return "jsonl"
+    if path.endswith(".csv"):
+        return "csv"
+    raise SystemExit(f"Cannot tell the format of '{path}', pass --format csv or --format jsonl")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import or export collection items as CSV or JSONL.")
+    parser.add_argument("action", choices=("import", "export"))
+    parser.add_argument("table", choices=sorted(COLUMNS))
+    parser.add_argument("path", help="file to read or write, - for stdin or stdout")
+    parser.add_argument("--format", choices=("csv", "jsonl"), help="file format, defaults to the file extension")
+    parser.add_argument("--errors", help="write rejected rows to this JSONL file instead of stderr")
+    parser.add_argument("--strict", action="store_true", help="import nothing if any row is invalid")
+    args = parser.parse_args()
+    format = _format_of(args.path, args.format)
+
+    # Load environment variables from .env file
+    load_dotenv()
+    tracker = CollectionTracker(os.getenv("DB_HOST"), os.getenv("DB_USER"), os.getenv("DB_PASSWORD"),
+                                os.getenv("DB_NAME"), os.getenv("DB_PORT"), cache_reads=False)
+    errors = open(args.errors, "w") if args.errors else None
+    try:
+        if args.action == "export":
+            if args.path == "-":
+                export_file(tracker, args.table, sys.stdout, format)
+            else:
+                with open(args.path, "w", newline="") as f:
+                    export_file(tracker, args.table, f, format)
+            return
+
+        if args.path == "-":
+            loaded, rejected = import_file(tracker, args.table, sys.stdin, format, errors, args.strict)
+        else:
+            with open(args.path, newline="") as f:
+                loaded, rejected = import_file(tracker, args.table, f, format, errors, args.strict)
+        print(f"{loaded:,} rows imported, {rejected:,} rejected", file=sys.stderr)
+        if rejected:
+            sys.exit(1)
+    except RowError as e:
+        sys.exit(str(e))
+    finally:
+        if errors is not None:
+            errors.close()
+        tracker.close()
+
+if __name__ == "__main__":
+    main()
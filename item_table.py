@@ -0,0 +1,178 @@
+"""
+item_table.py
+
+Defines the ItemTable class, a columnar container holding a whole result set as parallel NumPy arrays,
+and ItemView, a lightweight view of one row that reads straight from those arrays.
+"""
+
+from decimal import Decimal
+import numpy as np
+from collection_item import CollectionItem
+
+# Stored in the year column for items without a year
+MISSING_YEAR = 0
+
+
+class ItemView:
+    """
+    One row of an ItemTable, exposing the same attributes as CollectionItem without copying the row.
+    """
+    __slots__ = ("table", "index")
+
+    def __init__(self, table, index):
+        self.table = table
+        self.index = index
+
+    @property
+    def id(self):
+        return int(self.table.ids[self.index])
+
+    @property
+    def name(self):
+        return self.table.names[self.index]
+
+    @property
+    def category(self):
+        return self.table.categories[self.index]
+
+    @property
+    def quantity(self):
+        return int(self.table.quantities[self.index])
+
+    @property
+    def price(self):
+        return Decimal(int(self.table.price_cents[self.index])).scaleb(-2)
+
+    @property
+    def image_path(self):
+        return self.table.image_paths[self.index]
+
+    @property
+    def year(self):
+        year = int(self.table.years[self.index])
+        return None if year == MISSING_YEAR else year
+
+    @property
+    def location(self):
+        return self.table.locations[self.index]
+
+    @property
+    def model(self):
+        return self.table.models[self.index]
+
+    @property
+    def website(self):
+        return self.table.websites[self.index]
+
+    def to_item(self):
+        """
+        Return a standalone CollectionItem copy of the row.
+        """
+        return CollectionItem(self.name, self.category, self.quantity, self.price, self.image_path, self.year,
+                              self.location, self.model, self.website, id=self.id)
+
+    def __repr__(self):
+        return repr(self.to_item())
+
+
+class ItemTable:
+    def __init__(self, ids, names, categories, quantities, price_cents, image_paths, years, locations, models,
+                 websites, extra=None):
+        """
+        Initialize an ItemTable instance from parallel columns of equal length.
+
+        Numeric columns are NumPy arrays (prices in integer cents, missing years as MISSING_YEAR), text
+        columns are NumPy object arrays.
+
+        :param extra: Dictionary of additional named columns, such as the sell threshold
+        """
+        self.ids = ids
+        self.names = names
+        self.categories = categories
+        self.quantities = quantities
+        self.price_cents = price_cents
+        self.image_paths = image_paths
+        self.years = years
+        self.locations = locations
+        self.models = models
+        self.websites = websites
+        self.extra = extra or {}
+
+    @classmethod
+    def from_rows(cls, rows, extra_names=()):
+        """
+        Build a table from database rows in ITEM_COLUMNS order, optionally followed by extra columns.
+
+        :param rows: Sequence of tuples (id, name, category, quantity, price, image_path, year, location, model, website, ...)
+        :param extra_names: Names of the columns following website
+        """
+        columns = list(zip(*rows)) if rows else [()] * (10 + len(extra_names))
+        ids, names, categories, quantities, prices, image_paths, years, locations, models, websites = columns[:10]
+        extra = {name: np.array([float(value) if value is not None else np.nan for value in column], dtype=np.float64)
+                 for name, column in zip(extra_names, columns[10:])}
+        return cls(
+            np.array(ids, dtype=np.int64),
+            np.array(names, dtype=object),
+            np.array(categories, dtype=object),
+            np.array([quantity or 0 for quantity in quantities], dtype=np.int64),
+            np.array([_cents(price) for price in prices], dtype=np.int64),
+            np.array(image_paths, dtype=object),
+            np.array([MISSING_YEAR if year is None else year for year in years], dtype=np.int32),
+            np.array(locations, dtype=object),
+            np.array(models, dtype=object),
+            np.array(websites, dtype=object),
+            extra
+        )
+
+    @classmethod
+    def from_items(cls, items):
+        """
+        Build a table from CollectionItem (or ItemView) objects.
+        """
+        return cls.from_rows([(item.id if item.id is not None else 0, item.name, item.category, item.quantity, item.price,
+                               item.image_path, item.year, item.location, item.model, item.website) for item in items])
+
+    @property
+    def prices(self):
+        """
+        Prices as a float64 array, for vectorized analytics.
+        """
+        return self.price_cents / 100
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield ItemView(self, index)
+
+    def __getitem__(self, key):
+        """
+        table[i] returns an ItemView of row i. table[slice] and table[mask] return a new ItemTable;
+        slices share the underlying arrays, boolean or index masks copy the selected rows.
+        """
+        if isinstance(key, (int, np.integer)):
+            if key < 0:
+                key += len(self)
+            if not 0 <= key < len(self):
+                raise IndexError("ItemTable index out of range")
+            return ItemView(self, key)
+        return ItemTable(
+            self.ids[key], self.names[key], self.categories[key], self.quantities[key], self.price_cents[key],
+            self.image_paths[key], self.years[key], self.locations[key], self.models[key], self.websites[key],
+            {name: column[key] for name, column in self.extra.items()}
+        )
+
+    def to_items(self):
+        """
+        Return the rows as a list of CollectionItem.
+        """
+        return [view.to_item() for view in self]
+
+
+def _cents(value):
+    if value is None:
+        return 0
+    if isinstance(value, float):
+        value = str(value)
+    return int((Decimal(value) * 100).to_integral_value())
@@ -2,17 +2,35 @@
 main.py
 
 Entry point for the Collection Tracker application.
+
+    python -m main           start the GUI
+    python -m main daemon    refresh prices continuously without a GUI
 """
 
+import time
+
+# Startup is timed from here, before anything heavier than the standard library is imported
+STARTED = time.perf_counter()
+
+import argparse
 import os
-import tkinter as tk
+import signal
 from dotenv import load_dotenv
-from collection_tracker import CollectionTracker
-from collection_app import CollectionApp
+from startup_timer import StartupTimer
 
-def main():
-    # Load environment variables from .env file
-    load_dotenv()
+def create_tracker():
+    """
+    Open the storage backend selected in .env.
+
+    :return: Tracker, a CollectionTracker or a SQLiteTracker
+    """
+    # DB_BACKEND=sqlite opens the embedded database at SQLITE_PATH instead of connecting to Postgres
+    if os.getenv("DB_BACKEND", "postgres").lower() == "sqlite":
+        from sqlite_tracker import SQLiteTracker
+        return SQLiteTracker(os.getenv("SQLITE_PATH"))
+
+    # Imported here so the SQLite backend does not pay for psycopg2, NumPy and the scraper at startup
+    from collection_tracker import CollectionTracker
 
     # Database connection parameters
     host = os.getenv("DB_HOST")
@@ -20,21 +38,71 @@ def main():
     password = os.getenv("DB_PASSWORD")
     database = os.getenv("DB_NAME")
     port = os.getenv("DB_PORT")
+    min_connections = int(os.getenv("DB_POOL_MIN", 1))
+    max_connections = int(os.getenv("DB_POOL_MAX", 10))
 
     # Initialize the collection tracker
-    tracker = CollectionTracker(host, user, password, database, port)
+    return CollectionTracker(host, user, password, database, port, min_connections, max_connections)
+
+def run_gui(tracker, timer):
+    with timer.phase("import gui"):
+        import tkinter as tk
+        from collection_app import CollectionApp
 
     # Initialize the tkinter root window
-    root = tk.Tk()
+    with timer.phase("window"):
+        root = tk.Tk()
 
-    # Create the CollectionApp with the tracker and root window
-    app = CollectionApp(root, tracker)
+    # Create the CollectionApp with the tracker and root window, it reports the startup phases
+    # once the first tab's items are shown
+    app = CollectionApp(root, tracker, timer)
 
     # Start the tkinter main loop
     root.mainloop()
 
-    # Close the database connection when the app is closed
-    tracker.close()
+    # Drop the background calls still queued, so the tracker can be closed
+    app.tasks.close()
+
+def run_daemon(tracker):
+    from http_cache import ResponseCache
+    from price_daemon import DEFAULT_REFRESH_INTERVAL, DEFAULT_REQUESTS_PER_HOUR, PriceDaemon
+    from price_engine import PriceEngine
+
+    engine = PriceEngine(cache=ResponseCache())
+    daemon = PriceDaemon(
+        tracker,
+        engine,
+        refresh_interval=float(os.getenv("DAEMON_REFRESH_INTERVAL", DEFAULT_REFRESH_INTERVAL)),
+        requests_per_hour=int(os.getenv("DAEMON_REQUESTS_PER_HOUR", DEFAULT_REQUESTS_PER_HOUR))
+    )
+
+    # Finish the current batch and save the schedule on Ctrl+C or a service manager's SIGTERM
+    signal.signal(signal.SIGINT, lambda signum, frame: daemon.stop())
+    signal.signal(signal.SIGTERM, lambda signum, frame: daemon.stop())
+    try:
+        daemon.run()
+    finally:
+        engine.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Track a collection's inventory, wanted items and items to sell.")
+    parser.add_argument("command", nargs="?", choices=("gui", "daemon"), default="gui",
+                        help="start the GUI (default) or the headless price-refresh daemon")
+    args = parser.parse_args()
+
+    # Load environment variables from .env file
+    load_dotenv()
+    timer = StartupTimer(STARTED)
+    with timer.phase("tracker"):
+        tracker = create_tracker()
+    try:
+        if args.command == "daemon":
+            run_daemon(tracker)
+        else:
+            run_gui(tracker, timer)
+    finally:
+        # Close the database connection when the app or daemon exits
+        tracker.close()
 
 if __name__ == "__main__":
     main()
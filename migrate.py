@@ -0,0 +1,126 @@
+"""
+migrate.py
+
+Applies the versioned SQL migrations in migrations/ to the database configured in .env.
+
+Each migration file is named <version>_<description>.sql and runs in its own transaction,
+together with the row recording it in schema_migrations.
+
+    python migrate.py             apply every pending migration
+    python migrate.py --status    list the migrations and whether they are applied
+    python migrate.py --target 1  apply pending migrations up to version 1
+"""
+
+import argparse
+import os
+import re
+import psycopg2
+from dotenv import load_dotenv
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+
+# Arbitrary key for pg_advisory_xact_lock, so two runners never apply the same migration
+MIGRATION_LOCK_ID = 7_320_114
+
+
+def load_migrations(migrations_dir=MIGRATIONS_DIR):
+    """
+    Return the migrations on disk as (version, name, path) tuples, ordered by version.
+    """
+    migrations = []
+    for filename in os.listdir(migrations_dir):
+        match = re.match(r"^(\d+)_(.+)\.sql$", filename)
+        if match:
+            migrations.append((int(match.group(1)), match.group(2), os.path.join(migrations_dir, filename)))
+    migrations.sort()
+    versions = [version for version, _, _ in migrations]
+    if len(versions) != len(set(versions)):
+        raise ValueError(f"Duplicate migration versions in {migrations_dir}")
+    return migrations
+
+
+def applied_versions(conn):
+    """
+    Return the set of migration versions already applied to the database.
+    """
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INT PRIMARY KEY,
+                name VARCHAR(255) NOT NULL,
+                applied_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
+            )
+            """
+        )
+        versions = _select_versions(cur)
+    conn.commit()
+    return versions
+
+
+def _select_versions(cur):
+    cur.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cur.fetchall()}
+
+
+def migrate(conn, target=None, migrations_dir=MIGRATIONS_DIR):
+    """
+    Apply every pending migration up to and including target.
+
+    :param conn: psycopg2 connection
+    :param target: Highest version to apply, None applies all
+    :return: List of the versions applied
+    """
+    applied_versions(conn)
+    applied = []
+    for version, name, path in load_migrations(migrations_dir):
+        if target is not None and version > target:
+            break
+        with open(path) as f:
+            sql = f.read()
+        with conn.cursor() as cur:
+            cur.execute("SELECT pg_advisory_xact_lock(%s)", (MIGRATION_LOCK_ID,))
+            if version in _select_versions(cur):
+                conn.commit()
+                continue
+            try:
+                cur.execute(sql)
+                cur.execute("INSERT INTO schema_migrations (version, name) VALUES (%s, %s)", (version, name))
+            except psycopg2.Error:
+                conn.rollback()
+                print(f"Migration {version:04d}_{name} failed, rolled back")
+                raise
+        conn.commit()
+        print(f"Applied migration {version:04d}_{name}")
+        applied.append(version)
+    return applied
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply the collection tracker's database migrations.")
+    parser.add_argument("--status", action="store_true", help="list migrations and whether they are applied")
+    parser.add_argument("--target", type=int, help="highest migration version to apply")
+    args = parser.parse_args()
+
+    # Load environment variables from .env file
+    load_dotenv()
+    conn = psycopg2.connect(
+        dbname=os.getenv("DB_NAME"),
+        user=os.getenv("DB_USER"),
+        password=os.getenv("DB_PASSWORD"),
+        host=os.getenv("DB_HOST"),
+        port=os.getenv("DB_PORT")
+    )
+    try:
+        done = applied_versions(conn)
+        if args.status:
+            for version, name, _ in load_migrations():
+                print(f"{version:04d}_{name}: {'applied' if version in done else 'pending'}")
+            return
+        if not migrate(conn, target=args.target):
+            print("Database schema is up to date")
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
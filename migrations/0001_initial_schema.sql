@@ -0,0 +1,72 @@
+-- Initial schema, matching the tables and columns CollectionTracker reads and writes.
+-- Databases created from the old tables.sql have wanted_items / sell_items, which are renamed in place.
+
+-- inventory table
+CREATE TABLE IF NOT EXISTS inventory (
+    id SERIAL PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    category VARCHAR(255) NOT NULL,
+    quantity INT NOT NULL,
+    price DECIMAL(10, 2) NOT NULL,
+    image_path VARCHAR(255),
+    year INT,
+    location VARCHAR(255),
+    model VARCHAR(255),
+    website VARCHAR(255)
+);
+
+-- wanted table
+DO $$
+BEGIN
+    IF to_regclass('wanted') IS NULL AND to_regclass('wanted_items') IS NOT NULL THEN
+        ALTER TABLE wanted_items RENAME TO wanted;
+    END IF;
+END
+$$;
+
+CREATE TABLE IF NOT EXISTS wanted (
+    id SERIAL PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    category VARCHAR(255) NOT NULL,
+    quantity INT NOT NULL,
+    price DECIMAL(10, 2) NOT NULL,
+    image_path VARCHAR(255),
+    year INT,
+    location VARCHAR(255),
+    model VARCHAR(255),
+    website VARCHAR(255)
+);
+
+-- sell table
+DO $$
+BEGIN
+    IF to_regclass('sell') IS NULL AND to_regclass('sell_items') IS NOT NULL THEN
+        ALTER TABLE sell_items RENAME TO sell;
+    END IF;
+END
+$$;
+
+CREATE TABLE IF NOT EXISTS sell (
+    id SERIAL PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    category VARCHAR(255) NOT NULL,
+    quantity INT NOT NULL,
+    price DECIMAL(10, 2) NOT NULL,
+    image_path VARCHAR(255),
+    year INT,
+    location VARCHAR(255),
+    model VARCHAR(255),
+    website VARCHAR(255),
+    threshold DECIMAL(10, 2) NOT NULL
+);
+
+-- Columns the code uses that the old tables.sql did not define
+ALTER TABLE inventory ADD COLUMN IF NOT EXISTS model VARCHAR(255), ADD COLUMN IF NOT EXISTS website VARCHAR(255);
+ALTER TABLE wanted ADD COLUMN IF NOT EXISTS location VARCHAR(255), ADD COLUMN IF NOT EXISTS model VARCHAR(255),
+    ADD COLUMN IF NOT EXISTS website VARCHAR(255);
+ALTER TABLE sell ADD COLUMN IF NOT EXISTS model VARCHAR(255), ADD COLUMN IF NOT EXISTS website VARCHAR(255);
+
+-- Databases filled while ids were assigned as MAX(id)+1: move each sequence past the highest stored id
+SELECT setval(pg_get_serial_sequence('inventory', 'id'), COALESCE(MAX(id), 0) + 1, false) FROM inventory;
+SELECT setval(pg_get_serial_sequence('wanted', 'id'), COALESCE(MAX(id), 0) + 1, false) FROM wanted;
+SELECT setval(pg_get_serial_sequence('sell', 'id'), COALESCE(MAX(id), 0) + 1, false) FROM sell;
@@ -0,0 +1,13 @@
+-- Indexes matching the tracker's access paths.
+
+-- get_*_by_name, remove_* and update_item / update_prices filter on name
+CREATE INDEX IF NOT EXISTS inventory_name_idx ON inventory (name);
+CREATE INDEX IF NOT EXISTS wanted_name_idx ON wanted (name);
+CREATE INDEX IF NOT EXISTS sell_name_idx ON sell (name);
+
+-- get_inventory orders by category, year, name; the leading column also serves category filters
+CREATE INDEX IF NOT EXISTS inventory_category_year_name_idx ON inventory (category, year, name);
+
+-- Category filters on the wanted and sell lists
+CREATE INDEX IF NOT EXISTS wanted_category_idx ON wanted (category);
+CREATE INDEX IF NOT EXISTS sell_category_idx ON sell (category);
@@ -0,0 +1,5 @@
+-- Indexes matching the sort key of the iter_* and *_page methods, so keyset pagination
+-- WHERE (category, COALESCE(year, 2147483647), name, id) > (...) is an index range scan.
+CREATE INDEX IF NOT EXISTS inventory_keyset_idx ON inventory (category, (COALESCE(year, 2147483647)), name, id);
+CREATE INDEX IF NOT EXISTS wanted_keyset_idx ON wanted (category, (COALESCE(year, 2147483647)), name, id);
+CREATE INDEX IF NOT EXISTS sell_keyset_idx ON sell (category, (COALESCE(year, 2147483647)), name, id);
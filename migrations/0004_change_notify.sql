@@ -0,0 +1,21 @@
+-- Notify listening trackers of every change to the item tables, so they drop their cached reads.
+-- The payload is the table name; notifications repeated within a transaction are folded into one.
+
+CREATE OR REPLACE FUNCTION notify_collection_change() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('collection_changes', TG_TABLE_NAME);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS inventory_notify_change ON inventory;
+CREATE TRIGGER inventory_notify_change AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON inventory
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_collection_change();
+
+DROP TRIGGER IF EXISTS wanted_notify_change ON wanted;
+CREATE TRIGGER wanted_notify_change AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON wanted
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_collection_change();
+
+DROP TRIGGER IF EXISTS sell_notify_change ON sell;
+CREATE TRIGGER sell_notify_change AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON sell
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_collection_change();
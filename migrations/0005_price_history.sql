@@ -0,0 +1,35 @@
+-- Price history: every scraped price is appended to price_observations, and old observations are rolled
+-- up into hourly, then daily, then weekly buckets in price_rollups by CollectionTracker.roll_up_price_history.
+
+CREATE TABLE IF NOT EXISTS price_observations (
+    id BIGSERIAL PRIMARY KEY,
+    item_name VARCHAR(255) NOT NULL,
+    category VARCHAR(255) NOT NULL,
+    source VARCHAR(255) NOT NULL,
+    price DECIMAL(10, 2) NOT NULL,
+    currency CHAR(3) NOT NULL DEFAULT 'USD',
+    observed_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
+);
+
+-- Range scans of the history reads and the rollup, and per-item lookups
+CREATE INDEX IF NOT EXISTS price_observations_observed_at_idx ON price_observations (observed_at);
+CREATE INDEX IF NOT EXISTS price_observations_item_idx ON price_observations (item_name, observed_at);
+
+CREATE TABLE IF NOT EXISTS price_rollups (
+    resolution VARCHAR(8) NOT NULL CHECK (resolution IN ('hour', 'day', 'week')),
+    item_name VARCHAR(255) NOT NULL,
+    category VARCHAR(255) NOT NULL,
+    source VARCHAR(255) NOT NULL,
+    currency CHAR(3) NOT NULL,
+    bucket_start TIMESTAMP WITH TIME ZONE NOT NULL,
+    min_price DECIMAL(10, 2) NOT NULL,
+    max_price DECIMAL(10, 2) NOT NULL,
+    sum_price DECIMAL(14, 2) NOT NULL,
+    count INT NOT NULL,
+    last_price DECIMAL(10, 2) NOT NULL,
+    last_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    PRIMARY KEY (resolution, item_name, source, currency, bucket_start)
+);
+
+CREATE INDEX IF NOT EXISTS price_rollups_bucket_start_idx ON price_rollups (bucket_start);
+CREATE INDEX IF NOT EXISTS price_rollups_item_idx ON price_rollups (item_name, bucket_start);
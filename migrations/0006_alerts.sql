@@ -0,0 +1,24 @@
+-- Price alerts raised by CollectionTracker.check_alerts after each price refresh.
+
+-- Price at or below which a wanted item is worth buying, NULL for no alert
+ALTER TABLE wanted ADD COLUMN IF NOT EXISTS target_price DECIMAL(10, 2);
+
+CREATE TABLE IF NOT EXISTS alerts (
+    id BIGSERIAL PRIMARY KEY,
+    kind VARCHAR(16) NOT NULL CHECK (kind IN ('sell', 'wanted')),
+    item_id INT NOT NULL,
+    item_name VARCHAR(255) NOT NULL,
+    price DECIMAL(10, 2) NOT NULL,
+    target DECIMAL(10, 2) NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+    acknowledged BOOLEAN NOT NULL DEFAULT false
+);
+
+-- The cooldown check looks up the latest alert of each item
+CREATE INDEX IF NOT EXISTS alerts_item_idx ON alerts (kind, item_id, created_at);
+
+-- Unacknowledged alerts, newest first
+CREATE INDEX IF NOT EXISTS alerts_pending_idx ON alerts (created_at) WHERE NOT acknowledged;
+
+-- Threshold scans only visit the rows that can trigger
+CREATE INDEX IF NOT EXISTS wanted_target_price_idx ON wanted (id) WHERE target_price IS NOT NULL;
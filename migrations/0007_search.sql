@@ -0,0 +1,44 @@
+-- Server-side search for CollectionTracker.search: a weighted full-text vector over name, model and
+-- category with a GIN index, plus pg_trgm indexes on the same columns for typo-tolerant matching.
+
+-- 'simple' keeps item names and model numbers as typed, without stemming or stop words
+ALTER TABLE inventory ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(model, '')), 'B') ||
+    setweight(to_tsvector('simple', coalesce(category, '')), 'C')
+) STORED;
+ALTER TABLE wanted ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(model, '')), 'B') ||
+    setweight(to_tsvector('simple', coalesce(category, '')), 'C')
+) STORED;
+ALTER TABLE sell ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(model, '')), 'B') ||
+    setweight(to_tsvector('simple', coalesce(category, '')), 'C')
+) STORED;
+
+CREATE INDEX IF NOT EXISTS inventory_search_idx ON inventory USING gin (search_vector);
+CREATE INDEX IF NOT EXISTS wanted_search_idx ON wanted USING gin (search_vector);
+CREATE INDEX IF NOT EXISTS sell_search_idx ON sell USING gin (search_vector);
+
+-- pg_trgm ships with Postgres' contrib package, which some installations leave out. Without it search
+-- still works, through the full-text index alone, but misspelled words no longer match.
+DO $$
+DECLARE
+    tbl text;
+    col text;
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm') THEN
+        RAISE NOTICE 'pg_trgm is not available, search will not tolerate typos';
+        RETURN;
+    END IF;
+    CREATE EXTENSION IF NOT EXISTS pg_trgm;
+    FOREACH tbl IN ARRAY ARRAY['inventory', 'wanted', 'sell'] LOOP
+        FOREACH col IN ARRAY ARRAY['name', 'model', 'category'] LOOP
+            EXECUTE format('CREATE INDEX IF NOT EXISTS %I ON %I USING gin (%I gin_trgm_ops)',
+                           tbl || '_' || col || '_trgm_idx', tbl, col);
+        END LOOP;
+    END LOOP;
+END
+$$;
@@ -0,0 +1,277 @@
+"""
+price_daemon.py
+
+Defines the PriceDaemon class, the headless price refresher started with `python -m main daemon`.
+
+Every wanted and sell item sits in a priority queue ordered by when its price goes stale. Sell items
+close to their threshold go stale sooner, so they are refreshed first and more often. The most urgent
+items are fetched within a global request budget, and the schedule is saved after every batch so a
+restart resumes it instead of refetching every price.
+"""
+
+import heapq
+import json
+import os
+import threading
+import time
+
+DEFAULT_STATE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "collector_tracker", "daemon_state.json")
+
+# Seconds a price stays fresh for an item of importance 1
+DEFAULT_REFRESH_INTERVAL = 6 * 60 * 60
+
+# Requests the daemon may send per hour, across every item and site
+DEFAULT_REQUESTS_PER_HOUR = 600
+
+# Seconds between reloads of the item lists, to pick up added and removed items
+RESCAN_INTERVAL = 5 * 60
+
+# Retry delay after a failed fetch, doubled after each further failure up to MAX_RETRY_DELAY
+RETRY_DELAY = 15 * 60
+MAX_RETRY_DELAY = 24 * 60 * 60
+
+# Sell items within this fraction of their threshold gain importance, up to MAX_IMPORTANCE at the threshold
+THRESHOLD_MARGIN = 0.25
+MAX_IMPORTANCE = 8.0
+
+
+def importance(price, threshold):
+    """
+    Return how much more often than normal an item's price should be refreshed.
+
+    :param price: Last known price of the item
+    :param threshold: Sell threshold of the item, None for items without one
+    """
+    if price is None or not threshold:
+        return 1.0
+    distance = abs(float(price) - float(threshold)) / float(threshold)
+    return 1.0 + (MAX_IMPORTANCE - 1.0) * max(0.0, 1.0 - distance / THRESHOLD_MARGIN)
+
+
+class _Budget:
+    """
+    Token bucket holding the requests the daemon may still send, refilled continuously.
+    """
+
+    def __init__(self, requests_per_hour, burst=None):
+        self.rate = requests_per_hour / 3600.0
+        self.capacity = burst or max(1, requests_per_hour // 60)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+
+    def available(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return int(self.tokens)
+
+    def spend(self, count):
+        self.tokens -= count
+
+    def refund(self, count):
+        self.tokens = min(self.capacity, self.tokens + count)
+
+    def wait_time(self):
+        # Seconds until the next request may be sent
+        return max(0.0, (1 - self.tokens) / self.rate) if self.rate else float("inf")
+
+
+class PriceDaemon:
+    def __init__(self, tracker, engine, state_path=None, refresh_interval=DEFAULT_REFRESH_INTERVAL,
+                 requests_per_hour=DEFAULT_REQUESTS_PER_HOUR, batch_size=50, rescan_interval=RESCAN_INTERVAL):
+        """
+        Initialize a PriceDaemon instance.
+
+        :param tracker: CollectionTracker the items are read from and the prices written to
+        :param engine: PriceEngine fetching the prices
+        :param state_path: JSON file the schedule is persisted in
+        :param refresh_interval: Seconds a price stays fresh for an item of importance 1
+        :param requests_per_hour: Global request budget
+        :param batch_size: Maximum number of items fetched concurrently in one batch
+        :param rescan_interval: Seconds between reloads of the item lists
+        """
+        self.tracker = tracker
+        self.engine = engine
+        self.state_path = state_path or os.getenv("DAEMON_STATE_PATH") or DEFAULT_STATE_PATH
+        self.refresh_interval = refresh_interval
+        self.budget = _Budget(requests_per_hour)
+        self.batch_size = batch_size
+        self.rescan_interval = rescan_interval
+        self.stopped = threading.Event()
+        self.last_rescan = None
+
+        # Item name -> {"due", "last_fetched", "failures", "importance", "tables"}; the heap holds
+        # (due, name) pairs and entries whose due no longer matches the schedule are skipped when popped
+        self.schedule = {}
+        self.heap = []
+        self.load_state()
+
+    def load_state(self):
+        """
+        Restore the schedule saved by a previous run, if any.
+        """
+        try:
+            with open(self.state_path) as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable daemon state '{self.state_path}': {e}")
+            return
+        for name, entry in state.get("items", {}).items():
+            self.schedule[name] = {"due": entry["due"], "last_fetched": entry.get("last_fetched"),
+                                   "failures": entry.get("failures", 0), "importance": entry.get("importance", 1.0),
+                                   "tables": entry.get("tables", [])}
+            heapq.heappush(self.heap, (entry["due"], name))
+
+    def save_state(self):
+        """
+        Persist the schedule, replacing the previous file atomically so a crash never leaves it half written.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(self.state_path)), exist_ok=True)
+        temporary = f"{self.state_path}.tmp"
+        with open(temporary, "w") as f:
+            json.dump({"version": 1, "items": self.schedule}, f)
+        os.replace(temporary, self.state_path)
+
+    def _set_due(self, name, due):
+        self.schedule[name]["due"] = due
+        heapq.heappush(self.heap, (due, name))
+
+    def rescan(self, now=None):
+        """
+        Reload the wanted and sell items, scheduling new items at once and dropping removed ones.
+
+        Known items keep their last fetch time, only their importance and due time are updated.
+        """
+        now = now or time.time()
+        items = {}
+        for item in self.tracker.get_wanted_items():
+            items.setdefault(item.name, {"tables": set(), "importance": 1.0})["tables"].add("wanted")
+        for item, threshold in self.tracker.get_sell_items():
+            entry = items.setdefault(item.name, {"tables": set(), "importance": 1.0})
+            entry["tables"].add("sell")
+            entry["importance"] = max(entry["importance"], importance(item.price, threshold))
+
+        for name in set(self.schedule) - set(items):
+            del self.schedule[name]
+        for name, item in items.items():
+            entry = self.schedule.get(name)
+            if entry is None:
+                # Never fetched: due before any fetched item, the most important first
+                self.schedule[name] = {"due": None, "last_fetched": None, "failures": 0,
+                                       "importance": item["importance"], "tables": sorted(item["tables"])}
+                self._set_due(name, -item["importance"])
+                continue
+            entry["tables"] = sorted(item["tables"])
+            if entry["importance"] != item["importance"]:
+                entry["importance"] = item["importance"]
+                if entry["last_fetched"] is not None and not entry["failures"]:
+                    self._set_due(name, entry["last_fetched"] + self.refresh_interval / entry["importance"])
+        self.last_rescan = now
+
+    def _retry_later(self, name, now):
+        # Back off exponentially while an item keeps failing
+        entry = self.schedule[name]
+        entry["failures"] += 1
+        self._set_due(name, now + min(MAX_RETRY_DELAY, RETRY_DELAY * 2 ** (entry["failures"] - 1)))
+
+    def _pop_due(self, now, count):
+        names = []
+        while self.heap and len(names) < count and self.heap[0][0] <= now:
+            due, name = heapq.heappop(self.heap)
+            entry = self.schedule.get(name)
+            if entry is not None and entry["due"] == due and name not in names:
+                names.append(name)
+        return names
+
+    def next_due(self):
+        """
+        Return the time the next item goes stale, or None when nothing is scheduled.
+        """
+        while self.heap:
+            due, name = self.heap[0]
+            entry = self.schedule.get(name)
+            if entry is not None and entry["due"] == due:
+                return due
+            heapq.heappop(self.heap)
+        return None
+
+    def run_once(self, now=None):
+        """
+        Refresh the stale items the budget allows, most urgent first, and save the schedule.
+
+        :return: Number of items fetched
+        """
+        now = now or time.time()
+        if self.last_rescan is None or now - self.last_rescan >= self.rescan_interval:
+            self.rescan(now)
+
+        names = self._pop_due(now, min(self.batch_size, self.budget.available()))
+        if not names:
+            return 0
+        self.budget.spend(len(names))
+
+        # The batch is off the heap: if the fetch or the write fails, put it back before giving up
+        fetched = False
+        try:
+            prices = self.engine.fetch_prices(names)
+            fetched = True
+            self.engine.store(
+                self.tracker, prices,
+                [name for name in names if "wanted" in self.schedule[name]["tables"]],
+                [name for name in names if "sell" in self.schedule[name]["tables"]]
+            )
+        except Exception:
+            if not fetched:
+                self.budget.refund(len(names))
+            failed_at = time.time()
+            for name in names:
+                self._retry_later(name, failed_at)
+            self.save_state()
+            raise
+
+        fetched_at = time.time()
+        for name in names:
+            entry = self.schedule[name]
+            if prices.get(name) is None:
+                self._retry_later(name, fetched_at)
+            else:
+                entry["failures"] = 0
+                entry["last_fetched"] = fetched_at
+                self._set_due(name, fetched_at + self.refresh_interval / entry["importance"])
+        self.save_state()
+
+        found = sum(prices.get(name) is not None for name in names)
+        print(f"Refreshed {found}/{len(names)} prices, {len(self.schedule)} items scheduled")
+        return len(names)
+
+    def run(self):
+        """
+        Refresh prices until stop() is called.
+        """
+        print(f"Price daemon started, state in '{self.state_path}'")
+        while not self.stopped.is_set():
+            try:
+                if self.run_once():
+                    continue
+            except Exception as e:
+                # A database or network outage must not end the daemon, the next round retries
+                print(f"Price refresh failed: {e}")
+                self.stopped.wait(60)
+                continue
+
+            # Sleep until an item goes stale, the budget refills or the item lists are due for a reload
+            now = time.time()
+            next_due = self.next_due()
+            wait = self.rescan_interval - (now - self.last_rescan)
+            if next_due is not None:
+                wait = min(wait, max(next_due - now, self.budget.wait_time()))
+            self.stopped.wait(max(1.0, wait))
+        print("Price daemon stopped")
+
+    def stop(self):
+        """
+        Ask run() to return after the current batch.
+        """
+        self.stopped.set()
@@ -0,0 +1,204 @@
+"""
+price_engine.py
+
+Defines the PriceEngine class that refreshes the prices of all wanted and sell items concurrently.
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from http_cache import ResponseCache
+from price_scraper import build_search_url, fetch_cached_listing, parse_listing
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class _RateLimiter:
+    """
+    Spaces requests to one host so they never exceed the given rate.
+    """
+
+    def __init__(self, requests_per_second):
+        self.interval = 1.0 / requests_per_second if requests_per_second else 0.0
+        self.next_slot = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class PriceEngine:
+    def __init__(self, search_url=None, max_workers=32, per_host_limit=8, requests_per_second=10.0,
+                 timeout=10, retries=3, backoff=0.5, cache=None):
+        """
+        Initialize a PriceEngine instance.
+
+        :param search_url: URL template with a {query} placeholder, defaults to price_scraper.SEARCH_URL
+        :param max_workers: Number of requests in flight across all hosts
+        :param per_host_limit: Number of requests in flight against a single host
+        :param requests_per_second: Rate limit per host, 0 disables it
+        :param timeout: Seconds to wait for a response
+        :param retries: Number of retries after a failed request
+        :param backoff: Base delay in seconds, doubled after every failed attempt
+        :param cache: ResponseCache used to skip or revalidate recently fetched pages, None disables caching
+        """
+        self.search_url = search_url
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+        self.requests_per_second = requests_per_second
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.cache = cache
+
+        # One pooled keep-alive session shared by every worker
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.hosts = {}
+        self.hosts_lock = threading.Lock()
+
+    def _host_limits(self, url):
+        host = urlsplit(url).netloc
+        with self.hosts_lock:
+            if host not in self.hosts:
+                self.hosts[host] = (threading.BoundedSemaphore(self.per_host_limit),
+                                    _RateLimiter(self.requests_per_second))
+            return self.hosts[host]
+
+    def _retry_delay(self, attempt, response=None):
+        if response is not None and response.headers.get("Retry-After", "").isdigit():
+            return float(response.headers["Retry-After"])
+        return self.backoff * (2 ** attempt) * (1 + random.random() / 2)
+
+    def fetch(self, url, headers=None):
+        """
+        GET a URL within the per-host limits, retrying connection errors, timeouts and 429/5xx responses.
+
+        :param headers: Extra request headers, such as the conditional headers sent by the response cache
+        :return: The final response, or None if every attempt failed
+        """
+        semaphore, limiter = self._host_limits(url)
+        for attempt in range(self.retries + 1):
+            response = None
+            try:
+                with semaphore:
+                    limiter.wait()
+                    response = self.session.get(url, headers=headers, timeout=self.timeout)
+                if response.status_code not in RETRY_STATUSES:
+                    return response
+            except (requests.ConnectionError, requests.Timeout) as e:
+                print(f"Request to '{url}' failed: {e}")
+            if attempt < self.retries:
+                time.sleep(self._retry_delay(attempt, response))
+        return None
+
+    def fetch_price(self, item_name):
+        """
+        Find the price of a single item.
+
+        :return: Listing with the price of the item and its currency, or None if it was not found or could
+                 not be fetched
+        """
+        url = build_search_url(item_name, self.search_url)
+        if self.cache is not None:
+            return fetch_cached_listing(url, self.fetch, self.cache)
+
+        response = self.fetch(url)
+        if response is None or response.status_code != 200:
+            return None
+        return parse_listing(response.text, url=url)
+
+    def fetch_prices(self, item_names):
+        """
+        Find the prices of many items concurrently.
+
+        :param item_names: Names of the items to find
+        :return: Dictionary of item name to Listing, None for items whose price was not found
+        """
+        names = list(dict.fromkeys(item_names))
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return dict(zip(names, executor.map(self.fetch_price, names)))
+
+    def refresh(self, tracker):
+        """
+        Refresh the prices of every wanted and sell item, write them back in bulk and raise the price alerts.
+
+        :param tracker: CollectionTracker to read the items from and store the prices in
+        :return: Dictionary of item name to the Listing found, None for items whose price was not found
+        """
+        wanted_names = [item.name for item in tracker.get_wanted_items()]
+        sell_names = [item.name for item, _ in tracker.get_sell_items()]
+
+        start = time.monotonic()
+        prices = self.fetch_prices(wanted_names + sell_names)
+        found = sum(price is not None for price in prices.values())
+        print(f"Fetched {found}/{len(prices)} prices in {time.monotonic() - start:.1f}s")
+        if self.cache is not None:
+            print(f"Response cache: {self.cache.stats()}")
+
+        self.store(tracker, prices, wanted_names, sell_names)
+        return prices
+
+    def store(self, tracker, prices, wanted_names, sell_names):
+        """
+        Write fetched prices to the wanted and sell tables in one transaction, then raise the price alerts.
+
+        Every price is also appended to the tracker's price history, tagged with the site it came from and
+        the currency it was listed in.
+
+        :param prices: Dictionary of item name to Listing, None for items whose price was not found
+        :param wanted_names: Names of the wanted items among prices
+        :param sell_names: Names of the sell items among prices
+        :return: List of the new Alert objects
+        """
+        source = urlsplit(build_search_url("", self.search_url)).hostname or "scraper"
+        with tracker.transaction():
+            for table, names in (("wanted", wanted_names), ("sell", sell_names)):
+                # One bulk write per currency, update_prices tags a whole batch with one currency
+                by_currency = {}
+                for name in names:
+                    listing = prices.get(name)
+                    if listing is not None:
+                        by_currency.setdefault(listing.currency, {})[name] = listing.price
+                for currency, table_prices in by_currency.items():
+                    tracker.update_prices(table_prices, table=table, source=source, currency=currency)
+
+        # Every threshold is checked in one pass against the prices just written
+        alerts = tracker.check_alerts()
+        for alert in alerts:
+            print(f"Alert: {alert}")
+        return alerts
+
+    def close(self):
+        """Closes the pooled HTTP connections and the response cache."""
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
+
+if __name__ == "__main__":
+    import os
+    from dotenv import load_dotenv
+    from collection_tracker import CollectionTracker
+
+    # Refresh every wanted and sell price in the database configured in .env
+    load_dotenv()
+    tracker = CollectionTracker(os.getenv("DB_HOST"), os.getenv("DB_USER"), os.getenv("DB_PASSWORD"),
+                                os.getenv("DB_NAME"), os.getenv("DB_PORT"))
+    engine = PriceEngine(cache=ResponseCache())
+    try:
+        engine.refresh(tracker)
+    finally:
+        engine.close()
+        tracker.close()
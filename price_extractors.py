@@ -0,0 +1,192 @@
+"""
+price_extractors.py
+
+Defines the per-site price extractors used by the scraper, and the registry mapping a site to its extractor.
+"""
+
+import re
+from decimal import Decimal, InvalidOperation
+from urllib.parse import urlsplit
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml.html
+except ImportError:  # lxml is optional, the regex and SoupStrainer extractors work without it
+    lxml = None
+
+CURRENCY_SYMBOLS = {"$": "USD", "€": "EUR", "£": "GBP", "¥": "JPY"}
+DEFAULT_CURRENCY = "USD"
+
+_PRICE_TEXT = re.compile(r"([A-Z]{3}|[$€£¥])?\s*(\d[\d.,]*)\s*([A-Z]{3})?")
+_TAGS = re.compile(r"<[^>]+>")
+
+
+class Listing:
+    def __init__(self, price, currency=DEFAULT_CURRENCY, text=None):
+        """
+        Initialize a Listing instance.
+
+        :param price: Price of the listing as a Decimal
+        :param currency: ISO 4217 currency code
+        :param text: Raw price text the listing was parsed from
+        """
+        self.price = price
+        self.currency = currency
+        self.text = text
+
+    def __repr__(self):
+        return f"{self.price} {self.currency}"
+
+
+def parse_price_text(text):
+    """
+    Parse a price string such as "$1,234.50", "EUR 12,99" or "15 GBP" into a Listing.
+
+    :return: Listing, or None if the text holds no price
+    """
+    match = _PRICE_TEXT.search(text.strip())
+    if not match:
+        return None
+    symbol, number, code = match.groups()
+
+    # The last separator groups thousands when exactly three digits follow it, otherwise it is the
+    # decimal point; every other separator groups thousands
+    decimal = re.search(r"[.,](\d*)$", number)
+    if decimal and len(decimal.group(1)) != 3:
+        number = re.sub(r"[.,]", "", number[:decimal.start()]) + "." + decimal.group(1)
+    else:
+        number = re.sub(r"[.,]", "", number)
+    try:
+        price = Decimal(number)
+    except InvalidOperation:
+        return None
+
+    currency = code or CURRENCY_SYMBOLS.get(symbol, symbol) or DEFAULT_CURRENCY
+    return Listing(price, currency, text.strip())
+
+
+class RegexExtractor:
+    """
+    Scans the raw page for the price elements without building a document tree.
+
+    This is the fastest extractor and the only one that can work on a stream of chunks, stopping
+    as soon as enough listings were found.
+    """
+
+    def __init__(self, tag="span", css_class="price"):
+        # The class must be a whole whitespace-separated token, so "price" does not match "price-old"
+        pattern = (r"<%s\b[^>]*\bclass\s*=\s*[\"'](?:[^\"']*\s)?%s(?:\s[^\"']*)?[\"'][^>]*>(.*?)</%s\s*>"
+                   % (re.escape(tag), re.escape(css_class), re.escape(tag)))
+        self.pattern = re.compile(pattern, re.S | re.I)
+        self.bytes_pattern = re.compile(pattern.encode("utf-8"), re.S | re.I)
+
+    def extract(self, html, max_listings=None):
+        listings = []
+        for match in self.pattern.finditer(html):
+            listing = parse_price_text(_TAGS.sub("", match.group(1)))
+            if listing:
+                listings.append(listing)
+                if max_listings and len(listings) >= max_listings:
+                    break
+        return listings
+
+    def extract_stream(self, chunks, max_listings=1, overlap=4096, encoding="utf-8"):
+        """
+        Extract listings from an iterable of byte chunks, such as response.iter_content().
+
+        Reading stops once max_listings were found, so the rest of the page is never downloaded.
+        """
+        listings = []
+        buffer = b""
+        for chunk in chunks:
+            buffer += chunk
+            end = 0
+            for match in self.bytes_pattern.finditer(buffer):
+                end = match.end()
+                text = _TAGS.sub("", match.group(1).decode(encoding, errors="replace"))
+                listing = parse_price_text(text)
+                if listing:
+                    listings.append(listing)
+                    if max_listings and len(listings) >= max_listings:
+                        return listings
+            # Keep an unmatched tail so an element split across two chunks is still found
+            buffer = buffer[max(end, len(buffer) - overlap):]
+        return listings
+
+
+class SoupStrainerExtractor:
+    """
+    Parses only the price elements with BeautifulSoup, skipping the rest of the tree.
+    """
+
+    def __init__(self, tag="span", css_class="price", parser="html.parser"):
+        self.tag = tag
+        self.css_class = css_class
+        # While parsing, the strainer sees the class attribute as one string: match its tokens, like the other
+        # extractors, so "price sale" is kept and "price-old" is not
+        self.strainer = SoupStrainer(tag, class_=lambda value: value is not None and css_class in value.split())
+        self.parser = parser
+
+    def extract(self, html, max_listings=None):
+        soup = BeautifulSoup(html, self.parser, parse_only=self.strainer)
+        listings = []
+        # The strained tree also holds the tags nested in each price element, only the elements themselves count
+        for tag in soup.find_all(self.tag, class_=self.css_class):
+            listing = parse_price_text(tag.get_text())
+            if listing:
+                listings.append(listing)
+                if max_listings and len(listings) >= max_listings:
+                    break
+        return listings
+
+
+class LxmlExtractor:
+    """
+    Finds the price elements with an XPath query over an lxml tree.
+    """
+
+    def __init__(self, tag="span", css_class="price"):
+        if lxml is None:
+            raise ImportError("LxmlExtractor requires lxml")
+        self.xpath = f"//{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {css_class} ')]"
+
+    def extract(self, html, max_listings=None):
+        listings = []
+        for element in lxml.html.fromstring(html).xpath(self.xpath):
+            listing = parse_price_text(element.text_content())
+            if listing:
+                listings.append(listing)
+                if max_listings and len(listings) >= max_listings:
+                    break
+        return listings
+
+
+DEFAULT_EXTRACTOR = RegexExtractor()
+
+# Hostname -> extractor, sites not listed here use DEFAULT_EXTRACTOR
+EXTRACTORS = {}
+
+
+def register_extractor(host, extractor):
+    """
+    Use an extractor for every page scraped from a host.
+
+    :param host: Hostname of the site, e.g. "www.example.com"
+    :param extractor: Object with an extract(html, max_listings=None) method returning a list of Listing
+    """
+    EXTRACTORS[host.lower()] = extractor
+
+
+def extractor_for(url):
+    """
+    Return the extractor registered for the host of a URL, or DEFAULT_EXTRACTOR.
+    """
+    host = urlsplit(url).hostname if url else None
+    return EXTRACTORS.get(host, DEFAULT_EXTRACTOR)
+
+
+def extract_listings(html, url=None, max_listings=None):
+    """
+    Extract the listings from a page with the extractor registered for its site.
+    """
+    return extractor_for(url).extract(html, max_listings=max_listings)
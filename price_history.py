@@ -0,0 +1,214 @@
+"""
+price_history.py
+
+Defines the PriceSeries class, a dense items x time-buckets matrix of historical prices with vectorized
+trend analytics (moving averages, rolling min/max, percent change) computed for every item at once.
+"""
+
+import numpy as np
+
+# Length of a bucket in seconds for each resolution the history can be read at
+RESOLUTION_SECONDS = {"hour": 3600, "day": 86400, "week": 7 * 86400}
+
+# Bytes before the first element of a one-dimensional array in Postgres' binary format:
+# number of dimensions, null flag, element type, length and lower bound, each an int4
+_ARRAY_HEADER = 20
+
+# Weeks start on Monday like Postgres' date_trunc('week'), the epoch itself was a Thursday
+_WEEK_OFFSET = 4 * 86400
+
+
+def bucket_origin(timestamp, resolution):
+    """
+    Return the start, in seconds since the epoch (UTC), of the bucket of the given resolution holding timestamp.
+    """
+    step = RESOLUTION_SECONDS[resolution]
+    offset = _WEEK_OFFSET if resolution == "week" else 0
+    return (int(timestamp) - offset) // step * step + offset
+
+
+class PriceSeries:
+    def __init__(self, names, categories, bucket_starts, prices):
+        """
+        Initialize a PriceSeries instance.
+
+        :param names: NumPy object array of item names, one per row
+        :param categories: NumPy object array of the items' categories
+        :param bucket_starts: NumPy datetime64 array of the start of each bucket, one per column
+        :param prices: float64 array of shape (items, buckets), the mean price per bucket, NaN where
+            nothing was observed
+        """
+        self.names = names
+        self.categories = categories
+        self.bucket_starts = bucket_starts
+        self.prices = prices
+
+    @classmethod
+    def from_arrays(cls, rows, origin, resolution, buckets):
+        """
+        Build a series from one row per item holding its data points as binary Postgres arrays (array_send).
+
+        Each point is a bucket index, a sum of prices and the number of prices summed (1 for a raw
+        observation, the count of a rollup); the points of a bucket are averaged together.
+
+        :param rows: Sequence of (name, category, int4[] bucket indexes, float8[] sums, int4[] counts) tuples,
+            the points of a row in any order
+        :param origin: Start of bucket 0, in seconds since the epoch
+        :param resolution: One of RESOLUTION_SECONDS
+        :param buckets: Number of buckets
+        """
+        # Decoding the binary arrays is a single np.frombuffer per column, no text is parsed
+        columns = _unpack([row[2] for row in rows], ">i4").astype(np.int64)
+        totals = _unpack([row[3] for row in rows], ">f8")
+        counts = _unpack([row[4] for row in rows], ">i4")
+        # An int4 element takes 8 bytes with its length prefix
+        lengths = [(len(row[2]) - _ARRAY_HEADER) // 8 for row in rows]
+        items = np.repeat(np.arange(len(rows), dtype=np.int64), lengths)
+        return cls.from_points(np.array([row[0] for row in rows], dtype=object),
+                               np.array([row[1] for row in rows], dtype=object),
+                               items, columns, totals, counts, origin, resolution, buckets)
+
+    @classmethod
+    def from_points(cls, names, categories, items, columns, totals, counts, origin, resolution, buckets):
+        """
+        Build a series from parallel arrays of data points, averaging the points of each bucket together.
+
+        :param names: NumPy object array of item names, one per row
+        :param categories: NumPy object array of the items' categories
+        :param items: Row of each point
+        :param columns: Bucket index of each point
+        :param totals: Sum of the prices of each point
+        :param counts: Number of prices summed in each point
+        :param origin: Start of bucket 0, in seconds since the epoch
+        :param resolution: One of RESOLUTION_SECONDS
+        :param buckets: Number of buckets
+        """
+        step = RESOLUTION_SECONDS[resolution]
+        cells = np.asarray(items, dtype=np.int64) * buckets + np.asarray(columns, dtype=np.int64)
+        sums = np.bincount(cells, totals, len(names) * buckets)
+        weights = np.bincount(cells, counts, len(names) * buckets)
+        prices = np.full(len(names) * buckets, np.nan)
+        observed = weights > 0
+        prices[observed] = sums[observed] / weights[observed]
+        prices = prices.reshape(len(names), buckets)
+        bucket_starts = (np.int64(origin) + np.arange(buckets, dtype=np.int64) * step).astype("datetime64[s]")
+        return cls(names, categories, bucket_starts, prices)
+
+    def __len__(self):
+        return len(self.names)
+
+    def row(self, name):
+        """
+        Return the index of an item's row, or None if the item has no history.
+        """
+        matches = np.flatnonzero(self.names == name)
+        return int(matches[0]) if len(matches) else None
+
+    def filled(self):
+        """
+        Return the prices with each gap carried forward from the last observed bucket.
+        """
+        valid = ~np.isnan(self.prices)
+        last = np.where(valid, np.arange(self.prices.shape[1]), 0)
+        np.maximum.accumulate(last, axis=1, out=last)
+        filled = self.prices[np.arange(len(self))[:, None], last]
+        # Buckets before an item's first observation stay NaN
+        filled[np.logical_not(np.logical_or.accumulate(valid, axis=1))] = np.nan
+        return filled
+
+    def moving_average(self, window):
+        """
+        Return the mean of the observed prices over the last `window` buckets, per item and bucket.
+        """
+        valid = ~np.isnan(self.prices)
+        sums = _window_sums(np.where(valid, self.prices, 0.0), window)
+        counts = _window_sums(valid.astype(np.float64), window)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(counts > 0, sums / counts, np.nan)
+
+    def rolling_min(self, window):
+        """
+        Return the lowest observed price over the last `window` buckets, per item and bucket.
+        """
+        return np.fmin.reduce(_windows(self.prices, window), axis=-1)
+
+    def rolling_max(self, window):
+        """
+        Return the highest observed price over the last `window` buckets, per item and bucket.
+        """
+        return np.fmax.reduce(_windows(self.prices, window), axis=-1)
+
+    def percent_change(self, periods=1):
+        """
+        Return the percent change of each item's price against `periods` buckets earlier, gaps carried forward.
+        """
+        filled = self.filled()
+        change = np.full(filled.shape, np.nan)
+        if periods < filled.shape[1]:
+            with np.errstate(invalid="ignore", divide="ignore"):
+                change[:, periods:] = (filled[:, periods:] / filled[:, :-periods] - 1.0) * 100.0
+        return change
+
+    def by_category(self):
+        """
+        Return a series with one row per category, holding the mean price of its items per bucket.
+        """
+        categories, inverse = np.unique(self.categories.astype(str), return_inverse=True)
+        # Sort the rows by category so each category's rows can be summed as one contiguous block
+        order = np.argsort(inverse, kind="stable")
+        starts = np.searchsorted(inverse[order], np.arange(len(categories)))
+        valid = ~np.isnan(self.prices[order])
+        sums = np.add.reduceat(np.where(valid, self.prices[order], 0.0), starts, axis=0)
+        counts = np.add.reduceat(valid, starts, axis=0, dtype=np.int64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = np.where(counts > 0, sums / counts, np.nan)
+        categories = categories.astype(object)
+        return PriceSeries(categories, categories.copy(), self.bucket_starts, means)
+
+    def summary(self, window=7):
+        """
+        Return the dashboard figures of every row as arrays: the last known price, and the moving average,
+        min, max and percent change over the last `window` buckets.
+        """
+        filled = self.filled()
+        if not filled.shape[1]:
+            empty = np.full(len(self), np.nan)
+            return {"names": self.names, "last": empty, "moving_average": empty, "min": empty, "max": empty,
+                    "percent_change": empty}
+
+        # Only the last window is reduced, instead of computing every bucket's figures and keeping one
+        tail = self.prices[:, -window:]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            observed = (~np.isnan(tail)).sum(axis=1)
+            average = np.where(observed > 0, np.where(np.isnan(tail), 0.0, tail).sum(axis=1) / observed, np.nan)
+            before = filled[:, -window - 1] if window < filled.shape[1] else np.full(len(self), np.nan)
+            change = (filled[:, -1] / before - 1.0) * 100.0
+        return {
+            "names": self.names,
+            "last": filled[:, -1],
+            "moving_average": average,
+            "min": np.fmin.reduce(tail, axis=1),
+            "max": np.fmax.reduce(tail, axis=1),
+            "percent_change": change,
+        }
+
+
+def _window_sums(values, window):
+    # Sum of each trailing window from a running total, shorter windows at the start of the series
+    totals = np.cumsum(values, axis=1)
+    sums = totals.copy()
+    sums[:, window:] -= totals[:, :-window]
+    return sums
+
+
+def _windows(values, window):
+    # Trailing windows of every bucket, padded with NaN so the first buckets see shorter windows
+    padded = np.concatenate([np.full((values.shape[0], window - 1), np.nan), values], axis=1)
+    return np.lib.stride_tricks.sliding_window_view(padded, window, axis=1)
+
+
+def _unpack(arrays, element):
+    # Concatenate binary one-dimensional arrays without NULLs, each element preceded by its int4 length
+    data = b"".join(bytes(array)[_ARRAY_HEADER:] for array in arrays)
+    values = np.frombuffer(data, dtype=[("length", ">i4"), ("value", element)])["value"]
+    return values.astype(values.dtype.newbyteorder("="))
@@ -4,33 +4,110 @@ price_scraper.py
 Defines the web scraper to find prices for wanted items.
 """
 
+import os
+from urllib.parse import quote_plus
 import requests
-from bs4 import BeautifulSoup
+from http_cache import ResponseCache
+from price_extractors import extract_listings
+
+# Replace with the actual URL for the website, or point PRICE_SEARCH_URL at a local stub server
+SEARCH_URL = os.getenv("PRICE_SEARCH_URL", "https://www.example.com/search?q={query}")
+REQUEST_TIMEOUT = 10
+
+_session = requests.Session()
+_cache = None
+
+
+def build_search_url(item_name, search_url=None):
+    """
+    Build the search page URL for an item.
+
+    :param item_name: Name of the item to find
+    :param search_url: URL template with a {query} placeholder, defaults to SEARCH_URL
+    """
+    return (search_url or SEARCH_URL).format(query=quote_plus(item_name))
+
+
+def parse_listings(html, url=None, max_listings=None):
+    """
+    Extract every listing from a search results page.
+
+    :param html: Text of the search results page
+    :param url: URL of the page, used to pick the extractor registered for the site
+    :param max_listings: Stop after this many listings
+    :return: List of Listing with the price as a Decimal and its currency
+    """
+    return extract_listings(html, url=url, max_listings=max_listings)
+
+
+def parse_listing(html, url=None):
+    """
+    Extract the first listing from a search results page.
+
+    :param html: Text of the search results page
+    :param url: URL of the page, used to pick the extractor registered for the site
+    :return: Listing with the price as a Decimal and its currency, or None if not found
+    """
+    listings = parse_listings(html, url=url, max_listings=1)
+    return listings[0] if listings else None
+
+
+def parse_price(html, url=None):
+    """
+    Extract the price from a search results page.
+
+    :param html: Text of the search results page
+    :param url: URL of the page, used to pick the extractor registered for the site
+    :return: Price of the first listing, or None if not found
+    """
+    listing = parse_listing(html, url=url)
+    if listing is not None:
+        return float(listing.price)
+
+    return None
+
+
+def fetch_cached_listing(url, get, cache):
+    """
+    Find the first listing on a page, going through the response cache.
+
+    Pages without a price are negatively cached so they are not downloaded and parsed again right away.
+
+    :param url: Search page URL
+    :param get: Callable taking (url, headers) and returning a requests response, or None on failure
+    :param cache: ResponseCache to read and fill
+    :return: Listing with the price and its currency, or None if not found
+    """
+    entry = cache.fetch(url, get)
+    if entry is None or entry.not_found or entry.status != 200:
+        return None
+    listing = parse_listing(entry.body, url=url)
+    if listing is None:
+        cache.mark_not_found(url)
+    return listing
+
 
 def get_price(item_name):
     """
     Scrape the web to find the price of the given item.
 
     :param item_name: Name of the item to find
-    :return: Price of the item, or None if not found
-    """
-    # Replace with the actual URL and parsing logic for the website
-    search_url = f"https://www.example.com/search?q={item_name.replace(' ', '+')}"
-    response = requests.get(search_url)
-    soup = BeautifulSoup(response.text, 'html.parser')
-    
-    # Example logic to find the price on the page
-    price_tag = soup.find("span", class_="price")
-    if price_tag:
-        return float(price_tag.text.strip().replace('$', ''))
-    
-    return None
+    :return: Listing with the price of the item as a Decimal and its currency, or None if not found
+    """
+    global _cache
+    if _cache is None:
+        _cache = ResponseCache()
+    return fetch_cached_listing(
+        build_search_url(item_name),
+        lambda url, headers: _session.get(url, headers=headers, timeout=REQUEST_TIMEOUT),
+        _cache
+    )
 
 if __name__ == "__main__":
     # Test the scraper with a sample item
     item_name = "example item"
-    price = get_price(item_name)
-    if price:
-        print(f"The price of '{item_name}' is ${price:.2f}")
+    listing = get_price(item_name)
+    if listing:
+        print(f"The price of '{item_name}' is {listing.price:.2f} {listing.currency}")
     else:
         print(f"Could not find price for '{item_name}'")
@@ -0,0 +1,96 @@
+"""
+read_cache.py
+
+Defines the ReadCache class, the in-memory read-through cache behind CollectionTracker's table reads and
+by-name lookups, invalidated per table.
+"""
+
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 10000
+
+# Returned by get when a key is not cached, since None is a valid cached result (no item by that name)
+MISSING = object()
+
+
+class ReadCache:
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        """
+        Initialize a ReadCache instance.
+
+        Entries hold raw database rows, which are immutable, so every reader builds its own items from them.
+
+        :param max_entries: Number of entries kept, the least recently used are dropped beyond it
+        """
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+        # Bumped on every invalidation of a table, a read that started before it must not be stored
+        self.generations = {}
+        self.epoch = 0
+        self.stats_counts = {"hits": 0, "misses": 0}
+        self.invalidation_counts = {}
+
+    def generation(self, table):
+        """
+        Return the table's current generation, to pass to put once the rows were read.
+        """
+        with self.lock:
+            return self.epoch, self.generations.get(table, 0)
+
+    def get(self, table, key):
+        """
+        Return the cached value for a key of a table, or MISSING.
+        """
+        with self.lock:
+            value = self.entries.get((table, key), MISSING)
+            if value is MISSING:
+                self.stats_counts["misses"] += 1
+            else:
+                self.entries.move_to_end((table, key))
+                self.stats_counts["hits"] += 1
+            return value
+
+    def put(self, table, key, value, generation):
+        """
+        Store a value read at the given generation, unless the table was invalidated since.
+        """
+        with self.lock:
+            if (self.epoch, self.generations.get(table, 0)) != generation:
+                return
+            self.entries[(table, key)] = value
+            self.entries.move_to_end((table, key))
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, table=None, source="local"):
+        """
+        Drop every entry of a table, or of all tables if table is None.
+
+        :param source: What caused the invalidation, counted separately in stats
+        """
+        with self.lock:
+            if table is None:
+                self.entries.clear()
+                self.epoch += 1
+            else:
+                for cached in [cached for cached in self.entries if cached[0] == table]:
+                    del self.entries[cached]
+                self.generations[table] = self.generations.get(table, 0) + 1
+            self.invalidation_counts[source] = self.invalidation_counts.get(source, 0) + 1
+
+    def stats(self):
+        """
+        Return the hit and miss counts, the hit ratio, the invalidation counts by source and the cache size.
+        """
+        with self.lock:
+            stats = dict(self.stats_counts)
+            lookups = stats["hits"] + stats["misses"]
+            stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+            stats["invalidations"] = dict(self.invalidation_counts)
+            stats["entries"] = len(self.entries)
+            stats["rows"] = sum(len(value) if isinstance(value, list) else int(value is not None)
+                                for value in self.entries.values())
+        return stats
@@ -0,0 +1,234 @@
+"""
+search_index.py
+
+Defines the SearchIndex class, an in-memory index of the items shown in a grid, for type-ahead search by
+name substring and filtering by category, year range and location in a few milliseconds per keystroke.
+"""
+
+import threading
+from array import array
+
+
+class SearchIndex:
+    def __init__(self, items=()):
+        """
+        Initialize a SearchIndex instance.
+
+        Every item gets a slot number. Names are indexed by their lowercase trigrams, each trigram holding
+        the slots of the names containing it; categories, years and locations map to sets of slots.
+        A trigram's postings are only collected the first time a query uses it and are then kept up to date,
+        so building the index stays cheap and type-ahead reuses the postings of the previous keystroke.
+
+        :param items: Items to index, in the order search results are returned in
+        """
+        # Reloads may run on a worker thread while the main thread searches
+        self.lock = threading.RLock()
+        self.items = {}  # slot -> item
+        self.names = {}  # slot -> lowercase name
+        self.slots = {}  # item key -> slot
+        self.order = []  # slots in display order, removed slots are skipped
+        self.position = {}  # slot -> index in self.order
+        self.next_slot = 0
+
+        # Trigram postings only grow: a slot whose name changed is removed from self.names and the
+        # substring check discards it, until the postings are dropped and collected again
+        self.trigrams = {}
+        self.stale_postings = 0
+
+        self.categories = {}
+        self.years = {}
+        self.locations = {}
+        self.labels = {}  # lowercase category or location -> spelling first seen, for display
+        self.set_items(items)
+
+    @staticmethod
+    def key(item):
+        return item.id if item.id is not None else item.name
+
+    @staticmethod
+    def _fields(item):
+        return item.name, item.category, item.year, item.location
+
+    def __len__(self):
+        return len(self.items)
+
+    def add(self, item):
+        """
+        Index a new item, placed after every other item in the results.
+        """
+        with self.lock:
+            slot = self._insert(item)
+            self.position[slot] = len(self.order)
+            self.order.append(slot)
+
+    def _insert(self, item):
+        slot = self.next_slot
+        self.next_slot += 1
+        self.items[slot] = item
+        self.slots[self.key(item)] = slot
+
+        name = (item.name or "").lower()
+        self.names[slot] = name
+        if self.trigrams:
+            for trigram in set(_trigrams(name)):
+                postings = self.trigrams.get(trigram)
+                if postings is not None:
+                    postings.append(slot)
+
+        category, location = _normalize(item.category), _normalize(item.location)
+        self.categories.setdefault(category, set()).add(slot)
+        self.years.setdefault(item.year, set()).add(slot)
+        self.locations.setdefault(location, set()).add(slot)
+        for value, label in ((category, item.category), (location, item.location)):
+            if value and value not in self.labels:
+                self.labels[value] = label.strip()
+        return slot
+
+    def remove(self, item):
+        """
+        Drop an item from the index, matched by key.
+        """
+        with self.lock:
+            slot = self.slots.pop(self.key(item), None)
+            if slot is None:
+                return
+            old = self.items.pop(slot)
+            self.names.pop(slot)
+            self.stale_postings += 1
+            category, year, location = _normalize(old.category), old.year, _normalize(old.location)
+            for values, value in ((self.categories, category), (self.years, year), (self.locations, location)):
+                slots = values[value]
+                slots.discard(slot)
+                if not slots:
+                    del values[value]
+
+    def update(self, item):
+        """
+        Re-index an item whose name, category, year or location may have changed, keeping its position.
+        """
+        with self.lock:
+            slot = self.slots.get(self.key(item))
+            if slot is None:
+                self.add(item)
+                return
+            if self._fields(self.items[slot]) == self._fields(item):
+                self.items[slot] = item
+                return
+            self.remove(self.items[slot])
+            new_slot = self._insert(item)
+            index = self.position.pop(slot)
+            self.order[index] = new_slot
+            self.position[new_slot] = index
+
+    def set_items(self, items):
+        """
+        Bring the index in line with a fresh list of items, re-indexing only the items that changed.
+
+        :param items: Every item, in the order search results are returned in
+        """
+        with self.lock:
+            items = list(items)
+            keys = set()
+            order = []
+            for item in items:
+                key = self.key(item)
+                keys.add(key)
+                slot = self.slots.get(key)
+                if slot is None:
+                    slot = self._insert(item)
+                elif self._fields(self.items[slot]) == self._fields(item):
+                    self.items[slot] = item
+                else:
+                    self.remove(self.items[slot])
+                    slot = self._insert(item)
+                order.append(slot)
+            for key in [key for key in self.slots if key not in keys]:
+                self.remove(self.items[self.slots[key]])
+            self.order = order
+            self.position = {slot: index for index, slot in enumerate(order)}
+
+            # Once many names changed, the postings mostly point at removed slots and are collected again
+            if self.stale_postings > len(self.items) // 4:
+                self.trigrams = {}
+                self.stale_postings = 0
+
+    def _postings(self, trigram):
+        postings = self.trigrams.get(trigram)
+        if postings is None:
+            postings = self.trigrams[trigram] = array("I", (slot for slot, name in self.names.items() if trigram in name))
+        return postings
+
+    def search(self, text="", category=None, year_min=None, year_max=None, location=None):
+        """
+        Return the items matching every given filter, in index order.
+
+        :param text: Case-insensitive substring of the name
+        :param category: Category, case-insensitive
+        :param year_min: Lowest year, inclusive; items without a year are excluded when a bound is given
+        :param year_max: Highest year, inclusive
+        :param location: Location, case-insensitive
+        """
+        with self.lock:
+            candidates = []
+            if category:
+                candidates.append(self.categories.get(_normalize(category), set()))
+            if location:
+                candidates.append(self.locations.get(_normalize(location), set()))
+            if year_min is not None or year_max is not None:
+                low = year_min if year_min is not None else float("-inf")
+                high = year_max if year_max is not None else float("inf")
+                in_range = set()
+                for year, slots in self.years.items():
+                    if year is not None and low <= year <= high:
+                        in_range |= slots
+                candidates.append(in_range)
+
+            text = text.strip().lower()
+            if text:
+                names = self.names
+                if len(text) >= 3:
+                    # Only names holding one of the query's trigrams can contain it: take the rarest trigram
+                    # already collected, collecting the first one if none is
+                    trigrams = _trigrams(text)
+                    known = [self.trigrams[trigram] for trigram in trigrams if trigram in self.trigrams]
+                    rarest = min(known, key=len) if known else self._postings(trigrams[0])
+                    matches = {slot for slot in rarest if text in names.get(slot, "")}
+                elif candidates:
+                    smallest = min(candidates, key=len)
+                    matches = {slot for slot in smallest if text in names[slot]}
+                else:
+                    matches = {slot for slot, name in names.items() if text in name}
+                candidates.append(matches)
+
+            if not candidates:
+                items = self.items
+                return [items[slot] for slot in self.order if slot in items]
+
+            candidates.sort(key=len)
+            matches = candidates[0]
+            for slots in candidates[1:]:
+                matches = matches & slots
+                if not matches:
+                    return []
+
+            # Sorting a few matches by position beats walking the whole order
+            items = self.items
+            if len(matches) * 8 < len(self.order):
+                return [items[slot] for slot in sorted(matches, key=self.position.__getitem__)]
+            return [items[slot] for slot in self.order if slot in matches]
+
+    def values(self, field):
+        """
+        Return the distinct categories or locations in the index, sorted, for filter drop-downs.
+        """
+        with self.lock:
+            values = {"category": self.categories, "location": self.locations}[field]
+            return sorted(self.labels[value] for value in values if value)
+
+
+def _normalize(value):
+    return value.strip().lower() if isinstance(value, str) else value
+
+
+def _trigrams(text):
+    return [text[i:i + 3] for i in range(len(text) - 2)]
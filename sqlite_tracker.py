@@ -0,0 +1,872 @@
+"""
+sqlite_tracker.py
+
+Defines the SQLiteTracker class, an embedded SQLite backend with the same interface as CollectionTracker,
+for fast startup and offline use. It can also be filled from Postgres and used as a local read replica:
+
+    python sqlite_tracker.py sync    copy the items, price history and alerts of the Postgres database in .env
+
+Select it in .env with DB_BACKEND=sqlite.
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from alert import Alert
+from collection_item import CollectionItem
+from tracker_base import (DEFAULT_ALERT_COOLDOWN, DEFAULT_PRICE_SOURCE, ITEM_COLUMNS, ITEM_TABLES, ITER_SIZE, LAST_KEY,
+                          PRICE_TABLES, ROLLUP_POLICY, SEARCH_LIMIT, SORT_KEY, SYNC_TABLES, TIMESTAMP_COLUMNS,
+                          Tracker)
+
+# Only lightweight modules are imported up front, so opening the tracker stays fast: the scraper, NumPy
+# and psycopg2 are loaded by the methods that need them.
+
+DEFAULT_SQLITE_PATH = os.path.join(os.path.expanduser("~"), ".local", "share", "collector_tracker", "collection.sqlite3")
+
+ITEM_FIELDS = ("name", "category", "quantity", "price", "image_path", "year", "location", "model", "website")
+INTEGER_FIELDS = {"quantity", "year"}
+PRICE_FIELDS = {"price", "target_price", "threshold"}
+
+# Bumped with every change to SCHEMA, stored in PRAGMA user_version
+SCHEMA_VERSION = 2
+
+# Same tables and indexes as the Postgres migrations. Prices have NUMERIC affinity so comparisons are
+# numeric, and are written as decimal strings so no float rounding happens on the way in.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS inventory (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    category TEXT NOT NULL,
+    quantity INTEGER NOT NULL,
+    price DECIMAL(10, 2) NOT NULL,
+    image_path TEXT,
+    year INTEGER,
+    location TEXT,
+    model TEXT,
+    website TEXT
+);
+
+CREATE TABLE IF NOT EXISTS wanted (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    category TEXT NOT NULL,
+    quantity INTEGER NOT NULL,
+    price DECIMAL(10, 2) NOT NULL,
+    image_path TEXT,
+    year INTEGER,
+    location TEXT,
+    model TEXT,
+    website TEXT,
+    target_price DECIMAL(10, 2)
+);
+
+CREATE TABLE IF NOT EXISTS sell (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    category TEXT NOT NULL,
+    quantity INTEGER NOT NULL,
+    price DECIMAL(10, 2) NOT NULL,
+    image_path TEXT,
+    year INTEGER,
+    location TEXT,
+    model TEXT,
+    website TEXT,
+    threshold DECIMAL(10, 2) NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS inventory_name_idx ON inventory (name);
+CREATE INDEX IF NOT EXISTS wanted_name_idx ON wanted (name);
+CREATE INDEX IF NOT EXISTS sell_name_idx ON sell (name);
+
+-- The get_* order and the keyset pages, see migration 0003
+CREATE INDEX IF NOT EXISTS inventory_keyset_idx ON inventory (category, COALESCE(year, 2147483647), name, id);
+CREATE INDEX IF NOT EXISTS wanted_keyset_idx ON wanted (category, COALESCE(year, 2147483647), name, id);
+CREATE INDEX IF NOT EXISTS sell_keyset_idx ON sell (category, COALESCE(year, 2147483647), name, id);
+
+CREATE TABLE IF NOT EXISTS price_observations (
+    id INTEGER PRIMARY KEY,
+    item_name TEXT NOT NULL,
+    category TEXT NOT NULL,
+    source TEXT NOT NULL,
+    price DECIMAL(10, 2) NOT NULL,
+    currency TEXT NOT NULL DEFAULT 'USD',
+    observed_at REAL NOT NULL DEFAULT (unixepoch())
+);
+
+CREATE INDEX IF NOT EXISTS price_observations_observed_at_idx ON price_observations (observed_at);
+CREATE INDEX IF NOT EXISTS price_observations_item_idx ON price_observations (item_name, observed_at);
+
+CREATE TABLE IF NOT EXISTS price_rollups (
+    resolution TEXT NOT NULL CHECK (resolution IN ('hour', 'day', 'week')),
+    item_name TEXT NOT NULL,
+    category TEXT NOT NULL,
+    source TEXT NOT NULL,
+    currency TEXT NOT NULL,
+    bucket_start REAL NOT NULL,
+    min_price DECIMAL(10, 2) NOT NULL,
+    max_price DECIMAL(10, 2) NOT NULL,
+    sum_price DECIMAL(14, 2) NOT NULL,
+    count INTEGER NOT NULL,
+    last_price DECIMAL(10, 2) NOT NULL,
+    last_at REAL NOT NULL,
+    PRIMARY KEY (resolution, item_name, source, currency, bucket_start)
+);
+
+CREATE INDEX IF NOT EXISTS price_rollups_bucket_start_idx ON price_rollups (bucket_start);
+CREATE INDEX IF NOT EXISTS price_rollups_item_idx ON price_rollups (item_name, bucket_start);
+
+CREATE TABLE IF NOT EXISTS alerts (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL CHECK (kind IN ('sell', 'wanted')),
+    item_id INTEGER NOT NULL,
+    item_name TEXT NOT NULL,
+    price DECIMAL(10, 2) NOT NULL,
+    target DECIMAL(10, 2) NOT NULL,
+    created_at REAL NOT NULL DEFAULT (unixepoch()),
+    acknowledged INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS alerts_item_idx ON alerts (kind, item_id, created_at);
+"""
+
+CENT = Decimal("0.01")
+
+# Prices come back as Decimal with two places, like Postgres' DECIMAL(10, 2), rather than as int or float
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_converter("DECIMAL", lambda value: Decimal(value.decode()).quantize(CENT))
+
+
+class SQLiteTracker(Tracker):
+    def __init__(self, path=None):
+        """
+        Initialize a SQLiteTracker instance, creating the database and its schema if needed.
+
+        :param path: SQLite file, defaults to SQLITE_PATH from .env or DEFAULT_SQLITE_PATH; ":memory:" is supported
+        """
+        self.path = path or os.getenv("SQLITE_PATH") or DEFAULT_SQLITE_PATH
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+
+        # One connection shared by every thread: SQLite has a single writer anyway, the lock serializes
+        # statements and keeps a transaction() block to its thread. Transactions are managed explicitly.
+        self.conn = sqlite3.connect(self.path, detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False,
+                                    isolation_level=None)
+        self.lock = threading.RLock()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        # SQLite's lower() only folds ASCII letters, search() folds both sides with Python's casefold instead
+        self.conn.create_function("casefold", 1, _casefold, deterministic=True)
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            self.conn.executescript(SCHEMA)
+            self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    @contextmanager
+    def _cursor(self):
+        """
+        Yield a cursor and commit when the block succeeds, or join the transaction() block of this thread.
+        """
+        with self.lock:
+            cur = self.conn.cursor()
+            if self.conn.in_transaction:
+                yield cur
+                return
+            cur.execute("BEGIN")
+            try:
+                yield cur
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+    @contextmanager
+    def transaction(self):
+        """
+        Group tracker operations into a single atomic commit, see CollectionTracker.transaction.
+        """
+        with self.lock:
+            if self.conn.in_transaction:
+                yield self
+                return
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+    def cache_stats(self):
+        # Reads are local, there is no read cache to report on
+        return None
+
+    def add_item_inventory(self, item):
+        with self._cursor() as cur:
+            cur.execute(
+                """
+                INSERT INTO inventory (name, category, quantity, price, image_path, year, location, model, website)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                _values(item, ITEM_FIELDS)
+            )
+            item.id = cur.lastrowid
+        return item.id
+
+    def add_items_inventory(self, items, chunk_size=None):
+        """
+        Insert many inventory items in a single transaction.
+
+        :return: List of the new ids, in the order of items
+        """
+        items = list(items)
+        with self._cursor() as cur:
+            for item in items:
+                cur.execute(
+                    "INSERT INTO inventory (name, category, quantity, price, image_path, year, location, model, website) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    _values(item, ITEM_FIELDS)
+                )
+                item.id = cur.lastrowid
+        return [item.id for item in items]
+
+    def update_items(self, items, chunk_size=None):
+        """
+        Update many inventory items, matched by name, in a single transaction. Fields left as None keep their value.
+        """
+        with self._cursor() as cur:
+            cur.executemany(
+                """
+                UPDATE inventory SET
+                    quantity = COALESCE(?, quantity),
+                    price = COALESCE(?, price),
+                    image_path = COALESCE(?, image_path),
+                    year = COALESCE(?, year),
+                    location = COALESCE(?, location)
+                WHERE name = ?
+                """,
+                [_values(item, ("quantity", "price", "image_path", "year", "location", "name")) for item in items]
+            )
+
+    def remove_inventory_item_(self, item_name):
+        with self._cursor() as cur:
+            cur.execute("DELETE FROM inventory WHERE name = ?", (item_name,))
+
+    def _remove_by_id(self, table, item_id):
+        with self._cursor() as cur:
+            cur.execute(f"DELETE FROM {table} WHERE id = ?", (item_id,))
+
+    def remove_item_inventory(self, item):
+        try:
+            # Delete the item by primary key when it is known, by name otherwise
+            if item.id is not None:
+                self._remove_by_id("inventory", item.id)
+            else:
+                self.remove_inventory_item_(item.name)
+            print(f"Item '{item.name}' removed successfully.")
+        except Exception as e:
+            print(f"Error removing item '{item.name}': {e}")
+
+    def remove_item_wanted(self, item):
+        try:
+            # Delete the item by primary key when it is known, by name otherwise
+            if item.id is not None:
+                self._remove_by_id("wanted", item.id)
+            else:
+                self.remove_wanted_item_(item.name)
+            print(f"Item '{item.name}' removed successfully.")
+        except Exception as e:
+            print(f"Error removing item '{item.name}': {e}")
+
+    def remove_wanted_item_(self, item_name):
+        with self._cursor() as cur:
+            cur.execute("DELETE FROM wanted WHERE name = ?", (item_name,))
+
+    def _get_by_name(self, table, name):
+        with self._cursor() as cur:
+            row = cur.execute(f"SELECT {ITEM_COLUMNS} FROM {table} WHERE name = ?", (name,)).fetchone()
+        return CollectionItem(*row[1:], id=row[0]) if row else None
+
+    def get_inventory_item_by_name(self, name):
+        return self._get_by_name("inventory", name)
+
+    def get_wanted_item_by_name(self, name):
+        return self._get_by_name("wanted", name)
+
+    def update_item(self, item):
+        fields = []
+        values = []
+        for field in ("quantity", "price", "image_path", "year", "location"):
+            if getattr(item, field) is not None:
+                fields.append(field)
+                values.append(_coerce(field, getattr(item, field)))
+        if not fields:
+            return
+
+        # Address the row by primary key when it is known, by name otherwise
+        key = "id" if item.id is not None else "name"
+        values.append(item.id if item.id is not None else item.name)
+        with self._cursor() as cur:
+            cur.execute(f"UPDATE inventory SET {', '.join(f'{field} = ?' for field in fields)} WHERE {key} = ?", values)
+
+    def _get_all(self, table, extra_columns="", as_table=False, extra_names=()):
+        with self._cursor() as cur:
+            rows = cur.execute(f"SELECT {ITEM_COLUMNS}{extra_columns} FROM {table} ORDER BY {SORT_KEY}").fetchall()
+        if as_table:
+            from item_table import ItemTable
+            return ItemTable.from_rows(rows, extra_names=extra_names)
+        return rows
+
+    def get_inventory(self, as_table=False):
+        """
+        Return every inventory item ordered by category, year and name.
+
+        :param as_table: Return a columnar ItemTable instead of a list of CollectionItem
+        """
+        rows = self._get_all("inventory", as_table=as_table)
+        return rows if as_table else [CollectionItem(*row[1:], id=row[0]) for row in rows]
+
+    def add_wanted_item(self, item):
+        with self._cursor() as cur:
+            cur.execute(
+                "INSERT INTO wanted (name, category, quantity, price, image_path, year) VALUES (?, ?, ?, ?, ?, ?)",
+                _values(item, ("name", "category", "quantity", "price", "image_path", "year"))
+            )
+            item.id = cur.lastrowid
+        return item.id
+
+    def add_wanted_items(self, items, chunk_size=None):
+        items = list(items)
+        with self._cursor() as cur:
+            for item in items:
+                cur.execute(
+                    "INSERT INTO wanted (name, category, quantity, price, image_path, year) VALUES (?, ?, ?, ?, ?, ?)",
+                    _values(item, ("name", "category", "quantity", "price", "image_path", "year"))
+                )
+                item.id = cur.lastrowid
+        return [item.id for item in items]
+
+    def remove_wanted_item(self, item_name):
+        self.remove_wanted_item_(item_name)
+
+    def get_wanted_items(self, as_table=False):
+        """
+        Return every wanted item.
+
+        :param as_table: Return a columnar ItemTable instead of a list of CollectionItem
+        """
+        rows = self._get_all("wanted", as_table=as_table)
+        return rows if as_table else [CollectionItem(*row[1:], id=row[0]) for row in rows]
+
+    def update_wanted_item_price(self, item_name):
+        from price_scraper import get_price
+
+        # Scrape the current price and store it with its currency, keep the old price if none was found
+        listing = get_price(item_name)
+        if listing is None:
+            return None
+        self.update_prices({item_name: listing.price}, table="wanted", currency=listing.currency)
+        return listing.price
+
+    def update_prices(self, prices, table="wanted", chunk_size=None, source=DEFAULT_PRICE_SOURCE, currency="USD"):
+        """
+        Write many prices in a single transaction, appending each to the price history.
+        """
+        if table not in PRICE_TABLES:
+            raise ValueError(f"Unknown price table '{table}'")
+        if not prices:
+            return
+        rows = [(_coerce("price", price), name) for name, price in prices.items()]
+        with self._cursor() as cur:
+            cur.executemany(f"UPDATE {table} SET price = ? WHERE name = ?", rows)
+            cur.executemany(
+                f"INSERT INTO price_observations (item_name, category, source, price, currency) "
+                f"SELECT name, category, ?, price, ? FROM {table} WHERE name = ?",
+                [(source, currency, name) for name in prices]
+            )
+
+    def add_sell_item(self, item, threshold):
+        with self._cursor() as cur:
+            cur.execute(
+                "INSERT INTO sell (name, category, quantity, price, image_path, year, location, threshold) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                _values(item, ("name", "category", "quantity", "price", "image_path", "year", "location"))
+                + [_coerce("threshold", threshold)]
+            )
+            item.id = cur.lastrowid
+        return item.id
+
+    def add_sell_items(self, items, chunk_size=None):
+        items = list(items)
+        for item, threshold in items:
+            self.add_sell_item(item, threshold)
+        return [item.id for item, _ in items]
+
+    def remove_sell_item(self, item_name):
+        with self._cursor() as cur:
+            cur.execute("DELETE FROM sell WHERE name = ?", (item_name,))
+
+    def get_sell_items(self, as_table=False):
+        """
+        Return every sell item as an (item, threshold) pair.
+
+        :param as_table: Return a columnar ItemTable, with the thresholds in its extra["threshold"] column
+        """
+        rows = self._get_all("sell", ", threshold", as_table=as_table, extra_names=("threshold",))
+        return rows if as_table else [(CollectionItem(*row[1:10], id=row[0]), row[10]) for row in rows]
+
+    def check_sell_item_price(self, item_name):
+        from price_scraper import get_price
+
+        # Scrape the current market price as a Listing with its currency, None if it could not be found
+        return get_price(item_name)
+
+    def update_sell_item_price(self, item_name, new_price, source=DEFAULT_PRICE_SOURCE, currency="USD"):
+        self.update_prices({item_name: new_price}, table="sell", source=source, currency=currency)
+
+    def set_wanted_target_price(self, item_name, target_price):
+        with self._cursor() as cur:
+            cur.execute("UPDATE wanted SET target_price = ? WHERE name = ?", (_coerce("target_price", target_price), item_name))
+
+    def check_alerts(self, cooldown=DEFAULT_ALERT_COOLDOWN, limit=None):
+        """
+        Evaluate every sell threshold and wanted target price in one query, see CollectionTracker.check_alerts.
+        """
+        with self._cursor() as cur:
+            rows = cur.execute(
+                """
+                WITH candidates AS (
+                    SELECT 'sell' AS kind, id AS item_id, name, price, threshold AS target,
+                           CAST(price AS REAL) / NULLIF(threshold, 0) AS strength
+                    FROM sell
+                    WHERE price >= threshold
+                    UNION ALL
+                    SELECT 'wanted', id, name, price, target_price, CAST(target_price AS REAL) / NULLIF(price, 0)
+                    FROM wanted
+                    WHERE target_price IS NOT NULL AND price <= target_price
+                ), latest AS (
+                    -- SQLite takes the bare columns from the row holding the MAX
+                    SELECT kind, item_id, price, target, MAX(created_at) AS created_at
+                    FROM alerts
+                    GROUP BY kind, item_id
+                )
+                INSERT INTO alerts (kind, item_id, item_name, price, target)
+                SELECT c.kind, c.item_id, c.name, c.price, c.target
+                FROM candidates AS c
+                LEFT JOIN latest AS l ON l.kind = c.kind AND l.item_id = c.item_id
+                WHERE l.item_id IS NULL
+                   OR (l.created_at < unixepoch() - ? AND (l.price IS NOT c.price OR l.target IS NOT c.target))
+                ORDER BY c.strength DESC
+                LIMIT ?
+                RETURNING id, kind, item_id, item_name, price, target, created_at
+                """,
+                (cooldown, -1 if limit is None else limit)
+            ).fetchall()
+        return [_alert(row) for row in rows]
+
+    def get_alerts(self, include_acknowledged=False, limit=100):
+        with self._cursor() as cur:
+            rows = cur.execute(
+                f"""
+                SELECT id, kind, item_id, item_name, price, target, created_at FROM alerts
+                {"" if include_acknowledged else "WHERE NOT acknowledged"}
+                ORDER BY created_at DESC, id DESC LIMIT ?
+                """,
+                (limit,)
+            ).fetchall()
+        return [_alert(row) for row in rows]
+
+    def acknowledge_alerts(self, alert_ids):
+        with self._cursor() as cur:
+            cur.executemany("UPDATE alerts SET acknowledged = 1 WHERE id = ?", [(alert_id,) for alert_id in alert_ids])
+
+    def _page(self, table, after, limit, extra_columns=""):
+        with self._cursor() as cur:
+            if after is None:
+                rows = cur.execute(f"SELECT {ITEM_COLUMNS}{extra_columns} FROM {table} ORDER BY {SORT_KEY} LIMIT ?",
+                                   (limit,)).fetchall()
+            else:
+                category, year, name, *item_id = after
+                key = (category, LAST_KEY if year is None else year, name, item_id[0] if item_id else LAST_KEY)
+                rows = cur.execute(
+                    f"SELECT {ITEM_COLUMNS}{extra_columns} FROM {table} WHERE ({SORT_KEY}) > (?, ?, ?, ?) "
+                    f"ORDER BY {SORT_KEY} LIMIT ?",
+                    key + (limit,)
+                ).fetchall()
+        if len(rows) < limit:
+            return rows, None
+        last = rows[-1]
+        return rows, (last[2], last[6], last[1], last[0])
+
+    def inventory_page(self, after=None, limit=100):
+        """
+        Fetch one page of the inventory in get_inventory's order, see CollectionTracker.inventory_page.
+        """
+        rows, after = self._page("inventory", after, limit)
+        return [CollectionItem(*row[1:], id=row[0]) for row in rows], after
+
+    def wanted_page(self, after=None, limit=100):
+        rows, after = self._page("wanted", after, limit)
+        return [CollectionItem(*row[1:], id=row[0]) for row in rows], after
+
+    def sell_page(self, after=None, limit=100):
+        rows, after = self._page("sell", after, limit, extra_columns=", threshold")
+        return [(CollectionItem(*row[1:10], id=row[0]), row[10]) for row in rows], after
+
+    def _iter_pages(self, page, itersize):
+        # Page by page, so the lock is never held while the caller works on the items
+        items, after = page(limit=itersize or ITER_SIZE)
+        yield from items
+        while after is not None:
+            items, after = page(after=after, limit=itersize or ITER_SIZE)
+            yield from items
+
+    def iter_inventory(self, itersize=None):
+        return self._iter_pages(self.inventory_page, itersize)
+
+    def iter_wanted_items(self, itersize=None):
+        return self._iter_pages(self.wanted_page, itersize)
+
+    def iter_sell_items(self, itersize=None):
+        return self._iter_pages(self.sell_page, itersize)
+
+    def search(self, query, table="inventory", limit=SEARCH_LIMIT, offset=0):
+        """
+        Find the items whose name, model or category contain every word of a query, name matches first.
+
+        Unlike the Postgres backend this scans the table and does not tolerate typos, which stays fast on a
+        local file.
+        """
+        if table not in PRICE_TABLES:
+            raise ValueError(f"Unknown item table '{table}'")
+        words = re.findall(r"\w+", query.casefold())
+        if not words:
+            return []
+        text = "casefold(name || ' ' || coalesce(model, '') || ' ' || category)"
+        extra_columns = ", threshold" if table == "sell" else ""
+        with self._cursor() as cur:
+            rows = cur.execute(
+                f"SELECT {ITEM_COLUMNS}{extra_columns} FROM {table} "
+                f"WHERE {' AND '.join(f'instr({text}, ?)' for _ in words)} "
+                f"ORDER BY {' + '.join('(instr(casefold(name), ?) > 0)' for _ in words)} DESC, name, id LIMIT ? OFFSET ?",
+                words + words + [limit, offset]
+            ).fetchall()
+        if table == "sell":
+            return [(CollectionItem(*row[1:10], id=row[0]), row[10]) for row in rows]
+        return [CollectionItem(*row[1:], id=row[0]) for row in rows]
+
+    def roll_up_price_history(self, now=None, policy=ROLLUP_POLICY):
+        """
+        Downsample old price history following the rollup policy, see CollectionTracker.roll_up_price_history.
+
+        :return: Dictionary of resolution to the number of buckets written
+        """
+        from price_history import RESOLUTION_SECONDS, bucket_origin
+
+        now = now or datetime.now(timezone.utc)
+        merge = """
+            ON CONFLICT (resolution, item_name, source, currency, bucket_start) DO UPDATE SET
+                min_price = MIN(price_rollups.min_price, excluded.min_price),
+                max_price = MAX(price_rollups.max_price, excluded.max_price),
+                sum_price = price_rollups.sum_price + excluded.sum_price,
+                count = price_rollups.count + excluded.count,
+                last_price = CASE WHEN excluded.last_at >= price_rollups.last_at
+                                  THEN excluded.last_price ELSE price_rollups.last_price END,
+                last_at = MAX(price_rollups.last_at, excluded.last_at)
+        """
+        rolled = {}
+        with self._cursor() as cur:
+            for step, (resolution, age) in enumerate(policy):
+                # Buckets are counted from the bucket holding the epoch, so every timestamp is past it and
+                # the integer division truncates down
+                params = {"resolution": resolution, "step": RESOLUTION_SECONDS[resolution],
+                          "origin": bucket_origin(0, resolution),
+                          "cutoff": bucket_origin((now - age).timestamp(), resolution)}
+                if step == 0:
+                    # Raw observations into the first resolution. The WHERE clause keeps SQLite from
+                    # reading the upsert's ON as a join constraint.
+                    cur.execute(
+                        f"""
+                        INSERT INTO price_rollups (resolution, item_name, category, source, currency, bucket_start,
+                                                   min_price, max_price, sum_price, count, last_price, last_at)
+                        SELECT :resolution, item_name, MAX(category), source, currency, bucket, MIN(price), MAX(price),
+                               SUM(price), COUNT(*), MAX(last_price), MAX(observed_at)
+                        FROM (
+                            SELECT *, FIRST_VALUE(price) OVER (PARTITION BY item_name, source, currency, bucket
+                                                               ORDER BY observed_at DESC) AS last_price
+                            FROM (
+                                SELECT item_name, category, source, currency, price, observed_at,
+                                       :origin + CAST((observed_at - :origin) / :step AS INTEGER) * :step AS bucket
+                                FROM price_observations
+                                WHERE observed_at < :cutoff
+                            )
+                        )
+                        WHERE true
+                        GROUP BY item_name, source, currency, bucket
+                        {merge}
+                        """,
+                        params
+                    )
+                    rolled[resolution] = cur.rowcount
+                    cur.execute("DELETE FROM price_observations WHERE observed_at < :cutoff", params)
+                else:
+                    # Buckets of the previous resolution into coarser ones
+                    params["previous"] = policy[step - 1][0]
+                    cur.execute(
+                        f"""
+                        INSERT INTO price_rollups (resolution, item_name, category, source, currency, bucket_start,
+                                                   min_price, max_price, sum_price, count, last_price, last_at)
+                        SELECT :resolution, item_name, MAX(category), source, currency, bucket, MIN(min_price),
+                               MAX(max_price), SUM(sum_price), SUM(count), MAX(latest_price), MAX(last_at)
+                        FROM (
+                            SELECT *, FIRST_VALUE(last_price) OVER (PARTITION BY item_name, source, currency, bucket
+                                                                    ORDER BY last_at DESC) AS latest_price
+                            FROM (
+                                SELECT *, :origin + CAST((bucket_start - :origin) / :step AS INTEGER) * :step AS bucket
+                                FROM price_rollups
+                                WHERE resolution = :previous AND bucket_start < :cutoff
+                            )
+                        )
+                        WHERE true
+                        GROUP BY item_name, source, currency, bucket
+                        {merge}
+                        """,
+                        params
+                    )
+                    rolled[resolution] = cur.rowcount
+                    cur.execute("DELETE FROM price_rollups WHERE resolution = :previous AND bucket_start < :cutoff",
+                                params)
+        return rolled
+
+    def price_history(self, names=None, category=None, resolution="day", start=None, end=None):
+        """
+        Read the price history of many items as a PriceSeries, see CollectionTracker.price_history.
+
+        SQLite sums the points of each item and bucket, NumPy averages them into the series.
+        """
+        import numpy as np
+        from price_history import RESOLUTION_SECONDS, PriceSeries, bucket_origin
+
+        if resolution not in RESOLUTION_SECONDS:
+            raise ValueError(f"Unknown resolution '{resolution}'")
+        end = end or datetime.now(timezone.utc)
+        start = start or end - timedelta(days=365)
+        step = RESOLUTION_SECONDS[resolution]
+        origin = bucket_origin(start.timestamp(), resolution)
+        buckets = (bucket_origin(end.timestamp(), resolution) - origin) // step + 1
+        filters = ""
+        if names is not None:
+            filters += " AND item_name IN (SELECT value FROM json_each(:names))"
+        if category is not None:
+            filters += " AND category = :category"
+        params = {"start": start.timestamp(), "end": end.timestamp(), "origin": origin, "step": step,
+                  "names": json.dumps(list(names)) if names is not None else None, "category": category}
+
+        with self._cursor() as cur:
+            rows = cur.execute(
+                f"""
+                SELECT item_name, MAX(category), CAST((at - :origin) / :step AS INTEGER) AS bucket,
+                       SUM(total), SUM(n)
+                FROM (
+                    SELECT item_name, category, observed_at AS at, CAST(price AS REAL) AS total, 1 AS n
+                    FROM price_observations
+                    WHERE observed_at >= :start AND observed_at < :end{filters}
+                    UNION ALL
+                    SELECT item_name, category, bucket_start, CAST(sum_price AS REAL), count
+                    FROM price_rollups
+                    WHERE bucket_start >= :start AND bucket_start < :end{filters}
+                )
+                GROUP BY item_name, bucket
+                ORDER BY item_name
+                """,
+                params
+            ).fetchall()
+
+        points = np.array(rows, dtype=object).reshape(len(rows), 5)
+        item_names, first, items = np.unique(points[:, 0].astype(str), return_index=True, return_inverse=True)
+        return PriceSeries.from_points(item_names.astype(object), points[first, 1], items,
+                                       points[:, 2].astype(np.int64), points[:, 3].astype(np.float64),
+                                       points[:, 4].astype(np.float64), origin, resolution, buckets)
+
+    def _check_copy(self, table, columns):
+        # Table and column names are interpolated into the statements
+        if table not in ITEM_TABLES:
+            raise ValueError(f"Unknown table '{table}'")
+        for column in columns:
+            if not re.match(r"^[a-z_]+$", column):
+                raise ValueError(f"Invalid column name '{column}'")
+
+    def copy_in(self, table, stream, columns):
+        """
+        Load CSV rows into a table from a file-like object, see CollectionTracker.copy_in.
+
+        The rows are parsed as they are read and inserted with one executemany, in constant memory.
+
+        :return: Number of rows loaded
+        """
+        self._check_copy(table, columns)
+        placeholders = ", ".join(["?"] * len(columns))
+        # Empty fields are NULL, like in COPY's CSV format
+        rows = ([value if value != "" else None for value in row] for row in csv.reader(_lines(stream)) if row)
+        with self._cursor() as cur:
+            cur.executemany(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", rows)
+            return cur.rowcount
+
+    def copy_out(self, table, stream, columns, format="csv"):
+        """
+        Write every row of a table to a file-like object in id order, see CollectionTracker.copy_out.
+
+        :param format: "csv" for CSV with a header line, "jsonl" for one JSON object per line
+        :return: Number of rows written
+        """
+        self._check_copy(table, columns)
+        if format not in ("csv", "jsonl"):
+            raise ValueError(f"Unknown format '{format}'")
+        count = 0
+        writer = csv.writer(stream, lineterminator="\n")
+        if format == "csv":
+            writer.writerow(columns)
+        with self._cursor() as cur:
+            for row in cur.execute(f"SELECT {', '.join(columns)} FROM {table} ORDER BY id"):
+                if format == "csv":
+                    writer.writerow(row)
+                else:
+                    # Prices are written as JSON numbers, like Postgres' row_to_json
+                    stream.write(json.dumps({column: float(value) if isinstance(value, Decimal) else value
+                                             for column, value in zip(columns, row)}) + "\n")
+                count += 1
+        return count
+
+    def iter_rows(self, table, itersize=None):
+        """
+        Yield every row of one of SYNC_TABLES, see Tracker.iter_rows.
+
+        Rows are read a page at a time by rowid, so the lock is never held while the caller works on them.
+        """
+        if table not in SYNC_TABLES:
+            raise ValueError(f"Unknown table '{table}'")
+        columns = [column.strip() for column in SYNC_TABLES[table].split(",")]
+        timestamps = [index for index, column in enumerate(columns) if column in TIMESTAMP_COLUMNS]
+        after = -1
+        while True:
+            with self._cursor() as cur:
+                rows = cur.execute(f"SELECT rowid, {SYNC_TABLES[table]} FROM {table} WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                                   (after, itersize or ITER_SIZE)).fetchall()
+            if not rows:
+                return
+            after = rows[-1][0]
+            for row in rows:
+                row = list(row[1:])
+                for index in timestamps:
+                    row[index] = datetime.fromtimestamp(row[index], timezone.utc)
+                yield tuple(row)
+
+    def sync_from(self, source, itersize=None):
+        """
+        Replace the items, price history and alerts with those of another tracker, keeping the items' ids.
+
+        The source's rows are streamed, so a large Postgres database is copied in constant memory and
+        in a single SQLite transaction; readers keep seeing the previous copy until it commits.
+
+        :param source: Tracker to copy from, usually a CollectionTracker
+        :return: Dictionary of table name to the number of rows copied
+        """
+        counts = {}
+        with self.transaction():
+            for table, columns in SYNC_TABLES.items():
+                names = [column.strip() for column in columns.split(",")]
+                timestamps = [index for index, column in enumerate(names) if column in TIMESTAMP_COLUMNS]
+                self.conn.execute(f"DELETE FROM {table}")
+                cur = self.conn.executemany(
+                    f"INSERT INTO {table} ({columns}) VALUES ({', '.join(['?'] * len(names))})",
+                    (_epoch_row(row, timestamps) for row in source.iter_rows(table, itersize))
+                )
+                counts[table] = cur.rowcount
+        self.conn.execute("PRAGMA optimize")
+        return counts
+
+    def close(self):
+        """Closes the database."""
+        with self.lock:
+            self.conn.close()
+
+
+def _coerce(field, value):
+    # INTEGER and DECIMAL affinity keep text that is not a number, such as year="abc", as text, which
+    # CollectionItem then fails to read back: convert like CollectionItem does and reject what does not convert
+    if value is None:
+        return None
+    try:
+        if field in INTEGER_FIELDS:
+            return int(value) if value != "" else None
+        if field in PRICE_FIELDS:
+            return Decimal(str(value))
+    except (ValueError, ArithmeticError):
+        raise ValueError(f"Invalid {field} {value!r}") from None
+    return value
+
+
+def _values(item, fields):
+    return [_coerce(field, getattr(item, field)) for field in fields]
+
+
+def _casefold(text):
+    return text.casefold() if text is not None else None
+
+
+def _lines(stream):
+    # Split the chunks returned by stream.read() into lines for the csv module
+    pending = ""
+    while True:
+        chunk = stream.read(65536)
+        if not chunk:
+            break
+        data = pending + chunk
+        end = data.rfind("\n") + 1
+        pending = data[end:]
+        yield from io.StringIO(data[:end])
+    if pending:
+        yield pending
+
+
+def _epoch_row(row, timestamps):
+    # Timestamps are stored as seconds since the epoch
+    row = list(row)
+    for index in timestamps:
+        row[index] = row[index].timestamp()
+    return row
+
+
+def _alert(row):
+    return Alert(*row[:6], datetime.fromtimestamp(row[6], timezone.utc))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the embedded SQLite copy of the collection.")
+    parser.add_argument("command", choices=("sync",), help="sync: replace the SQLite data with that in Postgres")
+    parser.add_argument("--path", help="SQLite file, defaults to SQLITE_PATH")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    from collection_tracker import CollectionTracker
+
+    # Load environment variables from .env file
+    load_dotenv()
+    source = CollectionTracker(os.getenv("DB_HOST"), os.getenv("DB_USER"), os.getenv("DB_PASSWORD"),
+                               os.getenv("DB_NAME"), os.getenv("DB_PORT"), cache_reads=False)
+    replica = SQLiteTracker(args.path)
+    try:
+        counts = replica.sync_from(source)
+        print(f"Synced {', '.join(f'{count} {table}' for table, count in counts.items())} rows into '{replica.path}'")
+    finally:
+        replica.close()
+        source.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+startup_timer.py
+
+Defines the StartupTimer class, which times the phases of the application's startup and prints them,
+so a slower import, database connection or first tab load shows up on every launch.
+"""
+
+import time
+from contextlib import contextmanager
+
+
+class StartupTimer:
+    def __init__(self, started=None):
+        """
+        Initialize a StartupTimer instance.
+
+        :param started: time.perf_counter() value startup is measured from, defaults to now
+        """
+        self.started = started if started is not None else time.perf_counter()
+        self.phases = []
+        self.reported = False
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Time the enclosed block as one named phase.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+
+    def start(self, name):
+        """
+        Start timing a phase that ends in a later callback, such as a load finishing on a worker thread.
+
+        :return: Function recording the phase when called
+        """
+        start = time.perf_counter()
+        return lambda: self.phases.append((name, time.perf_counter() - start))
+
+    def elapsed(self):
+        """
+        Return the seconds since startup began.
+        """
+        return time.perf_counter() - self.started
+
+    def report(self):
+        """
+        Print every phase and the total time since startup began, once.
+        """
+        if self.reported:
+            return
+        self.reported = True
+        phases = ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in self.phases)
+        print(f"Startup: {phases}; ready after {self.elapsed() * 1000:.0f} ms")
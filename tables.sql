@@ -1,36 +0,0 @@
--- inventory table
-CREATE TABLE inventory (
-    id SERIAL PRIMARY KEY,
-    name VARCHAR(255) NOT NULL,
-    category VARCHAR(255) NOT NULL,
-    quantity INT NOT NULL,
-    price DECIMAL(10, 2) NOT NULL,
-    image_path VARCHAR(255),
-    year INT,
-    location VARCHAR(255)
-);
-
--- wanted_items table
-CREATE TABLE wanted_items (
-    id SERIAL PRIMARY KEY,
-    name VARCHAR(255) NOT NULL,
-    category VARCHAR(255) NOT NULL,
-    quantity INT NOT NULL,
-    price DECIMAL(10, 2) NOT NULL,
-    image_path VARCHAR(255),
-    year INT,
-    location VARCHAR(255)
-);
-
--- sell_items table
-CREATE TABLE sell_items (
-    id SERIAL PRIMARY KEY,
-    name VARCHAR(255) NOT NULL,
-    category VARCHAR(255) NOT NULL,
-    quantity INT NOT NULL,
-    price DECIMAL(10, 2) NOT NULL,
-    image_path VARCHAR(255),
-    year INT,
-    location VARCHAR(255),
-    threshold DECIMAL(10, 2) NOT NULL
-);
@@ -0,0 +1,184 @@
+"""
+task_runner.py
+
+Defines the TaskRunner class, which runs database and network calls on worker threads so the Tk event loop
+never waits on them, and delivers their results back on the main thread.
+"""
+
+import queue
+import threading
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+
+class Task:
+    """
+    Handle to a submitted call. Its callbacks run on the Tk main thread unless it was cancelled first.
+    """
+
+    def __init__(self, fn, args, label, key, serial, on_done, on_error):
+        self.fn = fn
+        self.args = args
+        self.label = label
+        self.key = key
+        self.serial = serial
+        self.on_done = on_done
+        self.on_error = on_error
+        self.future = None
+        self.cancelled = threading.Event()
+
+    def cancel(self):
+        """
+        Cancel the task. A call that has not started is dropped, a running one finishes but its result is discarded.
+        """
+        self.cancelled.set()
+        if self.future is not None:
+            self.future.cancel()
+
+
+class TaskRunner:
+    def __init__(self, root, workers=4, poll_interval=30, on_busy=None):
+        """
+        Initialize a TaskRunner instance.
+
+        :param root: Tk root window, used to deliver results on the main thread
+        :param workers: Number of threads for calls that may run concurrently, such as reads and scrapes
+        :param poll_interval: Milliseconds between checks for finished calls
+        :param on_busy: Called on the main thread with the labels of the unfinished tasks whenever they change
+        """
+        self.root = root
+        self.poll_interval = poll_interval
+        self.on_busy = on_busy
+        self.executor = ThreadPoolExecutor(workers, thread_name_prefix="task")
+        # Writes go through one thread, so they reach the database in the order they were made
+        self.serial = ThreadPoolExecutor(1, thread_name_prefix="write")
+        self.results = queue.Queue()
+
+        # Unfinished tasks, and per key the running task and the latest call waiting for it to finish
+        self.active = []
+        self.running = {}
+        self.waiting = {}
+        self.closed = False
+        self.root.after(self.poll_interval, self._poll)
+
+    def submit(self, fn, *args, label=None, key=None, serial=False, on_done=None, on_error=None):
+        """
+        Run fn(*args) on a worker thread.
+
+        Calls sharing a key are coalesced: while one is running, only the most recent further call is kept
+        and started after it, and the running call's result is discarded as stale.
+
+        :param label: Text describing the call for the busy indicator
+        :param key: Key identifying repeatable calls, such as refreshing one tab
+        :param serial: Run on the single write thread, after every serial call submitted before it
+        :param on_done: Called on the main thread with the result
+        :param on_error: Called on the main thread with the exception, which is printed when None
+        :return: Task handle
+        """
+        task = Task(fn, args, label, key, serial, on_done, on_error)
+        if key is not None and key in self.running:
+            previous = self.waiting.get(key)
+            if previous is not None:
+                self._finish(previous)
+            self.waiting[key] = task
+            self.running[key].cancelled.set()
+        else:
+            self._start(task)
+        self.active.append(task)
+        self._busy_changed()
+        return task
+
+    def _start(self, task):
+        if task.key is not None:
+            self.running[task.key] = task
+        task.future = (self.serial if task.serial else self.executor).submit(self._run, task)
+        task.future.add_done_callback(lambda future: self.results.put(task))
+
+    def _run(self, task):
+        if task.cancelled.is_set():
+            return None
+        return task.fn(*task.args)
+
+    def cancel(self, key=None):
+        """
+        Cancel the tasks with the given key, or every read and scrape when key is None.
+
+        Serial tasks are writes the user already made, they are only cancelled by their key and are
+        otherwise left to reach the database.
+        """
+        for task in list(self.active):
+            if task.key == key if key is not None else not task.serial:
+                task.cancel()
+                if task.future is None:
+                    # A coalesced call that never started
+                    self.waiting.pop(task.key, None)
+                    self._finish(task)
+        self._busy_changed()
+
+    def busy(self):
+        """
+        Return the labels of the unfinished tasks.
+        """
+        return [task.label for task in self.active if task.label]
+
+    def _finish(self, task):
+        if task in self.active:
+            self.active.remove(task)
+
+    def _deliver(self, task):
+        self._finish(task)
+        if task.key is not None and self.running.get(task.key) is task:
+            del self.running[task.key]
+            waiting = self.waiting.pop(task.key, None)
+            if waiting is not None:
+                self._start(waiting)
+
+        if task.cancelled.is_set():
+            return
+        try:
+            result = task.future.result()
+        except CancelledError:
+            return
+        except Exception as e:
+            self._callback(task, task.on_error, e)
+            return
+        self._callback(task, task.on_done, result)
+
+    def _callback(self, task, callback, value):
+        # A failing callback is reported and must not keep the other tasks' callbacks from running
+        try:
+            if callback is not None:
+                callback(value)
+            elif isinstance(value, Exception):
+                print(f"{task.label or 'Background task'} failed: {value}")
+        except Exception as e:
+            print(f"Callback of {task.label or 'background task'} failed: {e}")
+
+    def _busy_changed(self):
+        if self.on_busy is not None:
+            self.on_busy(self.busy())
+
+    def _poll(self):
+        # Drain the finished calls on the main thread, so callbacks can touch widgets
+        delivered = False
+        try:
+            while True:
+                self._deliver(self.results.get_nowait())
+                delivered = True
+        except queue.Empty:
+            pass
+        finally:
+            # Polling must go on even if something above raised, or no result would be delivered again
+            if not self.closed:
+                self.root.after(self.poll_interval, self._poll)
+        if delivered:
+            self._busy_changed()
+
+    def close(self):
+        """
+        Cancel the reads and scrapes that have not started and stop the worker threads, without waiting for
+        running calls. The queued writes are still applied, close returns once they are.
+        """
+        self.closed = True
+        self.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.serial.shutdown(wait=True)
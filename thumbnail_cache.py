@@ -0,0 +1,155 @@
+"""
+thumbnail_cache.py
+
+Defines the ThumbnailCache class, a persistent on-disk cache of pre-resized item thumbnails.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from PIL import Image
+
+THUMBNAIL_SIZE = (90, 90)
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "collector_tracker", "thumbnails")
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+
+class ThumbnailCache:
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES, size=THUMBNAIL_SIZE):
+        """
+        Initialize a ThumbnailCache instance.
+
+        :param cache_dir: Directory the thumbnails are stored in
+        :param max_bytes: Total size of the cache after which least recently used thumbnails are evicted
+        :param size: Size of the thumbnails
+        """
+        self.cache_dir = cache_dir or os.getenv("THUMBNAIL_CACHE_DIR") or DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+        self.size = size
+        self.lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        # key -> [bytes on disk, last used timestamp]; the file mtime doubles as the LRU clock across restarts
+        self.entries = {}
+        self.total_bytes = 0
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith(".png"):
+                stat = entry.stat()
+                self.entries[entry.name[:-4]] = [stat.st_size, stat.st_mtime]
+                self.total_bytes += stat.st_size
+
+    def key_for(self, image_path):
+        """
+        Return the cache key for a source image, or None if it does not exist.
+
+        The key changes whenever the source file is replaced or edited.
+        """
+        try:
+            stat = os.stat(image_path)
+        except OSError:
+            return None
+        source = f"{os.path.abspath(image_path)}|{stat.st_mtime_ns}|{stat.st_size}|{self.size[0]}x{self.size[1]}"
+        return hashlib.sha1(source.encode("utf-8")).hexdigest()
+
+    def _path_for(self, key):
+        return os.path.join(self.cache_dir, key + ".png")
+
+    def get(self, image_path):
+        """
+        Return the thumbnail for an image as a PIL image, building and storing it on a miss.
+
+        :param image_path: Path to the full-size source image
+        :return: Thumbnail image, or None if the source does not exist
+        """
+        key = self.key_for(image_path)
+        if key is None:
+            return None
+
+        thumb_path = self._path_for(key)
+        with self.lock:
+            cached = key in self.entries
+            if cached:
+                self.entries[key][1] = time.time()
+        if cached:
+            try:
+                thumb = Image.open(thumb_path)
+                thumb.load()
+                os.utime(thumb_path)
+                return thumb
+            except OSError:
+                # The file vanished or is corrupt, fall through and rebuild it
+                self._forget(key)
+
+        thumb = self.build(image_path)
+        self._store(key, thumb)
+        return thumb
+
+    def build(self, image_path):
+        """
+        Decode and resize a full-size source image.
+
+        Large JPEGs are decoded at a reduced scale through draft(), and other formats are
+        shrunk with the fast integer reduce() path before the final LANCZOS pass.
+        """
+        with Image.open(image_path) as img:
+            img.draft("RGB", (self.size[0] * 2, self.size[1] * 2))
+            return img.resize(self.size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+
+    def _store(self, key, thumb):
+        thumb_path = self._path_for(key)
+        tmp_path = f"{thumb_path}.{threading.get_ident()}.tmp"
+        try:
+            thumb.save(tmp_path, format="PNG")
+            os.replace(tmp_path, thumb_path)
+        except OSError as e:
+            print(f"Could not write thumbnail cache entry '{thumb_path}': {e}")
+            return
+
+        nbytes = os.path.getsize(thumb_path)
+        with self.lock:
+            if key in self.entries:
+                self.total_bytes -= self.entries[key][0]
+            self.entries[key] = [nbytes, time.time()]
+            self.total_bytes += nbytes
+        self._evict()
+
+    def _forget(self, key):
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry:
+                self.total_bytes -= entry[0]
+        try:
+            os.remove(self._path_for(key))
+        except OSError:
+            pass
+
+    def _evict(self):
+        with self.lock:
+            if self.total_bytes <= self.max_bytes:
+                return
+            victims = []
+            for key, (nbytes, _) in sorted(self.entries.items(), key=lambda kv: kv[1][1]):
+                if self.total_bytes <= self.max_bytes:
+                    break
+                victims.append(key)
+                self.total_bytes -= nbytes
+            for key in victims:
+                del self.entries[key]
+        for key in victims:
+            try:
+                os.remove(self._path_for(key))
+            except OSError:
+                pass
+
+    def clear(self):
+        """Removes every thumbnail from the cache."""
+        with self.lock:
+            keys = list(self.entries)
+            self.entries.clear()
+            self.total_bytes = 0
+        for key in keys:
+            try:
+                os.remove(self._path_for(key))
+            except OSError:
+                pass
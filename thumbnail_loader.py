@@ -0,0 +1,140 @@
+"""
+thumbnail_loader.py
+
+Defines the ThumbnailLoader class that decodes thumbnails on a pool of worker threads
+and hands them back to the Tk main loop as they finish.
+"""
+
+import itertools
+import queue
+import threading
+
+PRIORITY_VISIBLE = 0
+PRIORITY_OFFSCREEN = 1
+
+
+class _Job:
+    def __init__(self, image_path, priority):
+        self.image_path = image_path
+        self.priority = priority
+        self.callbacks = {}  # owner -> callback
+        self.started = False
+        self.cancelled = False
+
+
+class ThumbnailLoader:
+    def __init__(self, root, thumbnail_cache, workers=4, poll_interval=30):
+        """
+        Initialize a ThumbnailLoader instance.
+
+        :param root: Tk root window, used to deliver results on the main thread
+        :param thumbnail_cache: ThumbnailCache the workers read and fill
+        :param workers: Number of decoding threads
+        :param poll_interval: Milliseconds between checks for finished thumbnails
+        """
+        self.root = root
+        self.thumbnail_cache = thumbnail_cache
+        self.poll_interval = poll_interval
+        self.jobs = queue.PriorityQueue()
+        self.results = queue.Queue()
+        self.lock = threading.Lock()
+        self.counter = itertools.count()
+
+        # Jobs still queued or decoding, by image path, and the job each owner is waiting on
+        self.pending = {}
+        self.owners = {}
+
+        self.threads = []
+        for _ in range(workers):
+            thread = threading.Thread(target=self._worker, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        self.root.after(self.poll_interval, self._poll)
+
+    def request(self, image_path, owner, callback, priority=PRIORITY_VISIBLE):
+        """
+        Queue a thumbnail for decoding.
+
+        Requests for the same image share one job; a more urgent request moves the job up the queue.
+
+        :param image_path: Path to the full-size source image
+        :param owner: Key identifying the requester, used to cancel the request later
+        :param callback: Called on the main thread with the PIL thumbnail, or None if it could not be built
+        :param priority: PRIORITY_VISIBLE for on-screen tiles, PRIORITY_OFFSCREEN for prefetching
+        """
+        self.cancel(owner)
+        with self.lock:
+            job = self.pending.get(image_path)
+            if job is None:
+                job = _Job(image_path, priority)
+                self.pending[image_path] = job
+                self.jobs.put((priority, next(self.counter), job))
+            elif priority < job.priority and not job.started:
+                # The stale, lower priority queue entry is skipped by whichever worker pops it last
+                job.priority = priority
+                self.jobs.put((priority, next(self.counter), job))
+            job.callbacks[owner] = callback
+            self.owners[owner] = job
+
+    def cancel(self, owner):
+        """
+        Drop the request made by an owner; the job itself is cancelled once nobody is waiting on it.
+        """
+        with self.lock:
+            job = self.owners.pop(owner, None)
+            if job is None:
+                return
+            job.callbacks.pop(owner, None)
+            if not job.callbacks:
+                job.cancelled = True
+                if self.pending.get(job.image_path) is job:
+                    del self.pending[job.image_path]
+
+    def cancel_all(self):
+        with self.lock:
+            for job in self.pending.values():
+                job.cancelled = True
+                job.callbacks.clear()
+            self.pending.clear()
+            self.owners.clear()
+
+    def shutdown(self):
+        """Cancels outstanding work and stops the worker threads."""
+        self.cancel_all()
+        for _ in self.threads:
+            self.jobs.put((float("inf"), next(self.counter), None))
+
+    def _worker(self):
+        while True:
+            _, _, job = self.jobs.get()
+            if job is None:
+                return
+            with self.lock:
+                if job.cancelled or job.started:
+                    continue
+                job.started = True
+            try:
+                thumb = self.thumbnail_cache.get(job.image_path)
+            except Exception as e:
+                print(f"Error loading thumbnail for '{job.image_path}': {e}")
+                thumb = None
+            self.results.put((job, thumb))
+
+    def _poll(self):
+        while True:
+            try:
+                job, thumb = self.results.get_nowait()
+            except queue.Empty:
+                break
+            with self.lock:
+                if job.cancelled:
+                    continue
+                if self.pending.get(job.image_path) is job:
+                    del self.pending[job.image_path]
+                callbacks = list(job.callbacks.items())
+                for owner, _ in callbacks:
+                    if self.owners.get(owner) is job:
+                        del self.owners[owner]
+            for _, callback in callbacks:
+                callback(thumb)
+        self.root.after(self.poll_interval, self._poll)
@@ -0,0 +1,232 @@
+"""
+tracker_base.py
+
+Defines the Tracker abstract base class, the interface every storage backend implements, and the constants
+the backends share. CollectionTracker stores the collection in Postgres, SQLiteTracker in an embedded
+SQLite file; the GUI, the price engine and the daemon only rely on the methods declared here.
+
+Only the standard library is imported, so a backend that starts fast stays fast.
+"""
+
+from abc import ABC, abstractmethod
+from datetime import timedelta
+
+# Tables whose prices can be written in bulk, the name is interpolated into the query so it must be one of these
+PRICE_TABLES = ("inventory", "wanted", "sell")
+
+# Tables copy_in and copy_out accept
+ITEM_TABLES = ("inventory", "wanted", "sell")
+
+# Rows fetched per round trip by the iter_* methods
+ITER_SIZE = 2000
+
+# Columns read by the iter_* and *_page methods, in CollectionItem order after the id
+ITEM_COLUMNS = "id, name, category, quantity, price, image_path, year, location, model, website"
+
+# Sort key of the iter_* and *_page methods: get_inventory's order, with NULL years last and the id breaking ties
+SORT_KEY = "category, COALESCE(year, 2147483647), name, id"
+
+# Sorts after every stored year and id, stands in for NULL years and missing ids in page keys
+LAST_KEY = 2147483647
+
+# Tables a replica copies in full and the columns it copies, which both backends store
+SYNC_TABLES = {
+    "inventory": ITEM_COLUMNS,
+    "wanted": ITEM_COLUMNS + ", target_price",
+    "sell": ITEM_COLUMNS + ", threshold",
+    "price_observations": "item_name, category, source, price, currency, observed_at",
+    "price_rollups": "resolution, item_name, category, source, currency, bucket_start, min_price, max_price, "
+                     "sum_price, count, last_price, last_at",
+    "alerts": "id, kind, item_id, item_name, price, target, created_at, acknowledged",
+}
+
+# Columns of SYNC_TABLES holding a point in time
+TIMESTAMP_COLUMNS = {"observed_at", "bucket_start", "last_at", "created_at"}
+
+# Source recorded with price observations when the caller does not name one
+DEFAULT_PRICE_SOURCE = "scraper"
+
+# Price history downsampling: (resolution, age) steps, each rolling data older than age into buckets of
+# that resolution. Raw observations become hourly after 2 days, hourly buckets daily after 30 days, and
+# daily buckets weekly after a year.
+ROLLUP_POLICY = (("hour", timedelta(days=2)), ("day", timedelta(days=30)), ("week", timedelta(days=365)))
+
+# Seconds after an alert during which the same item raises no new alert
+DEFAULT_ALERT_COOLDOWN = 24 * 60 * 60
+
+# Default number of results per search() page
+SEARCH_LIMIT = 50
+
+
+class Tracker(ABC):
+    """
+    Storage backend of the collection. A backend missing any of these methods cannot be instantiated.
+    """
+
+    @abstractmethod
+    def cache_stats(self):
+        """Return the read cache statistics, or None when the backend has no read cache."""
+
+    @abstractmethod
+    def transaction(self):
+        """Context manager grouping the tracker calls of this thread into a single atomic commit."""
+
+    @abstractmethod
+    def add_item_inventory(self, item):
+        """Insert an inventory item and return its new id."""
+
+    @abstractmethod
+    def add_items_inventory(self, items, chunk_size=None):
+        """Insert many inventory items and return their new ids, in order."""
+
+    @abstractmethod
+    def update_items(self, items, chunk_size=None):
+        """Update many inventory items matched by name, fields left as None keep their value."""
+
+    @abstractmethod
+    def remove_inventory_item_(self, item_name):
+        """Delete the inventory items with the given name."""
+
+    @abstractmethod
+    def remove_item_inventory(self, item):
+        """Delete an inventory item by id when it is known, by name otherwise, reporting failures."""
+
+    @abstractmethod
+    def remove_item_wanted(self, item):
+        """Delete a wanted item by id when it is known, by name otherwise, reporting failures."""
+
+    @abstractmethod
+    def remove_wanted_item_(self, item_name):
+        """Delete the wanted items with the given name."""
+
+    @abstractmethod
+    def get_inventory_item_by_name(self, name):
+        """Return the inventory item with the given name, or None."""
+
+    @abstractmethod
+    def get_wanted_item_by_name(self, name):
+        """Return the wanted item with the given name, or None."""
+
+    @abstractmethod
+    def search(self, query, table="inventory", limit=SEARCH_LIMIT, offset=0):
+        """Return one page of the items matching every word of a query, best matches first."""
+
+    @abstractmethod
+    def update_item(self, item):
+        """Write the fields of an inventory item that are not None, by id when it is known, by name otherwise."""
+
+    @abstractmethod
+    def get_inventory(self, as_table=False):
+        """Return every inventory item in SORT_KEY order, as CollectionItems or an ItemTable."""
+
+    @abstractmethod
+    def add_wanted_item(self, item):
+        """Insert a wanted item and return its new id."""
+
+    @abstractmethod
+    def add_wanted_items(self, items, chunk_size=None):
+        """Insert many wanted items and return their new ids, in order."""
+
+    @abstractmethod
+    def remove_wanted_item(self, item_name):
+        """Delete the wanted items with the given name."""
+
+    @abstractmethod
+    def get_wanted_items(self, as_table=False):
+        """Return every wanted item, as CollectionItems or an ItemTable."""
+
+    @abstractmethod
+    def update_wanted_item_price(self, item_name):
+        """Scrape a wanted item's price and store it with its currency, returning the price found or None."""
+
+    @abstractmethod
+    def update_prices(self, prices, table="wanted", chunk_size=None, source=DEFAULT_PRICE_SOURCE, currency="USD"):
+        """Write a dictionary of item name to price to one of PRICE_TABLES, appending each to the price history."""
+
+    @abstractmethod
+    def roll_up_price_history(self, now=None, policy=ROLLUP_POLICY):
+        """Downsample old price history following the policy, return the buckets written per resolution."""
+
+    @abstractmethod
+    def price_history(self, names=None, category=None, resolution="day", start=None, end=None):
+        """Return the price history of many items as a PriceSeries."""
+
+    @abstractmethod
+    def add_sell_item(self, item, threshold):
+        """Insert a sell item with its price threshold and return its new id."""
+
+    @abstractmethod
+    def add_sell_items(self, items, chunk_size=None):
+        """Insert many (item, threshold) pairs and return the new ids, in order."""
+
+    @abstractmethod
+    def remove_sell_item(self, item_name):
+        """Delete the sell items with the given name."""
+
+    @abstractmethod
+    def get_sell_items(self, as_table=False):
+        """Return every sell item as an (item, threshold) pair, or an ItemTable with a threshold column."""
+
+    @abstractmethod
+    def check_sell_item_price(self, item_name):
+        """Scrape the current market price of an item as a Listing with its currency, None if it could not be found."""
+
+    @abstractmethod
+    def update_sell_item_price(self, item_name, new_price, source=DEFAULT_PRICE_SOURCE, currency="USD"):
+        """Store a sell item's price and append it to the price history, in the given currency."""
+
+    @abstractmethod
+    def set_wanted_target_price(self, item_name, target_price):
+        """Set the price below which a wanted item raises an alert, None disables it."""
+
+    @abstractmethod
+    def check_alerts(self, cooldown=DEFAULT_ALERT_COOLDOWN, limit=None):
+        """Raise and return the alerts of the items past their threshold or target price."""
+
+    @abstractmethod
+    def get_alerts(self, include_acknowledged=False, limit=100):
+        """Return the latest alerts, newest first."""
+
+    @abstractmethod
+    def acknowledge_alerts(self, alert_ids):
+        """Mark alerts as acknowledged."""
+
+    @abstractmethod
+    def copy_in(self, table, stream, columns):
+        """Load headerless CSV rows read from a file-like object into a table, return the number of rows."""
+
+    @abstractmethod
+    def copy_out(self, table, stream, columns, format="csv"):
+        """Write every row of a table as CSV or JSONL to a file-like object, return the number of rows."""
+
+    @abstractmethod
+    def iter_inventory(self, itersize=None):
+        """Yield every inventory item in SORT_KEY order, in constant memory."""
+
+    @abstractmethod
+    def iter_wanted_items(self, itersize=None):
+        """Yield every wanted item in SORT_KEY order, in constant memory."""
+
+    @abstractmethod
+    def iter_sell_items(self, itersize=None):
+        """Yield every sell item as an (item, threshold) pair in SORT_KEY order, in constant memory."""
+
+    @abstractmethod
+    def inventory_page(self, after=None, limit=100):
+        """Return the inventory items following the page key `after` and the key of the next page, or None."""
+
+    @abstractmethod
+    def wanted_page(self, after=None, limit=100):
+        """Return the wanted items following the page key `after` and the key of the next page, or None."""
+
+    @abstractmethod
+    def sell_page(self, after=None, limit=100):
+        """Return the (item, threshold) pairs following the page key `after` and the key of the next page, or None."""
+
+    @abstractmethod
+    def iter_rows(self, table, itersize=None):
+        """Yield every row of one of SYNC_TABLES with its columns there, timestamps as UTC datetimes, in constant memory."""
+
+    @abstractmethod
+    def close(self):
+        """Release the database connections."""
@@ -0,0 +1,238 @@
+"""
+virtual_grid.py
+
+Defines the VirtualGrid class, a scrollable grid of item tiles that only creates
+widgets for the rows in and near the visible part of the canvas.
+"""
+
+import textwrap
+import tkinter as tk
+from tkinter import ttk
+from thumbnail_loader import PRIORITY_VISIBLE, PRIORITY_OFFSCREEN
+
+TILE_WIDTH = 140
+TILE_HEIGHT = 170
+TILE_PADDING = 9
+NAME_WRAP_WIDTH = 15
+NAME_MAX_LINES = 3
+
+
+class _Tile:
+    """
+    A reusable tile widget: an image label with the item name and year below it.
+    """
+
+    def __init__(self, grid):
+        self.item = None
+        self.index = None
+        self.frame = ttk.Frame(grid.canvas, borderwidth=2, relief=tk.GROOVE, padding=(TILE_PADDING, TILE_PADDING))
+        self.img_label = tk.Label(self.frame)
+        self.img_label.pack()
+        self.name_label = tk.Label(self.frame, font=("Arial", 10, "bold"), justify=tk.CENTER)
+        self.name_label.pack()
+        self.year_label = tk.Label(self.frame, font=("Arial", 10))
+        self.year_label.pack()
+        self.window_id = grid.canvas.create_window(
+            0, 0, window=self.frame, anchor="nw", width=TILE_WIDTH, height=TILE_HEIGHT, state="hidden"
+        )
+
+        for widget in (self.frame, self.img_label, self.name_label, self.year_label):
+            widget.bind("<Button-1>", lambda event: grid.on_click(self.item))
+            grid.bind_mousewheel(widget)
+
+    def show(self, canvas, index, item, image, x, y):
+        """
+        Bind the tile to an item and place it at the given canvas coordinates.
+        """
+        self.index = index
+        self.item = item
+        self.update_text(item)
+        self.img_label.configure(image=image)
+        canvas.coords(self.window_id, x, y)
+        canvas.itemconfigure(self.window_id, state="normal")
+
+    def update_text(self, item):
+        lines = textwrap.wrap(item.name or "", width=NAME_WRAP_WIDTH)
+        if len(lines) > NAME_MAX_LINES:
+            lines = lines[:NAME_MAX_LINES]
+            lines[-1] = lines[-1][:NAME_WRAP_WIDTH - 1] + "…"
+        self.name_label.configure(text="\n".join(lines))
+        self.year_label.configure(text=f"Year: {item.year}")
+
+    def move(self, canvas, index, x, y):
+        self.index = index
+        canvas.coords(self.window_id, x, y)
+
+    def set_image(self, image_path, image):
+        """
+        Swap in an image that finished loading, unless the tile shows another picture by now.
+        """
+        if self.item is not None and self.item.image_path == image_path:
+            self.img_label.configure(image=image)
+
+    def hide(self, canvas):
+        self.index = None
+        self.item = None
+        canvas.itemconfigure(self.window_id, state="hidden")
+
+
+class VirtualGrid:
+    def __init__(self, parent, image_loader, on_click, cancel_image=None, key=None, overscan_rows=2):
+        """
+        Initialize a VirtualGrid instance.
+
+        :param parent: Widget the grid is placed in
+        :param image_loader: Callable taking (item, owner, on_ready, priority) and returning the PhotoImage
+            to show right away; it may later call on_ready with the final image
+        :param on_click: Callable taking the item whose tile was clicked
+        :param cancel_image: Callable taking an owner whose pending image is no longer needed
+        :param key: Callable returning the identity of an item, used to match tiles across set_items calls;
+            defaults to the item's id, or its name for items not stored yet
+        :param overscan_rows: Number of rows kept alive above and below the visible area
+        """
+        self.image_loader = image_loader
+        self.cancel_image = cancel_image
+        self.key = key or (lambda item: item.id if item.id is not None else item.name)
+        self.on_click = on_click
+        self.overscan_rows = overscan_rows
+        self.items = []
+        self.columns = 1
+        self.cell_width = TILE_WIDTH + TILE_PADDING
+        self.cell_height = TILE_HEIGHT + TILE_PADDING
+
+        self.frame = ttk.Frame(parent)
+        self.scrollbar = ttk.Scrollbar(self.frame, orient=tk.VERTICAL)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas = tk.Canvas(self.frame, bg="white", yscrollincrement=self.cell_height // 4)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.scrollbar.configure(command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self._on_yscroll)
+        self.canvas.bind("<Configure>", self._on_canvas_resize)
+        self.bind_mousewheel(self.canvas)
+
+        # Tiles currently bound to an item, keyed by item index, and idle tiles ready for reuse
+        self.visible_tiles = {}
+        self.free_tiles = []
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    def bind_mousewheel(self, widget):
+        widget.bind("<MouseWheel>", self._on_mousewheel)
+        widget.bind("<Button-4>", lambda event: self.canvas.yview_scroll(-1, "units"))
+        widget.bind("<Button-5>", lambda event: self.canvas.yview_scroll(1, "units"))
+
+    def set_items(self, items):
+        """
+        Replace the items shown by the grid, touching only the tiles whose item changed.
+
+        Tiles are matched to the new items by key: tiles of removed items are released, tiles of
+        moved items are repositioned, and a tile is only redrawn when its name, year or image changed.
+        Tiles for newly visible items are then bound by the normal render pass.
+        """
+        old_rows = self._row_count()
+        self.items = list(items)
+        new_index = {self.key(item): index for index, item in enumerate(self.items)}
+        (_, _), (start, end) = self._visible_range()
+
+        tiles = self.visible_tiles
+        self.visible_tiles = {}
+        for tile in tiles.values():
+            index = new_index.get(self.key(tile.item))
+            if index is None or not start <= index < end or index in self.visible_tiles:
+                self._release(tile)
+                continue
+
+            old_item, item = tile.item, self.items[index]
+            if index != tile.index:
+                tile.move(self.canvas, index, *self._position(index))
+            if (old_item.name, old_item.year) != (item.name, item.year):
+                tile.update_text(item)
+            tile.item = item
+            if old_item.image_path != item.image_path:
+                tile.img_label.configure(image=self._load_image(tile, item, PRIORITY_VISIBLE))
+            self.visible_tiles[index] = tile
+
+        if self._row_count() != old_rows:
+            self._update_scrollregion()
+        self._render()
+
+    def _row_count(self):
+        return -(-len(self.items) // self.columns)
+
+    def _on_mousewheel(self, event):
+        self.canvas.yview_scroll(-1 if event.delta > 0 else 1, "units")
+
+    def _on_yscroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self._render()
+
+    def _on_canvas_resize(self, event):
+        columns = max(1, (event.width - TILE_PADDING) // self.cell_width)
+        if columns != self.columns:
+            # Every tile moves when the column count changes, so lay them out again from scratch
+            self.columns = columns
+            self._release_all()
+            self._update_scrollregion()
+        self._render()
+
+    def _update_scrollregion(self):
+        rows = self._row_count()
+        width = self.columns * self.cell_width + TILE_PADDING
+        height = rows * self.cell_height + TILE_PADDING
+        self.canvas.configure(scrollregion=(0, 0, width, height))
+
+    def _visible_range(self):
+        """
+        Return the index ranges of the tiles on screen, and of the tiles to keep including overscan.
+        """
+        top = self.canvas.canvasy(0)
+        bottom = top + max(self.canvas.winfo_height(), self.cell_height)
+        first_row = int(top // self.cell_height)
+        last_row = int(bottom // self.cell_height)
+        visible = (first_row * self.columns, min(len(self.items), (last_row + 1) * self.columns))
+        first_row = max(0, first_row - self.overscan_rows)
+        last_row += self.overscan_rows
+        kept = (first_row * self.columns, min(len(self.items), (last_row + 1) * self.columns))
+        return visible, kept
+
+    def _render(self):
+        (visible_start, visible_end), (start, end) = self._visible_range()
+
+        for index in [i for i in self.visible_tiles if i < start or i >= end]:
+            self._release(self.visible_tiles.pop(index))
+
+        # Bind on-screen tiles first so their images are requested ahead of the overscan rows
+        indices = list(range(visible_start, visible_end))
+        indices += [i for i in range(start, end) if i < visible_start or i >= visible_end]
+        for index in indices:
+            if index in self.visible_tiles:
+                continue
+            priority = PRIORITY_VISIBLE if visible_start <= index < visible_end else PRIORITY_OFFSCREEN
+            self.visible_tiles[index] = self._bind_tile(index, priority)
+
+    def _bind_tile(self, index, priority):
+        tile = self.free_tiles.pop() if self.free_tiles else _Tile(self)
+        item = self.items[index]
+        tile.show(self.canvas, index, item, self._load_image(tile, item, priority), *self._position(index))
+        return tile
+
+    def _load_image(self, tile, item, priority):
+        return self.image_loader(item, tile, lambda image: tile.set_image(item.image_path, image), priority)
+
+    def _position(self, index):
+        x = TILE_PADDING + (index % self.columns) * self.cell_width
+        y = TILE_PADDING + (index // self.columns) * self.cell_height
+        return x, y
+
+    def _release(self, tile):
+        if self.cancel_image:
+            self.cancel_image(tile)
+        tile.hide(self.canvas)
+        self.free_tiles.append(tile)
+
+    def _release_all(self):
+        for tile in self.visible_tiles.values():
+            self._release(tile)
+        self.visible_tiles.clear()